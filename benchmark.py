@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Performance Benchmarks
+Timing comparisons for the dungeon generation hot paths
+"""
+
+import argparse
+import random
+import time
+from collections import deque
+
+from src.dungeon import Dungeon, Room, FLOOR, WALL, TILE_TYPES
+from src.generator import DungeonGenerator
+from src.pathfinding import PathfindingValidator
+from src.batch_metrics import DQSBatch, score_batch
+from src.quality_metrics import DungeonQualityMetrics
+from src.renderer import ASCIIRenderer
+from src.spatial_index import LinearRoomIndex, GridRoomIndex
+from src.tower import generate_tower_parallel
+
+
+def _time(func, repeat: int = 3) -> float:
+    """Return the best wall-clock time of func over several runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _random_rooms(width: int, height: int, count: int, max_size: int, seed: int = 0) -> list:
+    """Build random room rectangles, some of them hanging off the grid edges"""
+    rng = random.Random(seed)
+    rooms = []
+    for i in range(count):
+        w = rng.randint(3, max_size)
+        h = rng.randint(3, max_size)
+        x = rng.randint(-w // 2, width - w // 2)
+        y = rng.randint(-h // 2, height - h // 2)
+        rooms.append(Room(x, y, w, h, i))
+    return rooms
+
+
+def _stamp_rooms_per_tile(dungeon: Dungeon, rooms: list):
+    """Reference room stamping: one bounds-checked write per tile"""
+    grid = dungeon.grid
+    for room in rooms:
+        for y in range(room.y, room.y + room.height):
+            for x in range(room.x, room.x + room.width):
+                if 0 <= x < dungeon.width and 0 <= y < dungeon.height:
+                    grid.set(x, y, FLOOR)
+        for x in range(room.x, room.x + room.width):
+            if 0 <= x < dungeon.width:
+                if room.y > 0 and room.y < dungeon.height:
+                    grid.set(x, room.y, WALL)
+                if 0 <= room.y + room.height - 1 and room.y + room.height < dungeon.height:
+                    grid.set(x, room.y + room.height - 1, WALL)
+        for y in range(room.y, room.y + room.height):
+            if 0 <= y < dungeon.height:
+                if room.x > 0 and room.x < dungeon.width:
+                    grid.set(room.x, y, WALL)
+                if 0 <= room.x + room.width - 1 and room.x + room.width < dungeon.width:
+                    grid.set(room.x + room.width - 1, y, WALL)
+
+
+def bench_room_stamping(sizes=(500, 2000)):
+    """Compare per-tile and slice-based room stamping on large floors"""
+    print("Room stamping (Dungeon.add_room)")
+    for size in sizes:
+        rooms = _random_rooms(size, size, count=size // 2, max_size=max(size // 10, 15))
+
+        def per_tile():
+            _stamp_rooms_per_tile(Dungeon(size, size, 1), rooms)
+
+        def sliced():
+            dungeon = Dungeon(size, size, 1)
+            for room in rooms:
+                dungeon.add_room(room)
+
+        reference = Dungeon(size, size, 1)
+        _stamp_rooms_per_tile(reference, rooms)
+        stamped = Dungeon(size, size, 1)
+        for room in rooms:
+            stamped.add_room(room)
+        identical = reference.grid.cells == stamped.grid.cells
+
+        old, new = _time(per_tile), _time(sliced)
+        print(f"  {size}x{size}, {len(rooms)} rooms: per-tile {old * 1000:.1f} ms, "
+              f"sliced {new * 1000:.1f} ms ({old / new:.1f}x), identical={identical}")
+
+
+def _place_rooms(index, candidates: list) -> tuple:
+    """Rejection-sample candidate rooms into index, returning (placed, rejected)"""
+    placed = rejected = 0
+    for room in candidates:
+        if index.overlaps(room, buffer=2):
+            rejected += 1
+        else:
+            index.insert(room)
+            placed += 1
+    return placed, rejected
+
+
+def bench_overlap_index(sizes=(500, 2000)):
+    """Compare linear and bucket-grid overlap checks during room placement"""
+    print("Room overlap checks (DungeonGenerator._room_overlaps)")
+    for size in sizes:
+        rng = random.Random(size)
+        candidates = []
+        for i in range(10000):
+            w, h = rng.randint(3, 15), rng.randint(3, 15)
+            candidates.append(Room(rng.randint(1, size - w - 1), rng.randint(1, size - h - 1), w, h, i))
+
+        results = {}
+        timings = {}
+        for index_class in (LinearRoomIndex, GridRoomIndex):
+            timings[index_class.__name__] = _time(
+                lambda: results.__setitem__(index_class, _place_rooms(index_class(size, size), candidates)),
+                repeat=1
+            )
+
+        placed, rejected = results[GridRoomIndex]
+        old, new = timings['LinearRoomIndex'], timings['GridRoomIndex']
+        print(f"  {size}x{size}, {len(candidates)} attempts, {placed} rooms placed, {rejected} rejected: "
+              f"linear {old * 1000:.1f} ms, grid {new * 1000:.1f} ms ({old / new:.1f}x), "
+              f"identical={results[LinearRoomIndex] == results[GridRoomIndex]}")
+
+
+def bench_room_placement(sizes=(200, 500)):
+    """Compare rejection sampling and free-space sampling on crowded floors"""
+    print("Room placement (DungeonGenerator._generate_rooms)")
+    for size in sizes:
+        room_count = size * size // 80
+        for placement in DungeonGenerator.PLACEMENTS:
+            generator = DungeonGenerator(seed=size, placement=placement)
+            dungeon = Dungeon(size, size, 1)
+            generator._generate_rooms(dungeon, room_count, is_boss_floor=False)
+            stats = dungeon.placement_stats
+            print(f"  {size}x{size}, {placement:<10}: {stats['rooms_placed']}/{room_count} rooms, "
+                  f"{stats['attempts']} attempts, {stats['time_seconds'] * 1000:.1f} ms "
+                  f"({stats['time_seconds'] * 1e6 / max(stats['rooms_placed'], 1):.0f} us/room)")
+
+
+def _serpentine_dungeon(size: int) -> Dungeon:
+    """Build a floor that is one long corridor snaking back and forth"""
+    dungeon = Dungeon(size, size, 1)
+    for row, y in enumerate(range(1, size - 1, 2)):
+        dungeon.create_corridor((1, y), (size - 2, y))
+        x = size - 2 if row % 2 == 0 else 1
+        if y + 2 < size - 1:
+            dungeon.create_corridor((x, y), (x, y + 2))
+    return dungeon
+
+
+def _find_path_copying(dungeon: Dungeon, start: tuple, goal: tuple):
+    """Reference BFS that stores a full copy of the path with every queued node"""
+    if not dungeon.is_walkable(start[0], start[1]) or not dungeon.is_walkable(goal[0], goal[1]):
+        return None
+    visited = {start}
+    queue = deque([(start, [start])])
+    while queue:
+        (x, y), path = queue.popleft()
+        if (x, y) == goal:
+            return path
+        for dx, dy in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+            nx, ny = x + dx, y + dy
+            if (nx, ny) not in visited and dungeon.is_walkable(nx, ny):
+                visited.add((nx, ny))
+                queue.append(((nx, ny), path + [(nx, ny)]))
+    return None
+
+
+def bench_find_path(sizes=(60, 120, 240)):
+    """Compare path-copying BFS and parent-pointer A* on a long snaking corridor"""
+    print("Path finding (PathfindingValidator.find_path)")
+    for size in sizes:
+        dungeon = _serpentine_dungeon(size)
+        validator = PathfindingValidator(dungeon)
+        start = (1, 1)
+        goal = (1, size - 3) if ((size - 3) // 2) % 2 == 0 else (size - 2, size - 3)
+
+        old_path = _find_path_copying(dungeon, start, goal)
+        new_path = validator.find_path(start, goal)
+        old = _time(lambda: _find_path_copying(dungeon, start, goal), repeat=1)
+        new = _time(lambda: validator.find_path(start, goal))
+        print(f"  {size}x{size}, path length {len(new_path)}: copying BFS {old * 1000:.1f} ms, "
+              f"A* {new * 1000:.1f} ms ({old / new:.1f}x), same length={len(old_path) == len(new_path)}")
+
+
+def _bfs_reachability_tuples(dungeon: Dungeon, start: tuple) -> set:
+    """Reference BFS over (x, y) tuples with a set as the visited set"""
+    if not dungeon.is_walkable(start[0], start[1]):
+        return set()
+    visited = {start}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        for dx, dy in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+            nx, ny = x + dx, y + dy
+            if (nx, ny) not in visited and dungeon.is_walkable(nx, ny):
+                visited.add((nx, ny))
+                queue.append((nx, ny))
+    return visited
+
+
+def _crowded_dungeon(size: int) -> Dungeon:
+    """Build a floor packed with connected rooms (one room per 150 tiles)"""
+    generator = DungeonGenerator(seed=size)
+    dungeon = Dungeon(size, size, 1)
+    generator._generate_rooms(dungeon, size * size // 150, is_boss_floor=False)
+    generator._connect_rooms(dungeon)
+    return dungeon
+
+
+def bench_reachability(sizes=(200, 500)):
+    """Compare tuple-set BFS and flat-index mask BFS on generated floors"""
+    print("Reachability (PathfindingValidator.reachable_mask)")
+    for size in sizes:
+        dungeon = _crowded_dungeon(size)
+        validator = PathfindingValidator(dungeon)
+        start = dungeon.rooms[0].center
+
+        same = _bfs_reachability_tuples(dungeon, start) == validator.bfs_reachability(start)
+        old = _time(lambda: _bfs_reachability_tuples(dungeon, start), repeat=1)
+        new = _time(lambda: validator.reachable_mask(start))
+        tiles = validator.reachable_mask(start).count(1)
+        print(f"  {size}x{size}, {tiles} reachable tiles: tuple BFS {old * 1000:.1f} ms, "
+              f"mask BFS {new * 1000:.1f} ms ({old / new:.1f}x), identical={same}")
+
+
+def _render_overlay_per_tile(renderer: ASCIIRenderer, dungeon: Dungeon, enemies: list, resources: list) -> list:
+    """Reference overlay rendering: unpacked grid copy and one string append per tile"""
+    grid_copy = [[TILE_TYPES[code] for code in row] for row in dungeon.grid.rows()]
+    for x, y, symbol in resources + enemies:
+        if 0 <= y < dungeon.height and 0 <= x < dungeon.width and dungeon.is_walkable(x, y):
+            grid_copy[y][x] = symbol
+    lines = []
+    for row in grid_copy:
+        line = ""
+        for tile in row:
+            line += tile if isinstance(tile, str) else renderer.symbols.get(tile, ' ')
+        lines.append(line)
+    return lines
+
+
+def bench_render(sizes=(200, 1000)):
+    """Compare per-tile string building and translate-table rendering with overlays"""
+    print("Rendering (ASCIIRenderer.render_with_overlay)")
+    renderer = ASCIIRenderer()
+    for size in sizes:
+        dungeon = DungeonGenerator(seed=size).generate(5, size, size)
+        enemies = [(x, y, 'e') for x, y in dungeon.enemies]
+        resources = [(x, y, '$') for x, y in dungeon.resources]
+
+        rendered = renderer.render_with_overlay(dungeon, enemies, resources).split("\n")
+        same = rendered[2:2 + size] == _render_overlay_per_tile(renderer, dungeon, enemies, resources)
+        old = _time(lambda: _render_overlay_per_tile(renderer, dungeon, enemies, resources), repeat=1)
+        new = _time(lambda: renderer.render_with_overlay(dungeon, enemies, resources))
+        print(f"  {size}x{size}, {len(enemies) + len(resources)} overlays: per-tile {old * 1000:.1f} ms, "
+              f"translate {new * 1000:.1f} ms ({old / new:.1f}x), identical={same}")
+
+
+def bench_tower_transport(size: int = 1000, floors: int = 16, workers: int = 2):
+    """Compare pickled and shared-memory results from parallel floor generation"""
+    print("Parallel floor transport (generate_tower_parallel)")
+    grids = {}
+    timings = {}
+    for transport in ('pickle', 'shared_memory'):
+        def run():
+            grids[transport] = [bytes(dungeon.grid.cells) for dungeon, _ in generate_tower_parallel(
+                7, range(1, floors + 1), size, size, workers=workers, transport=transport)]
+        timings[transport] = _time(run, repeat=1)
+
+    old, new = timings['pickle'], timings['shared_memory']
+    print(f"  {floors} floors of {size}x{size}, {workers} workers: pickle {old * 1000:.1f} ms, "
+          f"shared memory {new * 1000:.1f} ms ({old / new:.1f}x), "
+          f"identical={grids['pickle'] == grids['shared_memory']}")
+
+
+def bench_dqs_batch(floors: int = 100000):
+    """Score floors' DQS one floor at a time vs one column at a time, reachability already known"""
+    evaluators = []
+    batch = DQSBatch()
+    for dungeon, _ in generate_tower_parallel(11, range(1, 101), workers=1):
+        metrics = DungeonQualityMetrics(dungeon)
+        metrics.context.validation  # run the reachability pass up front
+        evaluators.append(metrics)
+    for i in range(floors):
+        metrics = evaluators[i % len(evaluators)]
+        batch.add_dungeon(metrics.dungeon, metrics.context)
+
+    def per_floor():
+        for metrics in evaluators * (floors // len(evaluators)):
+            metrics._evaluate()
+
+    old = _time(per_floor, repeat=1)
+    new = _time(lambda: score_batch(batch), repeat=1)
+    print(f"  {floors} floors: per floor {old * 1000:.1f} ms, batch columns {new * 1000:.1f} ms "
+          f"({old / new:.1f}x, batch includes tier and biome percentiles)")
+
+
+BENCHMARKS = {
+    'rooms': bench_room_stamping,
+    'overlap': bench_overlap_index,
+    'placement': bench_room_placement,
+    'path': bench_find_path,
+    'reachability': bench_reachability,
+    'render': bench_render,
+    'transport': bench_tower_transport,
+    'dqs_batch': bench_dqs_batch,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Dungeon generator performance benchmarks')
+    parser.add_argument(
+        'names',
+        nargs='*',
+        help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (default: all)"
+    )
+    args = parser.parse_args()
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name]()
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -4,11 +4,84 @@ Procedural Dungeon Generator
 """
 
 import argparse
+import os
+import random
 import sys
 from src.generator import DungeonGenerator
-from src.renderer import ASCIIRenderer
-from src.pathfinding import PathfindingValidator
+from src.tower import generate_tower_parallel
+from src.renderer import ASCIIRenderer, TerminalAnimator
 from src.quality_metrics import DungeonQualityMetrics
+from src.catalog import compile_catalog
+from src.dqs_stats import DQSAggregator
+from src.serialization import FloorArchiveWriter, FloorWriter, dump
+
+
+def build_overlays(dungeon):
+    """Build enemy and resource overlay lists for rendering"""
+    # First enemy (boss) is 'E', others are 'e'
+    enemies = [(pos[0], pos[1], 'E' if i == 0 else 'e') for i, pos in enumerate(dungeon.enemies)]
+    resources = [(pos[0], pos[1], '$') for pos in dungeon.resources]
+    return enemies, resources
+
+
+def generate_tower(args, renderer):
+    """Generate floors 1 to args.floor as one tower, printing a summary line per floor"""
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 63)
+    print(f"Generating tower floors 1-{args.floor}...")
+    print(f"Using master seed: {seed}")
+
+    renders = []
+    if args.output and args.format == 'bin':
+        writer = FloorWriter(open(args.output, 'wb'))
+    elif args.output and args.format == 'archive':
+        writer = FloorArchiveWriter(args.output)
+    else:
+        writer = None
+    stats = DQSAggregator()
+    try:
+        floors = generate_tower_parallel(seed, range(1, args.floor + 1), args.width, args.height,
+                                         workers=args.workers, evaluate=args.evaluate,
+                                         transport=args.transport)
+        for dungeon, results in floors:
+            if args.biome:
+                dungeon.biome = args.biome
+            if results:
+                stats.add(dungeon.floor_number, dungeon.biome, results)
+
+            line = (f"  Floor {dungeon.floor_number:3d} | {dungeon.biome:<11} | rooms {len(dungeon.rooms):2d} | "
+                    f"enemies {len(dungeon.enemies):2d} | resources {len(dungeon.resources):2d}")
+            if results:
+                line += f" | DQS {results['dungeon_quality_score']:.3f} [{results['grade'][0]}]"
+            print(line)
+
+            if writer:
+                writer.write(dungeon)
+            elif args.output:
+                enemies_overlay, resources_overlay = build_overlays(dungeon)
+                renders.append(renderer.render_with_overlay(dungeon, enemies_overlay, resources_overlay))
+    except BaseException:
+        # Don't leave a truncated tower file behind
+        if writer:
+            writer.close()
+            os.remove(args.output)
+        raise
+
+    if len(stats):
+        print("\nDQS by tier:")
+        summaries = list(stats.summary(by='tier', quantiles=(50,)).items())
+        summaries.append(('all floors', stats.overall(quantiles=(50,))))
+        for tier, summary in summaries:
+            dqs = summary['dungeon_quality_score']
+            print(f"  {tier:<13} | floors {summary['count']:3d} | mean {dqs['mean']:.3f} | "
+                  f"median {dqs['quantiles'][50]:.3f} | min {dqs['min']:.3f} | stdev {dqs['stdev']:.3f}")
+
+    if writer:
+        writer.close()
+        print(f"\nTower saved to {args.output}")
+    elif args.output:
+        with open(args.output, 'w') as f:
+            f.write("\n\n".join(renders))
+        print(f"\nTower saved to {args.output}")
 
 
 def main():
@@ -21,6 +94,23 @@ def main():
         default=1,
         help='Floor number to generate (1-100)'
     )
+    parser.add_argument(
+        '--tower',
+        action='store_true',
+        help='Generate every floor from 1 up to --floor as one seeded tower'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Worker processes for --tower generation (default: 1)'
+    )
+    parser.add_argument(
+        '--transport',
+        choices=['pickle', 'shared_memory'],
+        default='pickle',
+        help='How --tower workers send floors back (default: pickle)'
+    )
     parser.add_argument(
         '--biome',
         type=str,
@@ -48,6 +138,13 @@ def main():
         type=str,
         help='Save output to file instead of printing to console'
     )
+    parser.add_argument(
+        '--format',
+        choices=['text', 'bin', 'archive'],
+        default='text',
+        help='Format of --output: ASCII render, binary floor data or a floor archive '
+             'indexed by (seed, floor) (default: text)'
+    )
     parser.add_argument(
         '--validate',
         action='store_true',
@@ -63,6 +160,22 @@ def main():
         action='store_true',
         help='Show real-time generation animation'
     )
+    parser.add_argument(
+        '--target-dqs',
+        type=float,
+        help='Regenerate the floor until its DQS reaches this value, rejecting weak layouts early'
+    )
+    parser.add_argument(
+        '--max-attempts',
+        type=int,
+        default=50,
+        help='Candidate floors to try with --target-dqs (default: 50)'
+    )
+    parser.add_argument(
+        '--compile-catalog',
+        action='store_true',
+        help='Validate the data files, write their binary snapshots and exit'
+    )
     parser.add_argument(
         '--speed',
         type=float,
@@ -72,23 +185,45 @@ def main():
 
     args = parser.parse_args()
 
+    if args.compile_catalog:
+        try:
+            for path in compile_catalog():
+                print(f"Compiled {path}")
+        except ValueError as e:
+            print(f"Error: invalid catalog data: {e}")
+            sys.exit(1)
+        return
+
     # Validate floor number
     if args.floor < 1 or args.floor > 100:
         print("Error: Floor number must be between 1 and 100")
         sys.exit(1)
 
+    if args.format != 'text' and not args.output:
+        parser.error(f"--format {args.format} requires --output")
+    if args.format == 'archive' and not args.tower and args.seed is None and args.target_dqs is None:
+        parser.error("--format archive requires --seed for a single floor")
+    if args.target_dqs is not None and (args.tower or args.animate):
+        parser.error("--target-dqs cannot be combined with --tower or --animate")
+
     # Create generator and renderer
     generator = DungeonGenerator(seed=args.seed)
     renderer = ASCIIRenderer()
 
+    if args.tower:
+        generate_tower(args, renderer)
+        return
+
     # Setup animation callback if enabled
     animate_callback = None
+    animator = None
     if args.animate:
+        # Fed the generation events, redraws only the tiles they changed
+        animator = TerminalAnimator(renderer)
+
         def anim_callback(dun, msg):
-            # Build overlay lists
-            enemies = [(pos[0], pos[1], 'E' if i == 0 else 'e') for i, pos in enumerate(dun.enemies)]
-            resources = [(pos[0], pos[1], '$') for pos in dun.resources]
-            renderer.animate_step(dun, msg, enemies, resources, args.speed)
+            enemies, resources = build_overlays(dun)
+            animator.step(dun, msg, enemies, resources, args.speed)
         animate_callback = anim_callback
     else:
         print(f"Generating Floor {args.floor}...")
@@ -96,16 +231,32 @@ def main():
             print(f"Using seed: {args.seed}")
 
     # Generate dungeon
-    dungeon = generator.generate(
-        floor_number=args.floor,
-        width=args.width,
-        height=args.height,
-        animate_callback=animate_callback
-    )
+    if args.target_dqs is not None:
+        dungeon, report = generator.generate_until(args.floor, args.target_dqs, args.width, args.height,
+                                                   max_attempts=args.max_attempts, seed=args.seed)
+        rejections = ", ".join(f"{reason} {count}" for reason, count in report['rejections'].items() if count)
+        print(f"{report['attempts']} attempts in {report['time_seconds'] * 1000:.1f} ms, "
+              f"{report['evaluated']} fully evaluated"
+              + (f", rejected early: {rejections}" if rejections else ""))
+        if dungeon is None:
+            print(f"Error: no candidate layout could reach DQS {args.target_dqs:.3f}")
+            sys.exit(1)
+        quality = report['quality']
+        print(f"{'Reached' if report['reached'] else 'Best found'}: DQS {quality['dungeon_quality_score']:.3f} "
+              f"[{quality['grade'][0]}], floor seed {dungeon.seed}")
+    else:
+        dungeon = generator.generate(
+            floor_number=args.floor,
+            width=args.width,
+            height=args.height,
+            animate_callback=animate_callback,
+            seed=args.seed,
+            on_event=animator
+        )
 
     # Clear for final render if animating
     if args.animate:
-        renderer.clear_screen()
+        animator.finish()
 
     # Override biome if specified
     if args.biome:
@@ -114,25 +265,17 @@ def main():
     # Render dungeon with enemies and resources (renderer already created above)
 
     # Build overlay lists for rendering
-    enemies_overlay = []
-    resources_overlay = []
-
-    # Add enemies
-    for i, enemy_pos in enumerate(dungeon.enemies):
-        symbol = 'E' if i == 0 else 'e'  # First enemy (boss) is 'E', others are 'e'
-        enemies_overlay.append((enemy_pos[0], enemy_pos[1], symbol))
-
-    # Add resources
-    for resource_pos in dungeon.resources:
-        resources_overlay.append((resource_pos[0], resource_pos[1], '$'))
+    enemies_overlay, resources_overlay = build_overlays(dungeon)
 
     output = renderer.render_with_overlay(dungeon, enemies_overlay, resources_overlay)
 
+    # Validation and evaluation share one reachability pass
+    quality_eval = DungeonQualityMetrics(dungeon)
+
     # Validate if requested
     if args.validate:
         print("\nRunning pathfinding validation...")
-        validator = PathfindingValidator(dungeon)
-        results = validator.validate_connectivity()
+        results = quality_eval.context.validation
 
         print(f"Validation: {'PASS' if results['valid'] else 'FAIL'}")
         print(f"Connected Rooms: {results['connected_rooms']}/{results['total_rooms']}")
@@ -143,12 +286,19 @@ def main():
     # Full quality evaluation if requested
     if args.evaluate:
         print("\nRunning Dungeon Quality Score (DQS) evaluation...")
-        quality_eval = DungeonQualityMetrics(dungeon)
         print(quality_eval.generate_report())
         print()
 
     # Output
-    if args.output:
+    if args.output and args.format == 'bin':
+        with open(args.output, 'wb') as f:
+            dump(dungeon, f)
+        print(f"\nDungeon saved to {args.output}")
+    elif args.output and args.format == 'archive':
+        with FloorArchiveWriter(args.output) as writer:
+            writer.write(dungeon)
+        print(f"\nDungeon saved to {args.output}")
+    elif args.output:
         with open(args.output, 'w') as f:
             f.write(output)
         print(f"\nDungeon saved to {args.output}")
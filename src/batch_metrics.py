@@ -0,0 +1,180 @@
+"""
+Batch Metrics Module
+Column-at-a-time DQS scoring of many floors for parameter sweeps
+"""
+
+from array import array
+from bisect import bisect_right
+from typing import Dict, List, Optional, Sequence
+from .dungeon import Dungeon
+from .quality_metrics import DQS_WEIGHTS, QUALITY_GRADES, EvaluationContext, floor_tier, room_density_score
+
+DEFAULT_QUANTILES = (5, 25, 50, 75, 95)
+
+# Grade thresholds in ascending order for bisection; the lowest grade has no threshold
+_THRESHOLDS = [threshold for threshold, _, _ in reversed(QUALITY_GRADES[:-1])]
+_GRADES = [grade for _, grade, _ in reversed(QUALITY_GRADES)]
+
+_COUNT_COLUMNS = ('total_tiles', 'reachable_tiles', 'room_area', 'connected_rooms', 'total_rooms',
+                  'accessible_resources', 'total_resources')
+
+
+class DQSBatch:
+    """
+    Raw DQS inputs of many floors, stored as one array per field
+
+    Only the handful of counts the metrics depend on are kept per floor, so a
+    sweep can collect 100k floors without holding on to their dungeons.
+    """
+
+    def __init__(self):
+        self.floor_number = array('i')
+        self.biome: List[Optional[str]] = []
+        for name in _COUNT_COLUMNS:
+            setattr(self, name, array('q'))
+
+    def add(self, floor_number: int, biome: Optional[str], total_tiles: int, reachable_tiles: int,
+            room_area: int, connected_rooms: int, total_rooms: int, accessible_resources: int,
+            total_resources: int):
+        """Append one floor's raw data"""
+        self.floor_number.append(floor_number)
+        self.biome.append(biome)
+        self.total_tiles.append(total_tiles)
+        self.reachable_tiles.append(reachable_tiles)
+        self.room_area.append(room_area)
+        self.connected_rooms.append(connected_rooms)
+        self.total_rooms.append(total_rooms)
+        self.accessible_resources.append(accessible_resources)
+        self.total_resources.append(total_resources)
+
+    def add_dungeon(self, dungeon: Dungeon, context: Optional[EvaluationContext] = None):
+        """
+        Append a floor's raw data, measured with its evaluation context
+
+        Args:
+            dungeon: Floor to measure
+            context: Optional EvaluationContext of the floor, so a
+                reachability pass already made for it is reused
+        """
+        context = context if context is not None else EvaluationContext(dungeon)
+        validation = context.validation
+        self.add(dungeon.floor_number, dungeon.biome, context.total_tiles, validation['reachable_tiles'],
+                 context.room_area, validation['connected_rooms'], validation['total_rooms'],
+                 validation['accessible_resources'], validation['total_resources'])
+
+    def add_results(self, floor_number: int, biome: Optional[str], results: Dict):
+        """Append a floor's raw data from its DungeonQualityMetrics.evaluate() results"""
+        raw = results['raw_data']
+        self.add(floor_number, biome, *(raw[name] for name in _COUNT_COLUMNS))
+
+    def __len__(self):
+        return len(self.floor_number)
+
+
+def _ratios(numerators: Sequence[int], denominators: Sequence[int], empty: float) -> array:
+    return array('d', [n / d if d else empty for n, d in zip(numerators, denominators)])
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """
+    Percentile of already sorted values, interpolating linearly between ranks
+
+    Args:
+        sorted_values: Values in ascending order (at least one)
+        q: Percentile between 0 and 100
+    """
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def group_percentiles(values: Sequence[float], groups: Sequence, quantiles: Sequence[float] = DEFAULT_QUANTILES
+                      ) -> Dict:
+    """
+    Percentiles of values per group
+
+    Args:
+        values: One value per floor
+        groups: Group key of each floor, aligned with values
+        quantiles: Percentiles to report, between 0 and 100
+
+    Returns:
+        {group: {'count': n, quantile: value, ...}}
+    """
+    grouped: Dict = {}
+    for group, value in zip(groups, values):
+        grouped.setdefault(group, []).append(value)
+
+    result = {}
+    for group, members in grouped.items():
+        members.sort()
+        summary = {'count': len(members)}
+        for q in quantiles:
+            summary[q] = percentile(members, q)
+        result[group] = summary
+    return result
+
+
+def score_batch(batch: DQSBatch, quantiles: Sequence[float] = DEFAULT_QUANTILES) -> Dict:
+    """
+    Score every floor of a batch, one metric column at a time
+
+    Each metric is a single pass over its input columns and gives the same
+    values as DungeonQualityMetrics.evaluate() before rounding.
+
+    Args:
+        batch: Raw data of the floors
+        quantiles: Percentiles of the DQS to report per floor tier and biome
+
+    Returns:
+        Dictionary with the floor count, the per-floor columns (floor_number,
+        tier, biome, the four metrics, dungeon_quality_score and grade) and
+        the DQS percentiles grouped by tier and by biome
+    """
+    total_tiles = batch.total_tiles
+
+    # Pathability: reachable share of the grid, where 40% walkable scores 1.0
+    pathability = array('d', [min(ratio / 0.4, 1.0) for ratio in
+                              _ratios(batch.reachable_tiles, total_tiles, 0.0)])
+    resource_accessibility = _ratios(batch.accessible_resources, batch.total_resources, 1.0)
+    room_connectivity = _ratios(batch.connected_rooms, batch.total_rooms, 0.0)
+    space_efficiency = array('d', [room_density_score(area / tiles) if tiles else 0.0
+                                   for area, tiles in zip(batch.room_area, total_tiles)])
+
+    w_room = DQS_WEIGHTS['room_connectivity']
+    w_resource = DQS_WEIGHTS['resource_accessibility']
+    w_path = DQS_WEIGHTS['pathability']
+    w_space = DQS_WEIGHTS['space_efficiency']
+    dqs = array('d', [max(0.0, min(1.0, room * w_room + resource * w_resource + path * w_path +
+                                   space * w_space))
+                      for room, resource, path, space in zip(room_connectivity, resource_accessibility,
+                                                             pathability, space_efficiency)])
+    grade = [_GRADES[bisect_right(_THRESHOLDS, score)] for score in dqs]
+
+    tiers = {}
+    tier = []
+    for floor_number in batch.floor_number:
+        name = tiers.get(floor_number)
+        if name is None:
+            name = tiers[floor_number] = floor_tier(floor_number)
+        tier.append(name)
+
+    return {
+        'count': len(batch),
+        'columns': {
+            'floor_number': batch.floor_number,
+            'tier': tier,
+            'biome': batch.biome,
+            'pathability': pathability,
+            'resource_accessibility': resource_accessibility,
+            'room_connectivity': room_connectivity,
+            'space_efficiency': space_efficiency,
+            'dungeon_quality_score': dqs,
+            'grade': grade
+        },
+        'percentiles': {
+            'tier': group_percentiles(dqs, tier, quantiles),
+            'biome': group_percentiles(dqs, batch.biome, quantiles)
+        }
+    }
@@ -4,13 +4,17 @@ Biome definitions and management
 """
 
 import json
-from typing import Dict, List, Optional
+from types import MappingProxyType
+from typing import List, Mapping, Optional
 from pathlib import Path
+from .data_cache import DataTable, load_table
 
 
 class Biome:
     """Represents a dungeon biome with its characteristics"""
 
+    __slots__ = ('name', 'theme', 'characteristics', 'resources', 'common_enemies', 'mini_bosses', 'mega_boss')
+
     def __init__(self, name: str, data: dict):
         self.name = name
         self.theme = data.get('theme', '')
@@ -24,6 +28,37 @@ class Biome:
         return f"Biome({self.name})"
 
 
+class BiomeTable(DataTable):
+    """Parsed biomes.json"""
+
+    def __init__(self, data: Mapping):
+        super().__init__(data)
+        self.biomes: Mapping[str, Biome] = MappingProxyType(
+            {name: Biome(name, entry) for name, entry in data.items()}
+        )
+
+    @staticmethod
+    def validate(data):
+        """Check parsed biomes.json data, raising ValueError on the first bad entry"""
+        if not isinstance(data, dict):
+            raise ValueError("biome data must be an object of biomes")
+        for name, entry in data.items():
+            if not isinstance(entry, dict):
+                raise ValueError(f"biome {name!r}: expected an object")
+            for field in ('characteristics', 'resources', 'common_enemies', 'mini_bosses'):
+                values = entry.get(field, [])
+                if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+                    raise ValueError(f"biome {name!r}: {field} must be a list of strings")
+            for field in ('theme', 'mega_boss'):
+                if not isinstance(entry.get(field, ''), str):
+                    raise ValueError(f"biome {name!r}: {field} must be a string")
+
+
+def load_biome_table(path) -> BiomeTable:
+    """Return the process-wide cached BiomeTable for a JSON data file"""
+    return load_table(path, BiomeTable)
+
+
 class BiomeManager:
     """Manages biome data and selection"""
 
@@ -34,16 +69,13 @@ class BiomeManager:
             data_path = base_path / 'data' / 'biomes.json'
 
         self.data_path = data_path
-        self.biomes: Dict[str, Biome] = {}
+        self.biomes: Mapping[str, Biome] = MappingProxyType({})
         self.load_biomes()
 
     def load_biomes(self):
-        """Load biome data from JSON file"""
+        """Load biome data through the shared data cache"""
         try:
-            with open(self.data_path, 'r') as f:
-                data = json.load(f)
-                for biome_name, biome_data in data.items():
-                    self.biomes[biome_name] = Biome(biome_name, biome_data)
+            self.biomes = load_biome_table(self.data_path).biomes
         except FileNotFoundError:
             print(f"Warning: Biome data file not found at {self.data_path}")
         except json.JSONDecodeError as e:
@@ -0,0 +1,99 @@
+"""
+Catalog Module
+Shared, immutable view of the biome, enemy and resource data
+"""
+
+import os
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Dict, List
+from .biome import BiomeTable, load_biome_table
+from .data_cache import compile_snapshot
+from .enemy import EnemyTable, load_enemy_table
+from .resource import ResourceTable, load_resource_table
+
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / 'data'
+
+_catalogs: Dict[str, 'Catalog'] = {}
+
+# Shared stand-ins for missing data files, so a catalog stays current while they are missing
+_EMPTY_TABLES = {table: table(MappingProxyType({})) for table in (BiomeTable, EnemyTable, ResourceTable)}
+
+
+class Catalog:
+    """
+    Immutable view of one data directory's biomes, enemies and resources
+
+    Missing data files give empty tables. Use get_catalog() rather than
+    building a Catalog directly, so every caller in the process shares one.
+    """
+
+    def __init__(self, data_dir):
+        self.data_dir = os.path.abspath(data_dir)
+        self.biome_table = self._load(load_biome_table, 'biomes.json', BiomeTable)
+        self.enemy_table = self._load(load_enemy_table, 'enemies.json', EnemyTable)
+        self.resource_table = self._load(load_resource_table, 'resources.json', ResourceTable)
+
+        self.biomes = self.biome_table.biomes
+        self.enemies = self.enemy_table.enemies
+        self.resources = self.resource_table.resources
+
+    def _load(self, loader: Callable, filename: str, empty: type):
+        try:
+            return loader(os.path.join(self.data_dir, filename))
+        except FileNotFoundError:
+            return _EMPTY_TABLES[empty]
+
+    def is_current(self) -> bool:
+        """Check that none of the data files changed since this catalog was built"""
+        return (self._load(load_biome_table, 'biomes.json', BiomeTable) is self.biome_table and
+                self._load(load_enemy_table, 'enemies.json', EnemyTable) is self.enemy_table and
+                self._load(load_resource_table, 'resources.json', ResourceTable) is self.resource_table)
+
+
+def get_catalog(data_dir=None) -> Catalog:
+    """
+    Return the shared catalog for a data directory
+
+    The data files are parsed once per process and reparsed only when one of
+    them changes on disk.
+
+    Args:
+        data_dir: Directory holding biomes.json, enemies.json and
+            resources.json (default: the package's data directory)
+
+    Returns:
+        Catalog for the directory
+    """
+    key = os.path.abspath(DEFAULT_DATA_DIR if data_dir is None else data_dir)
+    catalog = _catalogs.get(key)
+    if catalog is None or not catalog.is_current():
+        catalog = Catalog(key)
+        _catalogs[key] = catalog
+    return catalog
+
+
+def compile_catalog(data_dir=None) -> List[str]:
+    """
+    Validate a data directory's JSON files and write their binary snapshots
+
+    Later loads read the snapshots instead of parsing JSON, until a JSON file
+    is edited again (see data_cache.compile_snapshot).
+
+    Args:
+        data_dir: Directory holding the data files (default: the package's data directory)
+
+    Returns:
+        Paths of the snapshots written
+
+    Raises:
+        ValueError: A data file fails validation
+    """
+    data_dir = DEFAULT_DATA_DIR if data_dir is None else data_dir
+    written = []
+    for filename, table in (('biomes.json', BiomeTable), ('enemies.json', EnemyTable),
+                            ('resources.json', ResourceTable)):
+        path = os.path.join(data_dir, filename)
+        if os.path.exists(path):
+            written.append(compile_snapshot(path, table))
+    return written
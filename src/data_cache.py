@@ -0,0 +1,154 @@
+"""
+Data Cache Module
+Process-wide cache of parsed JSON data files, invalidated when a file changes
+"""
+
+import json
+import marshal
+import os
+import sys
+import threading
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, Tuple
+
+# Absolute path -> ((mtime_ns, size), table built from the file)
+_tables: Dict[str, Tuple[Tuple[int, int], object]] = {}
+_lock = threading.Lock()
+
+# Compiled snapshots sit next to their JSON file: data/enemies.json -> data/enemies.catalog
+SNAPSHOT_SUFFIX = '.catalog'
+SNAPSHOT_VERSION = 1
+
+
+def freeze(value):
+    """Return a read-only copy of parsed JSON: dicts become mapping proxies, lists tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def tuplify(value):
+    """Return parsed JSON with every list turned into a tuple (dicts are kept)"""
+    if isinstance(value, dict):
+        return {key: tuplify(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return tuple(tuplify(item) for item in value)
+    return value
+
+
+class DataTable:
+    """
+    Base class of the tables built from one data file
+
+    Tables are built from parsed data whose lists are already tuples. The
+    read-only mapping view of the raw data is only made when data is first
+    used, since most callers only need the objects and indexes.
+    """
+
+    def __init__(self, data: Mapping):
+        self._raw = data
+        self._data = None
+
+    @property
+    def data(self) -> Mapping:
+        """Read-only view of the file's parsed contents"""
+        if self._data is None:
+            self._data = freeze(self._raw)
+        return self._data
+
+
+def group_by(items, key: Callable, value: Callable = None) -> Mapping:
+    """Index items (or value(item)) by key(item), keeping file order inside each group"""
+    groups: Dict = {}
+    for item in items:
+        groups.setdefault(key(item), []).append(item if value is None else value(item))
+    return MappingProxyType({name: tuple(group) for name, group in groups.items()})
+
+
+def load_table(path, build: Callable[[Mapping], object]):
+    """
+    Return the table built from a JSON file, parsing the file only when it changed
+
+    The cache is keyed by absolute path and invalidated when the file's
+    modification time or size changes.
+
+    Raises:
+        FileNotFoundError: The file does not exist
+        json.JSONDecodeError: The file is not valid JSON
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _tables.get(path)
+    if cached is not None and cached[0] == stamp and isinstance(cached[1], build):
+        return cached[1]
+
+    with _lock:
+        cached = _tables.get(path)
+        if cached is not None and cached[0] == stamp and isinstance(cached[1], build):
+            return cached[1]
+        data = _read_snapshot(path, build, stamp)
+        if data is None:
+            with open(path, 'r') as f:
+                data = tuplify(json.load(f))
+        table = build(data)
+        _tables[path] = (stamp, table)
+        return table
+
+
+def snapshot_path(path) -> str:
+    """Return where the compiled snapshot of a JSON data file lives"""
+    return os.path.splitext(os.path.abspath(path))[0] + SNAPSHOT_SUFFIX
+
+
+def _snapshot_header(build: Callable, stamp: Tuple[int, int]) -> tuple:
+    """Everything a snapshot must match to stand in for its JSON file"""
+    # marshal's format is only stable within one Python version
+    return (SNAPSHOT_VERSION, tuple(sys.version_info[:2]), build.__name__, stamp)
+
+
+def _read_snapshot(path, build: Callable, stamp: Tuple[int, int]):
+    """Return the data stored in a JSON file's snapshot, or None if it is missing or stale"""
+    try:
+        with open(snapshot_path(path), 'rb') as f:
+            header, data = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return data if header == _snapshot_header(build, stamp) else None
+
+
+def compile_snapshot(path, build: Callable) -> str:
+    """
+    Validate a JSON data file and write its compiled snapshot
+
+    The snapshot is a marshal'd (header, data) pair, with lists already
+    turned into tuples. The header records the
+    JSON file's modification time and size, so load_table() ignores the
+    snapshot (and reads the JSON) as soon as the file is edited.
+
+    Args:
+        path: JSON data file
+        build: Table class for the file; its validate() checks the data
+
+    Returns:
+        Path of the written snapshot
+
+    Raises:
+        ValueError: The data fails validation
+    """
+    with open(path, 'r') as f:
+        data = json.load(f)
+    build.validate(data)
+    # Stored the way load_table() hands data to the table, so loading skips that pass
+    data = tuplify(data)
+
+    stat = os.stat(path)
+    target = snapshot_path(path)
+    temporary = target + '.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(marshal.dumps((_snapshot_header(build, (stat.st_mtime_ns, stat.st_size)), data)))
+    # Readers never see a half-written snapshot
+    os.replace(temporary, target)
+    return target
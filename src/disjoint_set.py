@@ -0,0 +1,60 @@
+"""
+Disjoint Set Module
+Union-find over integer IDs for incremental connectivity tracking
+"""
+
+from array import array
+
+
+class DisjointSet:
+    """
+    Union-find with union by size and path halving
+
+    Elements are the integers 0 .. len - 1; add() appends a new singleton.
+    find(), union() and connected() run in near-constant amortized time
+    (inverse Ackermann), so connectivity can be queried after every change.
+    """
+
+    def __init__(self, count: int = 0):
+        """
+        Args:
+            count: Number of singleton elements to start with
+        """
+        self.parent = array('i', range(count))
+        self.size = array('i', [1]) * count
+        self.components = count
+
+    def add(self) -> int:
+        """Add a singleton element and return its ID"""
+        element = len(self.parent)
+        self.parent.append(element)
+        self.size.append(1)
+        self.components += 1
+        return element
+
+    def find(self, element: int) -> int:
+        """Return the representative of element's set"""
+        parent = self.parent
+        while parent[element] != element:
+            parent[element] = parent[parent[element]]
+            element = parent[element]
+        return element
+
+    def union(self, a: int, b: int) -> int:
+        """Merge the sets of a and b, returning the representative of the result"""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        self.components -= 1
+        return root_a
+
+    def connected(self, a: int, b: int) -> bool:
+        """Check whether a and b are in the same set"""
+        return self.find(a) == self.find(b)
+
+    def __len__(self):
+        return len(self.parent)
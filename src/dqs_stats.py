@@ -0,0 +1,259 @@
+"""
+DQS Statistics Module
+Streaming, mergeable summaries of DQS results for large sweeps
+"""
+
+import math
+from array import array
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+from .batch_metrics import DEFAULT_QUANTILES
+from .quality_metrics import QUALITY_GRADES, floor_tier
+
+METRICS = ('pathability', 'resource_accessibility', 'room_connectivity', 'space_efficiency')
+GROUPINGS = ('tier', 'biome')
+
+
+class RunningStats:
+    """
+    Count, mean, variance, min and max of a stream of values in constant memory
+
+    Uses Welford's update, and Chan et al.'s pairwise formula in merge(), so
+    statistics gathered separately (e.g. by worker processes) combine exactly.
+    """
+
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        """Add one value"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: 'RunningStats') -> 'RunningStats':
+        """Fold another RunningStats into this one"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0.0 for fewer than two values)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def summary(self) -> Dict:
+        """Mean, variance, standard deviation, min and max as a dictionary"""
+        if self.count == 0:
+            return {'count': 0, 'mean': None, 'variance': None, 'stdev': None, 'min': None, 'max': None}
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'variance': self.variance,
+            'stdev': math.sqrt(self.variance),
+            'min': self.min,
+            'max': self.max
+        }
+
+
+class ScoreHistogram:
+    """
+    Fixed-bin histogram of scores in [0, 1] for approximate quantiles
+
+    Scores are counted in resolution + 1 bins, so quantiles are exact to
+    1 / resolution; the default matches the three decimals DQS values are
+    reported with. Memory stays constant and histograms merge exactly.
+    """
+
+    __slots__ = ('resolution', 'counts')
+
+    def __init__(self, resolution: int = 1000):
+        self.resolution = resolution
+        self.counts = array('I', [0]) * (resolution + 1)
+
+    def add(self, score: float):
+        """Count one score, clamped to [0, 1]"""
+        index = int(score * self.resolution + 0.5)
+        self.counts[min(max(index, 0), self.resolution)] += 1
+
+    def merge(self, other: 'ScoreHistogram') -> 'ScoreHistogram':
+        """Fold another histogram of the same resolution into this one"""
+        if other.resolution != self.resolution:
+            raise ValueError(f"Cannot merge histograms of resolution {self.resolution} and {other.resolution}")
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Return the q-th percentile (nearest rank), or None when empty
+
+        Args:
+            q: Percentile between 0 and 100
+        """
+        total = sum(self.counts)
+        if total == 0:
+            return None
+        rank = max(1, math.ceil(total * q / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return index / self.resolution
+        return 1.0
+
+
+class GroupStats:
+    """Running statistics of the DQS results of one group of floors"""
+
+    __slots__ = ('dqs', 'metrics', 'grades', 'histogram')
+
+    def __init__(self, resolution: int = 1000):
+        self.dqs = RunningStats()
+        self.metrics = {name: RunningStats() for name in METRICS}
+        self.grades = {grade: 0 for _, grade, _ in QUALITY_GRADES}
+        self.histogram = ScoreHistogram(resolution)
+
+    def add(self, results: Dict):
+        """Add one floor's DungeonQualityMetrics.evaluate() results"""
+        score = results['dungeon_quality_score']
+        self.dqs.add(score)
+        self.histogram.add(score)
+        for name, value in results['metrics'].items():
+            self.metrics[name].add(value)
+        self.grades[results['grade'][0]] += 1
+
+    def merge(self, other: 'GroupStats') -> 'GroupStats':
+        """Fold another group's statistics into this one"""
+        self.dqs.merge(other.dqs)
+        self.histogram.merge(other.histogram)
+        for name, stats in other.metrics.items():
+            self.metrics[name].merge(stats)
+        for grade, count in other.grades.items():
+            self.grades[grade] += count
+        return self
+
+    def summary(self, quantiles: Sequence[float] = DEFAULT_QUANTILES) -> Dict:
+        """Statistics of the group as a dictionary"""
+        dqs = self.dqs.summary()
+        dqs['quantiles'] = {q: self.histogram.quantile(q) for q in quantiles}
+        return {
+            'count': self.dqs.count,
+            'dungeon_quality_score': dqs,
+            'metrics': {name: stats.summary() for name, stats in self.metrics.items()},
+            'grades': dict(self.grades)
+        }
+
+
+class DQSAggregator:
+    """
+    Streaming DQS statistics grouped by floor tier and biome
+
+    Each (tier, biome) group keeps a fixed amount of state however many
+    floors are added, so sweeps no longer need to hold on to every
+    evaluate() result. Aggregators are picklable and merge() exactly, so
+    workers can each fill one and the parent combines them.
+    """
+
+    def __init__(self, resolution: int = 1000):
+        """
+        Args:
+            resolution: Histogram bins per unit of DQS for the quantiles
+        """
+        self.resolution = resolution
+        self.groups: Dict[Tuple[str, Optional[str]], GroupStats] = {}
+
+    def add(self, floor_number: int, biome: Optional[str], results: Dict):
+        """
+        Add one floor's evaluation
+
+        Args:
+            floor_number: Floor the results belong to
+            biome: Biome of the floor
+            results: DungeonQualityMetrics.evaluate() results
+        """
+        key = (floor_tier(floor_number), biome)
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = GroupStats(self.resolution)
+        group.add(results)
+
+    def add_all(self, evaluated: Iterable):
+        """Add (dungeon, results) pairs, e.g. from generate_tower_parallel(evaluate=True)"""
+        for dungeon, results in evaluated:
+            self.add(dungeon.floor_number, dungeon.biome, results)
+
+    def merge(self, other: 'DQSAggregator') -> 'DQSAggregator':
+        """Fold another aggregator (e.g. a worker's) into this one"""
+        for key, stats in other.groups.items():
+            group = self.groups.get(key)
+            if group is None:
+                group = self.groups[key] = GroupStats(self.resolution)
+            group.merge(stats)
+        return self
+
+    def __len__(self):
+        return sum(group.dqs.count for group in self.groups.values())
+
+    def summary(self, by: Optional[str] = None, quantiles: Sequence[float] = DEFAULT_QUANTILES) -> Dict:
+        """
+        Summarize the statistics
+
+        Args:
+            by: 'tier' or 'biome' to combine the groups along one key, or
+                None for one entry per (tier, biome) pair
+            quantiles: DQS percentiles to report, between 0 and 100
+
+        Returns:
+            {group key: statistics}; see overall() for every floor together
+        """
+        if by is not None and by not in GROUPINGS:
+            raise ValueError(f"Unknown grouping {by!r}, expected one of {GROUPINGS} or None")
+
+        combined: Dict = {}
+        for (tier, biome), stats in self.groups.items():
+            key = (tier, biome) if by is None else (tier if by == 'tier' else biome)
+            group = combined.get(key)
+            if group is None:
+                group = combined[key] = GroupStats(self.resolution)
+            group.merge(stats)
+
+        return {key: group.summary(quantiles) for key, group in combined.items()}
+
+    def overall(self, quantiles: Sequence[float] = DEFAULT_QUANTILES) -> Dict:
+        """
+        Summarize every floor added, whatever its group
+
+        Args:
+            quantiles: DQS percentiles to report, between 0 and 100
+
+        Returns:
+            Statistics in the same form as each entry of summary()
+        """
+        overall = GroupStats(self.resolution)
+        for stats in self.groups.values():
+            overall.merge(stats)
+        return overall.summary(quantiles)
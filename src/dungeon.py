@@ -3,8 +3,11 @@ Dungeon Module
 Main dungeon class representing a single floor
 """
 
-from typing import List, Tuple, Optional
+from array import array
+from collections import abc
+from typing import Dict, Iterator, List, Sequence, Tuple, Optional
 from enum import Enum
+from .disjoint_set import DisjointSet
 
 
 class TileType(Enum):
@@ -17,10 +20,227 @@ class TileType(Enum):
     EXIT = 'X'
     EMPTY = ' '
 
+    @property
+    def code(self) -> int:
+        """Return the one-byte code used to store this tile in a TileGrid"""
+        return TILE_CODES[self]
+
+    @staticmethod
+    def from_code(code: int) -> 'TileType':
+        """Return the tile type stored under a TileGrid byte code"""
+        return TILE_TYPES[code]
+
+
+# Byte codes for the packed grid. EMPTY is 0 so a fresh bytearray is a blank floor.
+TILE_CODES = {
+    TileType.EMPTY: 0,
+    TileType.WALL: 1,
+    TileType.FLOOR: 2,
+    TileType.CORRIDOR: 3,
+    TileType.DOOR: 4,
+    TileType.ENTRANCE: 5,
+    TileType.EXIT: 6,
+}
+TILE_TYPES = tuple(sorted(TILE_CODES, key=TILE_CODES.get))
+
+EMPTY = TILE_CODES[TileType.EMPTY]
+WALL = TILE_CODES[TileType.WALL]
+FLOOR = TILE_CODES[TileType.FLOOR]
+CORRIDOR = TILE_CODES[TileType.CORRIDOR]
+
+WALKABLE_CODES = frozenset(TILE_CODES[t] for t in (
+    TileType.FLOOR, TileType.CORRIDOR, TileType.DOOR, TileType.ENTRANCE, TileType.EXIT
+))
+
+# bytes.translate table mapping every tile code to 1 if walkable, else 0
+WALKABLE_TABLE = bytes(1 if code in WALKABLE_CODES else 0 for code in range(256))
+
+
+class TileGrid:
+    """
+    Packed row-major tile storage, one byte per tile
+
+    Tiles are stored as TILE_CODES values in a single buffer, so a floor costs
+    width * height bytes instead of a Python object pointer per tile. Any
+    writable buffer (bytearray, memoryview) of the right size can back the grid.
+    """
+
+    def __init__(self, width: int, height: int, buffer=None, owner=None):
+        """
+        Args:
+            width, height: Grid size in tiles
+            buffer: Optional writable buffer of width * height tile codes to
+                use in place (not copied); a new blank bytearray by default
+            owner: Optional object that keeps buffer valid, held for as long
+                as the grid lives (e.g. a shared memory mapping)
+        """
+        self.width = width
+        self.height = height
+        if buffer is None:
+            buffer = bytearray(width * height)
+        elif len(buffer) != width * height:
+            raise ValueError(f"Grid buffer holds {len(buffer)} bytes, expected {width * height}")
+        self.cells = buffer
+        self.owner = owner
+
+    def index(self, x: int, y: int) -> int:
+        """Return the flat buffer index of a position"""
+        return y * self.width + x
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        """Check if a position lies on the grid"""
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def get(self, x: int, y: int) -> int:
+        """Get the tile code at an in-bounds position"""
+        return self.cells[y * self.width + x]
+
+    def set(self, x: int, y: int, code: int):
+        """Set the tile code at an in-bounds position"""
+        self.cells[y * self.width + x] = code
+
+    def fill_rect(self, x: int, y: int, width: int, height: int, code: int):
+        """
+        Set every tile in a rectangle to code, clipped to the grid
+
+        The rectangle is clipped once and then written one slice per row, or as
+        a single strided slice when it is one tile wide.
+        """
+        x0, x1 = max(x, 0), min(x + width, self.width)
+        y0, y1 = max(y, 0), min(y + height, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        cells = self.cells
+        stride = self.width
+        if x1 - x0 == 1:
+            start = y0 * stride + x0
+            cells[start:y1 * stride:stride] = bytes((code,)) * (y1 - y0)
+            return
+
+        run = bytes((code,)) * (x1 - x0)
+        start = y0 * stride + x0
+        for _ in range(y1 - y0):
+            cells[start:start + len(run)] = run
+            start += stride
+
+    def row(self, y: int) -> bytes:
+        """Return a copy of one row of tile codes"""
+        start = y * self.width
+        return bytes(self.cells[start:start + self.width])
+
+    def rows(self):
+        """Iterate over all rows of tile codes, top to bottom"""
+        for y in range(self.height):
+            yield self.row(y)
+
+    def translate(self, table: bytes) -> bytes:
+        """Map every tile code through a 256-byte table, whatever buffer backs the grid"""
+        cells = self.cells
+        if not isinstance(cells, (bytes, bytearray)):
+            # memoryviews (shared memory, archive mappings) have no translate()
+            cells = bytes(cells)
+        return cells.translate(table)
+
+    def copy(self) -> 'TileGrid':
+        """Return an independent copy of the grid"""
+        return TileGrid(self.width, self.height, bytearray(self.cells))
+
+    def __len__(self):
+        return self.height
+
+    def __repr__(self):
+        return f"TileGrid({self.width}x{self.height})"
+
+
+class Placements:
+    """
+    Struct-of-arrays store of the things placed on a floor
+
+    Each placement is one entry in four parallel int arrays: catalog ID,
+    x, y and the ID of the room it is in. names maps catalog IDs back to
+    names (it is the catalog table's own tuple, not a copy), so names are
+    only looked up when something asks for them.
+    """
+
+    __slots__ = ('names', 'ids', 'x', 'y', 'rooms')
+
+    def __init__(self, names: Sequence[str] = ()):
+        self.names = names
+        self.ids = array('i')
+        self.x = array('i')
+        self.y = array('i')
+        self.rooms = array('i')
+
+    def add(self, catalog_id: int, x: int, y: int, room_id: int):
+        """Record one placement"""
+        self.ids.append(catalog_id)
+        self.x.append(x)
+        self.y.append(y)
+        self.rooms.append(room_id)
+
+    def name(self, index: int) -> str:
+        """Resolve the name of the placement at index"""
+        return self.names[self.ids[index]]
+
+    def counts(self) -> Dict[int, int]:
+        """Count placements per catalog ID"""
+        counts: Dict[int, int] = {}
+        for catalog_id in self.ids:
+            counts[catalog_id] = counts.get(catalog_id, 0) + 1
+        return counts
+
+    def named_counts(self) -> Dict[str, int]:
+        """Count placements per name, resolving each distinct ID once"""
+        names = self.names
+        return {names[catalog_id]: count for catalog_id, count in self.counts().items()}
+
+    def in_room(self, room_id: int) -> Tuple[Tuple[str, Tuple[int, int]], ...]:
+        """Return the (name, (x, y)) placements inside one room"""
+        names, ids, xs, ys = self.names, self.ids, self.x, self.y
+        return tuple((names[ids[i]], (xs[i], ys[i])) for i, room in enumerate(self.rooms) if room == room_id)
+
+    def __iter__(self) -> Iterator[Tuple[int, int, int]]:
+        """Iterate over placements as (catalog ID, x, y)"""
+        return zip(self.ids, self.x, self.y)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class PositionView(abc.Sequence):
+    """Read-only sequence of the (x, y) positions held in a Placements store"""
+
+    __slots__ = ('placements',)
+
+    def __init__(self, placements: Placements):
+        self.placements = placements
+
+    def __len__(self):
+        return len(self.placements.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(zip(self.placements.x[index], self.placements.y[index]))
+        return (self.placements.x[index], self.placements.y[index])
+
+    def __iter__(self):
+        return zip(self.placements.x, self.placements.y)
+
+    def __eq__(self, other):
+        if not isinstance(other, abc.Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(a == tuple(b) for a, b in zip(self, other))
+
+    def __repr__(self):
+        return repr(list(self))
+
 
 class Room:
     """Represents a single room in the dungeon"""
 
+    __slots__ = ('x', 'y', 'width', 'height', 'room_id', 'center', 'is_boss_room', 'floor')
+
     def __init__(self, x: int, y: int, width: int, height: int, room_id: int):
         self.x = x
         self.y = y
@@ -28,9 +248,19 @@ class Room:
         self.height = height
         self.room_id = room_id
         self.center = (x + width // 2, y + height // 2)
-        self.enemies = []
-        self.resources = []
         self.is_boss_room = False
+        # Dungeon the room belongs to, set when it is added
+        self.floor: Optional['Dungeon'] = None
+
+    @property
+    def enemies(self) -> Tuple[Tuple[str, Tuple[int, int]], ...]:
+        """(name, (x, y)) of each enemy in the room, read from the dungeon's placement arrays"""
+        return self.floor.enemy_placements.in_room(self.room_id) if self.floor is not None else ()
+
+    @property
+    def resources(self) -> Tuple[Tuple[str, Tuple[int, int]], ...]:
+        """(name, (x, y)) of each resource in the room, read from the dungeon's placement arrays"""
+        return self.floor.resource_placements.in_room(self.room_id) if self.floor is not None else ()
 
     def contains_point(self, x: int, y: int) -> bool:
         """Check if a point is within this room"""
@@ -45,84 +275,307 @@ class Room:
 
 
 class Dungeon:
-    """Main dungeon class representing a single floor"""
+    """
+    Main dungeon class representing a single floor
 
-    def __init__(self, width: int, height: int, floor_number: int):
+    add_room() and create_corridor() keep a union-find over the rooms and
+    corridors carved so far, with the element owning each walkable tile, so
+    questions like "are all rooms connected?" are answered without flood
+    filling the grid. An edit that walls off a walkable tile (a room stamped
+    over a corridor) cannot be undone in a union-find; it marks the
+    structure stale and the next query relabels the grid once. Floors built
+    around an existing grid are relabeled the same way, on their first
+    query; after editing self.grid directly, call invalidate_connectivity().
+
+    The per-tile owners cost four bytes a tile, so they are only allocated
+    once a floor starts being carved or queried, and release_connectivity()
+    hands them back when no more queries are expected (the generator calls
+    it once a floor is finished).
+    """
+
+    def __init__(self, width: int, height: int, floor_number: int, grid: Optional[TileGrid] = None):
         self.width = width
         self.height = height
         self.floor_number = floor_number
-        self.grid = [[TileType.EMPTY for _ in range(width)] for _ in range(height)]
+        self.seed = None
+        self.grid = grid if grid is not None else TileGrid(width, height)
         self.rooms: List[Room] = []
         self.biome = None
-        self.enemies = []
-        self.resources = []
+        self.enemy_placements = Placements()
+        self.resource_placements = Placements()
         self.entrance_pos = None
         self.exit_pos = None
+        self.placement_stats = {}
+        # Bumped by add_room() and create_corridor(), so caches of derived
+        # data (see quality_metrics.EvaluationContext) know when to recompute
+        self.revision = 0
+        # Connectivity: union-find over rooms and corridors, and the element
+        # owning each walkable tile (-1 for tiles that are not walkable);
+        # both None until the first edit or query
+        self._links: Optional[DisjointSet] = None
+        self._owner: Optional[array] = None
+        self._stale = grid is not None
+
+    @property
+    def enemies(self) -> PositionView:
+        """Positions of all placed enemies, in placement order"""
+        return PositionView(self.enemy_placements)
+
+    @property
+    def resources(self) -> PositionView:
+        """Positions of all placed resources, in placement order"""
+        return PositionView(self.resource_placements)
 
     def add_room(self, room: Room):
         """Add a room to the dungeon and update the grid"""
+        room.floor = self
         self.rooms.append(room)
+        self.revision += 1
         # Fill room with floor tiles
-        for y in range(room.y, room.y + room.height):
-            for x in range(room.x, room.x + room.width):
-                if 0 <= x < self.width and 0 <= y < self.height:
-                    self.grid[y][x] = TileType.FLOOR
+        self.grid.fill_rect(room.x, room.y, room.width, room.height, FLOOR)
         # Add walls around the room
         self._add_room_walls(room)
+        if not self._stale:
+            self._start_tracking()
+            self._link_room(room)
+
+    def _link_room(self, room: Room):
+        """Give a freshly stamped room its own element, joined to any walkable tiles it took over"""
+        width = self.width
+        x0, x1 = max(room.x, 0), min(room.x + room.width, width)
+        y0, y1 = max(room.y, 0), min(room.y + room.height, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        # The floor left inside the walls _add_room_walls() put up
+        inner_x0 = max(room.x + 1, x0) if room.x > 0 else x0
+        inner_x1 = min(room.x + room.width - 1, x1) if room.x + room.width < width else x1
+        inner_y0 = max(room.y + 1, y0) if room.y > 0 else y0
+        inner_y1 = min(room.y + room.height - 1, y1) if room.y + room.height < self.height else y1
+
+        links, owner = self._links, self._owner
+        element = links.add()
+        for y in range(y0, y1):
+            start = y * width
+            if max(owner[start + x0:start + x1]) < 0:
+                continue
+            # The room covers tiles that were already walkable
+            for x in range(x0, x1):
+                before = owner[start + x]
+                if before < 0:
+                    continue
+                if not (inner_x0 <= x < inner_x1 and inner_y0 <= y < inner_y1):
+                    # Walled off: the union-find cannot split, relabel on the next query
+                    self._stale = True
+                    return
+                links.union(element, before)
+
+        if inner_x0 < inner_x1:
+            run = array('i', [element]) * (inner_x1 - inner_x0)
+            for y in range(inner_y0, inner_y1):
+                owner[y * width + inner_x0:y * width + inner_x1] = run
 
     def _add_room_walls(self, room: Room):
         """Add walls around a room"""
         # Top and bottom walls
-        for x in range(room.x, room.x + room.width):
-            if 0 <= x < self.width:
-                if room.y > 0:
-                    self.grid[room.y][x] = TileType.WALL
-                if room.y + room.height < self.height:
-                    self.grid[room.y + room.height - 1][x] = TileType.WALL
+        if room.y > 0:
+            self.grid.fill_rect(room.x, room.y, room.width, 1, WALL)
+        if room.y + room.height < self.height:
+            self.grid.fill_rect(room.x, room.y + room.height - 1, room.width, 1, WALL)
         # Left and right walls
-        for y in range(room.y, room.y + room.height):
-            if 0 <= y < self.height:
-                if room.x > 0:
-                    self.grid[y][room.x] = TileType.WALL
-                if room.x + room.width < self.width:
-                    self.grid[y][room.x + room.width - 1] = TileType.WALL
-
-    def create_corridor(self, start: Tuple[int, int], end: Tuple[int, int]):
-        """Create a corridor between two points using L-shaped path"""
+        if room.x > 0:
+            self.grid.fill_rect(room.x, room.y, 1, room.height, WALL)
+        if room.x + room.width < self.width:
+            self.grid.fill_rect(room.x + room.width - 1, room.y, 1, room.height, WALL)
+
+    def create_corridor(self, start: Tuple[int, int], end: Tuple[int, int],
+                        changed: Optional[List[int]] = None):
+        """
+        Create a corridor between two points using L-shaped path
+
+        Args:
+            start: First end point
+            end: Second end point
+            changed: Optional list that receives the flat index of every tile
+                turned into corridor
+        """
         x1, y1 = start
         x2, y2 = end
+        self.revision += 1
+
+        cells = self.grid.cells
+        width = self.width
+        track = not self._stale
+        if track:
+            self._start_tracking()
+        owner = self._owner
+        element = self._links.add() if track else -1
 
         # Horizontal then vertical
-        for x in range(min(x1, x2), max(x1, x2) + 1):
-            if 0 <= x < self.width and 0 <= y1 < self.height:
-                current_tile = self.grid[y1][x]
-                # Carve through empty space and walls, but not floors
-                if current_tile in [TileType.EMPTY, TileType.WALL]:
-                    self.grid[y1][x] = TileType.CORRIDOR
-                elif current_tile == TileType.FLOOR:
-                    # Already a room floor, leave it
-                    pass
-
-        for y in range(min(y1, y2), max(y1, y2) + 1):
-            if 0 <= x2 < self.width and 0 <= y < self.height:
-                current_tile = self.grid[y][x2]
-                # Carve through empty space and walls, but not floors
-                if current_tile in [TileType.EMPTY, TileType.WALL]:
-                    self.grid[y][x2] = TileType.CORRIDOR
-                elif current_tile == TileType.FLOOR:
-                    # Already a room floor, leave it
-                    pass
+        if 0 <= y1 < self.height:
+            x_start, x_stop = max(min(x1, x2), 0), min(max(x1, x2) + 1, width)
+            for x in range(x_start, x_stop):
+                i = y1 * width + x
+                # Carve through empty space and walls, but leave room floors alone
+                if cells[i] == EMPTY or cells[i] == WALL:
+                    cells[i] = CORRIDOR
+                    if changed is not None:
+                        changed.append(i)
+                    if track:
+                        owner[i] = element
+            if track and x_start < x_stop:
+                self._link_segment(element, y1 * width + x_start, y1 * width + x_stop, 1,
+                                   (width, -width), x_start > 0, x_stop < width)
+
+        if 0 <= x2 < width:
+            y_start, y_stop = max(min(y1, y2), 0), min(max(y1, y2) + 1, self.height)
+            for y in range(y_start, y_stop):
+                i = y * width + x2
+                if cells[i] == EMPTY or cells[i] == WALL:
+                    cells[i] = CORRIDOR
+                    if changed is not None:
+                        changed.append(i)
+                    if track:
+                        owner[i] = element
+            if track and y_start < y_stop:
+                self._link_segment(element, y_start * width + x2, (y_stop - 1) * width + x2 + 1, width,
+                                   tuple(side for side, present in ((1, x2 < width - 1), (-1, x2 > 0))
+                                         if present), y_start > 0, y_stop < self.height)
+
+    def _link_segment(self, element: int, start: int, stop: int, step: int, sides: Tuple[int, ...],
+                      open_before: bool, open_after: bool):
+        """
+        Join a straight corridor segment to everything walkable along and around it
+
+        Walkable neighbors are always in one set, so a single union per
+        distinct owner of the segment's tiles, the lines beside it and the
+        tiles just past its ends covers every adjacency.
+
+        Args:
+            element: The corridor's element
+            start, stop, step: Flat index slice of the segment
+            sides: Flat offsets of the lines beside the segment that lie on the grid
+            open_before, open_after: Whether the tiles before start and after
+                the segment's last tile lie on the grid
+        """
+        owner = self._owner
+        along = set(owner[start:stop:step])
+        if -1 in along:
+            # Walkable but never tracked: the grid was edited directly
+            self._stale = True
+            return
+
+        size = len(owner)
+        for side in sides:
+            if 0 <= start + side and stop + side <= size:
+                along.update(owner[start + side:stop + side:step])
+        if open_before:
+            along.add(owner[start - step])
+        if open_after:
+            along.add(owner[stop - 1 + step])
+
+        along.discard(-1)
+        along.discard(element)
+        for other in along:
+            self._links.union(element, other)
+
+    def _relabel(self):
+        """Rebuild the connectivity from the grid, one element per run of walkable tiles in a row"""
+        width = self.width
+        links = DisjointSet()
+        owner = array('i', [-1]) * (width * self.height)
+        mask = self.walkable_mask()
+        above = []
+        for y in range(self.height):
+            row = y * width
+            runs = []
+            x = mask.find(1, row, row + width)
+            while x != -1:
+                end = mask.find(0, x, row + width)
+                if end == -1:
+                    end = row + width
+                element = links.add()
+                owner[x:end] = array('i', [element]) * (end - x)
+                # Join the runs of the row above that overlap this one
+                for start_above, end_above, element_above in above:
+                    if start_above < end - width and x - width < end_above:
+                        links.union(element, element_above)
+                runs.append((x, end, element))
+                x = mask.find(1, end, row + width)
+            above = runs
+        self._links, self._owner, self._stale = links, owner, False
+
+    def _start_tracking(self):
+        """Allocate the connectivity of a floor carved from scratch on its first edit"""
+        if self._owner is None:
+            self._links = DisjointSet()
+            self._owner = array('i', [-1]) * (self.width * self.height)
+
+    def release_connectivity(self):
+        """Free the connectivity tracked so far; the next query rebuilds it from the grid"""
+        self._links = self._owner = None
+        self._stale = True
+
+    def invalidate_connectivity(self):
+        """Relabel the connectivity on the next query, e.g. after editing self.grid directly"""
+        self._stale = True
+
+    def tile_component(self, x: int, y: int) -> int:
+        """
+        Return an ID of the walkable region containing a position
+
+        Two positions are connected exactly when their IDs are equal. IDs
+        are only comparable until the floor is next changed.
+
+        Returns:
+            Region ID, or -1 when the position is off the grid or not walkable
+        """
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return -1
+        if self._stale or self._owner is None:
+            self._relabel()
+        element = self._owner[y * self.width + x]
+        return self._links.find(element) if element >= 0 else -1
+
+    def connected_rooms(self) -> int:
+        """
+        Count the rooms whose center is connected to the first room's center
+
+        Matches the connected_rooms count of
+        PathfindingValidator.validate_connectivity() without searching the grid.
+        """
+        if not self.rooms:
+            return 0
+        first = self.tile_component(*self.rooms[0].center)
+        if first < 0:
+            return 0
+        return sum(1 for room in self.rooms if self.tile_component(*room.center) == first)
+
+    def rooms_connected(self) -> bool:
+        """Check that every room can be reached from every other one"""
+        return self.connected_rooms() == len(self.rooms)
+
+    def __getstate__(self):
+        # The connectivity is rebuilt from the grid on demand rather than pickled
+        state = self.__dict__.copy()
+        state.update(_links=None, _owner=None, _stale=True)
+        return state
 
     def get_tile(self, x: int, y: int) -> TileType:
         """Get tile type at position"""
         if 0 <= x < self.width and 0 <= y < self.height:
-            return self.grid[y][x]
+            return TILE_TYPES[self.grid.cells[y * self.width + x]]
         return TileType.EMPTY
 
     def is_walkable(self, x: int, y: int) -> bool:
         """Check if a position is walkable"""
-        tile = self.get_tile(x, y)
-        return tile in [TileType.FLOOR, TileType.CORRIDOR, TileType.DOOR, TileType.ENTRANCE, TileType.EXIT]
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.grid.cells[y * self.width + x] in WALKABLE_CODES
+        return False
+
+    def walkable_mask(self) -> bytearray:
+        """Return a flat row-major mask with 1 for every walkable tile and 0 elsewhere"""
+        return bytearray(self.grid.translate(WALKABLE_TABLE))
 
     def __repr__(self):
         return f"Dungeon(floor={self.floor_number}, biome={self.biome}, rooms={len(self.rooms)})"
@@ -4,11 +4,12 @@ ADK Agent for Dungeon Ascend Generator
 Provides knowledge services and natural language dungeon generation
 """
 
-import json
 import os
 from typing import Dict, Optional, List
+from .catalog import get_catalog
 from .generator import DungeonGenerator
 from .renderer import ASCIIRenderer
+from .serialization import FloorArchive
 from .quality_metrics import DungeonQualityMetrics
 
 
@@ -22,42 +23,24 @@ class Eidolon7Agent:
     3. Evaluation Service - Analyze dungeon quality and provide feedback
     """
     
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", archive=None):
+        """
+        Args:
+            data_dir: Directory holding the biome, enemy and resource data
+            archive: Optional floor archive (a FloorArchive or the path of
+                one) that seeded floors are served from before generating them
+        """
         self.name = "EIDOLON-7"
         self.data_dir = data_dir
-        self.biomes_data = self._load_biomes()
-        self.enemies_data = self._load_enemies()
-        self.resources_data = self._load_resources()
+        self.archive = FloorArchive(archive) if isinstance(archive, (str, bytes, os.PathLike)) else archive
+        # Parsed once per process and shared with every other agent
+        catalog = get_catalog(data_dir)
+        self.biomes_data = catalog.biome_table.data
+        self.enemies_data = catalog.enemy_table.data
+        self.resources_data = catalog.resource_table.data
         self.generator = DungeonGenerator()
         self.renderer = ASCIIRenderer()
-        
-    def _load_biomes(self) -> Dict:
-        """Load biome data from JSON"""
-        path = os.path.join(self.data_dir, 'biomes.json')
-        try:
-            with open(path, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
-    
-    def _load_enemies(self) -> Dict:
-        """Load enemy data from JSON"""
-        path = os.path.join(self.data_dir, 'enemies.json')
-        try:
-            with open(path, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
-    
-    def _load_resources(self) -> Dict:
-        """Load resource data from JSON"""
-        path = os.path.join(self.data_dir, 'resources.json')
-        try:
-            with open(path, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
-    
+
     # =========================================================================
     # KNOWLEDGE SERVICE - ADK Natural Language Service for Dungeon Information
     # =========================================================================
@@ -81,10 +64,10 @@ class Eidolon7Agent:
         return {
             'name': biome_name,
             'theme': biome.get('theme', 'Unknown'),
-            'characteristics': biome.get('characteristics', []),
-            'resources': biome.get('resources', []),
-            'common_enemies': biome.get('common_enemies', []),
-            'mini_bosses': biome.get('mini_bosses', []),
+            'characteristics': list(biome.get('characteristics', [])),
+            'resources': list(biome.get('resources', [])),
+            'common_enemies': list(biome.get('common_enemies', [])),
+            'mini_bosses': list(biome.get('mini_bosses', [])),
             'mega_boss': biome.get('mega_boss', 'Unknown')
         }
     
@@ -107,7 +90,7 @@ class Eidolon7Agent:
         return {
             'name': enemy.get('name', enemy_name),
             'tier': enemy.get('tier', 'Unknown'),
-            'biomes': enemy.get('biomes', []),
+            'biomes': list(enemy.get('biomes', [])),
             'base_hp': enemy.get('base_hp', 0),
             'base_damage': enemy.get('base_damage', 0),
             'description': enemy.get('description', 'No description available')
@@ -132,7 +115,7 @@ class Eidolon7Agent:
         return {
             'name': resource.get('name', resource_name),
             'rarity': resource.get('rarity', 'Unknown'),
-            'biomes': resource.get('biomes', []),
+            'biomes': list(resource.get('biomes', [])),
             'description': resource.get('description', 'No description available')
         }
     
@@ -222,8 +205,8 @@ class Eidolon7Agent:
         
         biome = self.biomes_data[biome_name]
         return {
-            'common': biome.get('common_enemies', []),
-            'mini_bosses': biome.get('mini_bosses', []),
+            'common': list(biome.get('common_enemies', [])),
+            'mini_bosses': list(biome.get('mini_bosses', [])),
             'mega_boss': biome.get('mega_boss', 'None')
         }
     
@@ -242,7 +225,7 @@ class Eidolon7Agent:
         if biome_name not in self.biomes_data:
             return []
         
-        return self.biomes_data[biome_name].get('resources', [])
+        return list(self.biomes_data[biome_name].get('resources', []))
     
     # =========================================================================
     # GENERATION SERVICE - ADK Natural Language Dungeon Generation
@@ -259,17 +242,24 @@ class Eidolon7Agent:
             width: Dungeon width
             height: Dungeon height
             biome: Optional specific biome to use
-            seed: Optional random seed
+            seed: Optional random seed; a seeded floor found in the agent's
+                archive is loaded instead of generated
         
         Returns:
             Dictionary with dungeon, ASCII render, and quality metrics
         """
-        # Create generator with seed if provided
-        if seed is not None:
-            self.generator = DungeonGenerator(seed=seed)
-        
-        # Generate dungeon
-        dungeon = self.generator.generate(floor_number, width, height)
+        dungeon = None
+        if seed is not None and self.archive is not None and \
+                self.archive.size(seed, floor_number) == (width, height):
+            dungeon = self.archive.get(seed, floor_number)
+
+        if dungeon is None:
+            # Create generator with seed if provided
+            if seed is not None:
+                self.generator = DungeonGenerator(seed=seed)
+
+            # Generate dungeon, recording its seed so it can be archived
+            dungeon = self.generator.generate(floor_number, width, height, seed=seed)
         
         # Override biome if specified
         if biome:
@@ -4,8 +4,10 @@ Enemy data structures and spawn rules
 """
 
 import json
-from typing import Dict, List, Optional
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
 from pathlib import Path
+from .data_cache import DataTable, group_by, load_table
 from enum import Enum
 
 
@@ -19,8 +21,12 @@ class EnemyTier(Enum):
 class Enemy:
     """Represents an enemy with its properties"""
 
-    def __init__(self, name: str, data: dict):
+    __slots__ = ('name', 'tier', 'biomes', 'description', 'abilities', 'base_hp', 'base_damage', 'catalog_id')
+
+    def __init__(self, name: str, data: dict, catalog_id: int = -1):
         self.name = name
+        # Position in the EnemyTable that built this enemy (-1 outside a table)
+        self.catalog_id = catalog_id
         self.tier = EnemyTier(data.get('tier', 'common'))
         self.biomes = data.get('biomes', [])
         self.description = data.get('description', '')
@@ -45,6 +51,61 @@ class Enemy:
         return f"Enemy({self.name}, {self.tier.value})"
 
 
+class EnemyTable(DataTable):
+    """Parsed enemies.json with lookups by biome and tier"""
+
+    def __init__(self, data: Mapping):
+        super().__init__(data)
+        self.enemies: Mapping[str, Enemy] = MappingProxyType(
+            {name: Enemy(name, entry, catalog_id) for catalog_id, (name, entry) in enumerate(data.items())}
+        )
+        # Catalog ID -> enemy and name
+        self.by_id: Tuple[Enemy, ...] = tuple(self.enemies.values())
+        self.names: Tuple[str, ...] = tuple(self.enemies)
+        by_biome: Dict[str, list] = {}
+        mega_bosses: Dict[str, Enemy] = {}
+        for enemy in self.enemies.values():
+            # A biome listed twice must not double the enemy's spawn weight there
+            for biome in dict.fromkeys(enemy.biomes):
+                by_biome.setdefault(biome, []).append(enemy)
+                if enemy.tier == EnemyTier.MEGA_BOSS:
+                    mega_bosses.setdefault(biome, enemy)
+        self.by_biome: Mapping[str, Tuple[Enemy, ...]] = MappingProxyType(
+            {biome: tuple(enemies) for biome, enemies in by_biome.items()}
+        )
+        self.by_tier: Mapping[EnemyTier, Tuple[Enemy, ...]] = group_by(self.enemies.values(), lambda e: e.tier)
+        self.by_biome_tier: Mapping[Tuple[str, EnemyTier], Tuple[Enemy, ...]] = group_by(
+            ((biome, enemy) for biome, enemies in self.by_biome.items() for enemy in enemies),
+            lambda pair: (pair[0], pair[1].tier), lambda pair: pair[1]
+        )
+        # First mega boss listed for each biome
+        self.mega_boss_by_biome: Mapping[str, Enemy] = MappingProxyType(mega_bosses)
+
+    @staticmethod
+    def validate(data):
+        """Check parsed enemies.json data, raising ValueError on the first bad entry"""
+        tiers = {tier.value for tier in EnemyTier}
+        if not isinstance(data, dict):
+            raise ValueError("enemy data must be an object of enemies")
+        for name, entry in data.items():
+            if not isinstance(entry, dict):
+                raise ValueError(f"enemy {name!r}: expected an object")
+            if entry.get('tier', 'common') not in tiers:
+                raise ValueError(f"enemy {name!r}: unknown tier {entry.get('tier')!r}")
+            for field in ('biomes', 'abilities'):
+                values = entry.get(field, [])
+                if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+                    raise ValueError(f"enemy {name!r}: {field} must be a list of strings")
+            for field in ('base_hp', 'base_damage'):
+                if not isinstance(entry.get(field, 0), (int, float)):
+                    raise ValueError(f"enemy {name!r}: {field} must be a number")
+
+
+def load_enemy_table(path) -> EnemyTable:
+    """Return the process-wide cached EnemyTable for a JSON data file"""
+    return load_table(path, EnemyTable)
+
+
 class EnemyManager:
     """Manages enemy data and spawn logic"""
 
@@ -54,16 +115,15 @@ class EnemyManager:
             data_path = base_path / 'data' / 'enemies.json'
 
         self.data_path = data_path
-        self.enemies: Dict[str, Enemy] = {}
+        self.table = EnemyTable(MappingProxyType({}))
+        self.enemies: Mapping[str, Enemy] = self.table.enemies
         self.load_enemies()
 
     def load_enemies(self):
-        """Load enemy data from JSON file"""
+        """Load enemy data through the shared data cache"""
         try:
-            with open(self.data_path, 'r') as f:
-                data = json.load(f)
-                for enemy_name, enemy_data in data.items():
-                    self.enemies[enemy_name] = Enemy(enemy_name, enemy_data)
+            self.table = load_enemy_table(self.data_path)
+            self.enemies = self.table.enemies
         except FileNotFoundError:
             print(f"Warning: Enemy data file not found at {self.data_path}")
         except json.JSONDecodeError as e:
@@ -73,18 +133,22 @@ class EnemyManager:
         """Get an enemy by name"""
         return self.enemies.get(name)
 
-    def get_enemies_for_biome(self, biome: str, tier: Optional[EnemyTier] = None) -> List[Enemy]:
-        """Get all enemies that can spawn in a biome, optionally filtered by tier"""
-        result = []
-        for enemy in self.enemies.values():
-            if enemy.can_spawn_in_biome(biome):
-                if tier is None or enemy.tier == tier:
-                    result.append(enemy)
-        return result
+    def get_enemy_by_id(self, catalog_id: int) -> Optional[Enemy]:
+        """Get an enemy by its catalog ID"""
+        by_id = self.table.by_id
+        return by_id[catalog_id] if 0 <= catalog_id < len(by_id) else None
+
+    def get_enemies_for_biome(self, biome: str, tier: Optional[EnemyTier] = None) -> Tuple[Enemy, ...]:
+        """
+        Get all enemies that can spawn in a biome, optionally filtered by tier
+
+        Answered from indexes built at load time; the returned tuple is shared,
+        not copied.
+        """
+        if tier is None:
+            return self.table.by_biome.get(biome, ())
+        return self.table.by_biome_tier.get((biome, tier), ())
 
     def get_mega_boss_for_biome(self, biome: str) -> Optional[Enemy]:
         """Get the mega boss for a specific biome"""
-        for enemy in self.enemies.values():
-            if enemy.tier == EnemyTier.MEGA_BOSS and enemy.can_spawn_in_biome(biome):
-                return enemy
-        return None
+        return self.table.mega_boss_by_biome.get(biome)
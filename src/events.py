@@ -0,0 +1,139 @@
+"""
+Events Module
+Typed records describing each change made while a floor is generated
+"""
+
+import time
+from typing import List, Optional, Tuple
+
+
+class GenerationEvent:
+    """
+    Base class for generation events
+
+    Every event records what changed and when (time.perf_counter() at the
+    moment it happened), so a consumer can follow a floor being built with
+    work proportional to the changes rather than rescanning the grid.
+    """
+
+    kind = 'event'
+
+    def __init__(self, floor_number: int, timestamp: Optional[float] = None):
+        self.floor_number = floor_number
+        self.timestamp = time.perf_counter() if timestamp is None else timestamp
+
+    def __repr__(self):
+        fields = ", ".join(f"{key}={value!r}" for key, value in vars(self).items() if key != 'timestamp')
+        return f"{type(self).__name__}({fields})"
+
+
+class BiomeSelected(GenerationEvent):
+    """The floor's biome was chosen"""
+
+    kind = 'biome'
+
+    def __init__(self, floor_number: int, biome: str, timestamp: Optional[float] = None):
+        super().__init__(floor_number, timestamp)
+        self.biome = biome
+
+
+class RoomPlaced(GenerationEvent):
+    """
+    A room was stamped into the grid
+
+    The room covers the rectangle (x, y, width, height): walls on its border
+    and floor inside, clipped to the grid.
+    """
+
+    kind = 'room'
+
+    def __init__(self, floor_number: int, room_id: int, x: int, y: int, width: int, height: int,
+                 is_boss_room: bool = False, timestamp: Optional[float] = None):
+        super().__init__(floor_number, timestamp)
+        self.room_id = room_id
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.is_boss_room = is_boss_room
+
+    @property
+    def rect(self) -> Tuple[int, int, int, int]:
+        """The room rectangle as (x, y, width, height)"""
+        return (self.x, self.y, self.width, self.height)
+
+
+class CorridorCarved(GenerationEvent):
+    """
+    A corridor was carved between two points
+
+    tiles lists only the (x, y) positions that actually became corridor;
+    tiles that were already room floor or corridor are left out.
+    """
+
+    kind = 'corridor'
+
+    def __init__(self, floor_number: int, start: Tuple[int, int], end: Tuple[int, int],
+                 tiles: List[Tuple[int, int]], timestamp: Optional[float] = None):
+        super().__init__(floor_number, timestamp)
+        self.start = start
+        self.end = end
+        self.tiles = tiles
+
+
+class EnemyPlaced(GenerationEvent):
+    """An enemy was placed in a room"""
+
+    kind = 'enemy'
+
+    def __init__(self, floor_number: int, name: str, tier: str, position: Tuple[int, int], room_id: int,
+                 catalog_id: int = -1, timestamp: Optional[float] = None):
+        super().__init__(floor_number, timestamp)
+        self.name = name
+        self.catalog_id = catalog_id
+        self.tier = tier
+        self.position = position
+        self.room_id = room_id
+
+
+class ResourcePlaced(GenerationEvent):
+    """A resource was placed in a room"""
+
+    kind = 'resource'
+
+    def __init__(self, floor_number: int, name: str, rarity: str, position: Tuple[int, int], room_id: int,
+                 catalog_id: int = -1, timestamp: Optional[float] = None):
+        super().__init__(floor_number, timestamp)
+        self.name = name
+        self.catalog_id = catalog_id
+        self.rarity = rarity
+        self.position = position
+        self.room_id = room_id
+
+
+class FloorCompleted(GenerationEvent):
+    """Generation of the floor finished; no further events follow for it"""
+
+    kind = 'complete'
+
+
+class EventLog:
+    """
+    Event consumer that simply keeps every event
+
+    Pass an EventLog as on_event to DungeonGenerator.generate() to record a
+    floor's generation, e.g. for replay.
+    """
+
+    def __init__(self):
+        self.events: List[GenerationEvent] = []
+
+    def __call__(self, event: GenerationEvent):
+        self.events.append(event)
+
+    def of_kind(self, kind: str) -> List[GenerationEvent]:
+        """Return the recorded events of one kind, in order"""
+        return [event for event in self.events if event.kind == kind]
+
+    def __len__(self):
+        return len(self.events)
@@ -3,24 +3,85 @@ Generator Module
 Procedural generation algorithms for dungeon creation
 """
 
+import hashlib
 import random
-from typing import List, Tuple, Optional
+import time
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple, Optional
 from .dungeon import Dungeon, Room, TileType
+from .events import (BiomeSelected, CorridorCarved, EnemyPlaced, FloorCompleted, ResourcePlaced,
+                     RoomPlaced)
+from .spatial_index import RoomIndex, GridRoomIndex
+from .placement import FreeSpaceMap, SizeDistribution
+from .quality_metrics import DQS_WEIGHTS, DungeonQualityMetrics, room_density_score
 from .enemy import EnemyManager, EnemyTier
 from .resource import ResourceManager, ResourceRarity
 
 
+def tower_floor_seed(master_seed: int, floor_number: int) -> int:
+    """Derive the deterministic sub-seed of one tower floor from the tower's master seed"""
+    digest = hashlib.sha256(f"{master_seed}:{floor_number}".encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+# Inclusive side ranges of the equally likely room kinds, and of boss rooms
+ROOM_KINDS = (('small', 3, 5), ('medium', 6, 10), ('large', 11, 15))
+BOSS_ROOM_SIDES = (12, 15)
+
+
+def _square_sizes(kinds: Iterable[Tuple[int, int]]) -> Tuple[Tuple[int, int, float], ...]:
+    """List every (width, height, probability) of square side ranges picked with equal chance"""
+    kinds = list(kinds)
+    sizes = []
+    for low, high in kinds:
+        probability = 1 / len(kinds) / (high - low + 1) ** 2
+        sizes.extend((width, height, probability)
+                     for width in range(low, high + 1) for height in range(low, high + 1))
+    return tuple(sizes)
+
+
+# The sizes _roll_room_size() returns, with their probabilities
+ROOM_SIZES = _square_sizes((low, high) for _, low, high in ROOM_KINDS)
+BOSS_ROOM_SIZES = _square_sizes([BOSS_ROOM_SIDES])
+
+
+def _passes_room(room: Room, start: Tuple[int, int], end: Tuple[int, int]) -> bool:
+    """Check whether the L-shaped corridor from start to end runs through or beside a room"""
+    (x1, y1), (x2, y2) = start, end
+    left, top = room.x - 1, room.y - 1
+    right, bottom = room.x + room.width, room.y + room.height
+    # Horizontal leg along y1, then vertical leg along x2
+    return ((top <= y1 <= bottom and min(x1, x2) <= right and max(x1, x2) >= left) or
+            (left <= x2 <= right and min(y1, y2) <= bottom and max(y1, y2) >= top))
+
+
 class DungeonGenerator:
     """Handles procedural generation of dungeon floors"""
 
-    def __init__(self, seed: Optional[int] = None):
+    PLACEMENTS = ('free_space', 'rejection')
+
+    def __init__(self, seed: Optional[int] = None, room_index=GridRoomIndex, placement: str = 'free_space'):
+        """
+        Args:
+            seed: Optional random seed for reproducible generation
+            room_index: RoomIndex class used for overlap checks by the
+                'rejection' placement, called as room_index(width, height)
+            placement: Room placement strategy, 'free_space' (sample only
+                valid positions) or 'rejection' (random positions, retry on overlap)
+        """
+        if placement not in self.PLACEMENTS:
+            raise ValueError(f"Unknown placement {placement!r}, expected one of {self.PLACEMENTS}")
         self.seed = seed
-        if seed is not None:
-            random.seed(seed)
+        self.room_index = room_index
+        self.placement = placement
+        # Each generator owns its random stream, so generators never disturb each other
+        self.rng = random.Random(seed)
         self.enemy_manager = EnemyManager()
         self.resource_manager = ResourceManager()
+        self._biome_cache: Dict[str, dict] = {}
+        self._size_distributions: Dict[Tuple[int, int, bool], SizeDistribution] = {}
 
-    def generate(self, floor_number: int, width: int = 60, height: int = 40, animate_callback=None) -> Dungeon:
+    def generate(self, floor_number: int, width: int = 60, height: int = 40, animate_callback=None,
+                 seed: Optional[int] = None, on_event=None) -> Dungeon:
         """
         Generate a complete dungeon floor
 
@@ -29,11 +90,36 @@ class DungeonGenerator:
             width: Dungeon grid width
             height: Dungeon grid height
             animate_callback: Optional callback function for animation (dungeon, message)
+            seed: Optional seed for this floor alone; reseeds generation first
+            on_event: Optional callable receiving a GenerationEvent (see the
+                events module) for every room, corridor, enemy and resource
+                placed, then a FloorCompleted event
 
         Returns:
             Generated Dungeon instance
         """
+        dungeon, params = self._generate_layout(floor_number, width, height, animate_callback, seed, on_event)
+        self._populate(dungeon, params, animate_callback, on_event)
+        return dungeon
+
+    def _generate_layout(self, floor_number: int, width: int, height: int, animate_callback=None,
+                         seed: Optional[int] = None, on_event=None, screen=None) -> Tuple[Dungeon, dict]:
+        """
+        Pick the biome and carve the rooms and corridors of a floor, returning it with its parameters
+
+        screen, when given, is called as screen(dungeon, params, corridors,
+        carved) once the rooms are placed and again after each corridor, with
+        the (start, end) of every corridor the floor gets and how many of them
+        are carved; carving stops as soon as it returns False, leaving the
+        layout unfinished.
+        """
+        if seed is not None:
+            self.rng.seed(seed)
+
         dungeon = Dungeon(width, height, floor_number)
+        dungeon.seed = seed
+        dungeon.enemy_placements.names = self.enemy_manager.table.names
+        dungeon.resource_placements.names = self.resource_manager.table.names
 
         # Determine floor parameters based on progression
         params = self._get_floor_parameters(floor_number)
@@ -42,34 +128,244 @@ class DungeonGenerator:
         biome = self._select_biome(floor_number)
         dungeon.biome = biome
 
+        if on_event is not None:
+            on_event(BiomeSelected(floor_number, biome))
+
         if animate_callback:
             animate_callback(dungeon, f"Selected biome: {biome.upper()}")
 
         # Generate rooms
-        rooms = self._generate_rooms(dungeon, params['room_count'], params['is_boss_floor'], animate_callback)
+        rooms = self._generate_rooms(dungeon, params['room_count'], params['is_boss_floor'], animate_callback,
+                                     on_event)
 
         if animate_callback:
             animate_callback(dungeon, f"Generated {len(rooms)} rooms")
 
         # Connect rooms with corridors
-        self._connect_rooms(dungeon)
+        keep_going = None
+        if screen is not None:
+            keep_going = lambda corridors, carved: screen(dungeon, params, corridors, carved)
+        if not self._connect_rooms(dungeon, on_event, keep_going):
+            return dungeon, params
 
         if animate_callback:
             animate_callback(dungeon, "Connected rooms with corridors")
 
+        return dungeon, params
+
+    def _populate(self, dungeon: Dungeon, params: dict, animate_callback=None, on_event=None):
+        """Place the enemies and resources of a floor whose layout is done"""
         # Place enemies
-        self._place_enemies(dungeon, params)
+        self._place_enemies(dungeon, params, on_event)
 
         if animate_callback:
             animate_callback(dungeon, f"Placed {len(dungeon.enemies)} enemies")
 
         # Place resources
-        self._place_resources(dungeon)
+        self._place_resources(dungeon, on_event)
 
         if animate_callback:
             animate_callback(dungeon, f"Placed {len(dungeon.resources)} resources")
 
-        return dungeon
+        # Nothing queries the connectivity once the floor is finished; a
+        # later query rebuilds it from the grid
+        dungeon.release_connectivity()
+
+        if on_event is not None:
+            on_event(FloorCompleted(dungeon.floor_number))
+
+    def generate_until(self, floor_number: int, target_dqs: float, width: int = 60, height: int = 40,
+                       max_attempts: int = 50, seed: Optional[int] = None,
+                       require_all_rooms: bool = True) -> Tuple[Optional[Dungeon], Dict]:
+        """
+        Generate candidate floors until one scores a DQS of at least target_dqs
+
+        Each candidate's layout is screened while it is generated, before any
+        enemy or resource is placed or the full evaluation runs. It is given
+        up on, without carving its remaining corridors, when:
+        - fewer rooms were placed than the floor asked for ('room_count',
+          only with require_all_rooms); checked before any corridor is carved
+        - even with every resource reachable, the DQS could not reach the
+          target given the room density, the most walkable area and room
+          connectivity the remaining corridors could still give ('dqs_bound');
+          checked before the first corridor and after each one, using the
+          rooms connected so far as tracked by the dungeon's union-find
+
+        Candidates are generated with per-attempt seeds drawn from seed, and
+        each floor records its own, so the accepted one can be rebuilt with
+        generate(floor_number, width, height, seed=dungeon.seed).
+
+        Args:
+            floor_number: The floor level (1-100)
+            target_dqs: DQS to reach, compared with the rounded score
+            width: Dungeon grid width
+            height: Dungeon grid height
+            max_attempts: Candidates to try before giving up
+            seed: Optional seed of the attempt sequence (default: the
+                generator's seed, or a random one)
+            require_all_rooms: Reject layouts that placed fewer rooms than requested
+
+        Returns:
+            (dungeon, report): the first floor reaching the target, else the
+            best one fully evaluated (None if every candidate was rejected
+            early), and a dictionary with the attempt counts, rejection
+            reasons, time taken and the floor's evaluation results
+        """
+        if seed is None:
+            seed = self.seed if self.seed is not None else self.rng.randrange(2 ** 63)
+        attempt_seeds = random.Random(seed)
+
+        start_time = time.perf_counter()
+        rejections = {'room_count': 0, 'dqs_bound': 0}
+        best, best_results = None, None
+        attempts = evaluated = 0
+        rejected = []
+
+        def screen(dungeon: Dungeon, params: dict, corridors: List[Tuple[Tuple[int, int], Tuple[int, int]]],
+                   carved: int) -> bool:
+            reason = self._screen_layout(dungeon, params, target_dqs, require_all_rooms, corridors, carved)
+            if reason is not None:
+                rejected.append(reason)
+            return reason is None
+
+        while attempts < max_attempts:
+            attempts += 1
+            rejected.clear()
+            dungeon, params = self._generate_layout(floor_number, width, height,
+                                                    seed=attempt_seeds.randrange(2 ** 63), screen=screen)
+            if rejected:
+                rejections[rejected[0]] += 1
+                continue
+
+            self._populate(dungeon, params)
+            results = DungeonQualityMetrics(dungeon).evaluate()
+            evaluated += 1
+            if best_results is None or results['dungeon_quality_score'] > best_results['dungeon_quality_score']:
+                best, best_results = dungeon, results
+            if results['dungeon_quality_score'] >= target_dqs:
+                break
+
+        return best, {
+            'target': target_dqs,
+            'reached': best_results is not None and best_results['dungeon_quality_score'] >= target_dqs,
+            'attempts': attempts,
+            'evaluated': evaluated,
+            'rejected_early': attempts - evaluated,
+            'rejections': rejections,
+            'time_seconds': time.perf_counter() - start_time,
+            'seed': best.seed if best is not None else None,
+            'quality': best_results
+        }
+
+    def _screen_layout(self, dungeon: Dungeon, params: dict, target_dqs: float, require_all_rooms: bool,
+                       corridors: Sequence[Tuple[Tuple[int, int], Tuple[int, int]]] = (),
+                       carved: int = 0) -> Optional[str]:
+        """
+        Cheap checks of a layout being carved, for generate_until()
+
+        Args:
+            corridors: (start, end) of every corridor of the floor, see _corridors()
+            carved: How many of them are carved so far
+
+        Returns:
+            The reason to reject the layout, or None if it may reach the target
+        """
+        rooms = dungeon.rooms
+        if require_all_rooms and len(rooms) < params['room_count']:
+            return 'room_count'
+        if not rooms:
+            return 'dqs_bound'
+
+        # Rooms reachable from the first room, tracked by the dungeon as it is
+        # carved, plus those the remaining corridors could still reach
+        remaining = corridors[carved:]
+        connected = self._connected_rooms_bound(dungeon, corridors[:carved], remaining)
+
+        # Upper bound of the DQS: exact space efficiency, every walkable tile
+        # reachable (counting every tile of the remaining corridors as new)
+        # and every resource accessible
+        total_tiles = dungeon.width * dungeon.height
+        space_efficiency = room_density_score(sum(room.get_area() for room in rooms) / total_tiles)
+        walkable = dungeon.walkable_mask().count(1)
+        walkable += sum(abs(x2 - x1) + abs(y2 - y1) + 1 for (x1, y1), (x2, y2) in remaining)
+        pathability = min(walkable / total_tiles / 0.4, 1.0)
+        bound = (connected / len(rooms) * DQS_WEIGHTS['room_connectivity'] +
+                 DQS_WEIGHTS['resource_accessibility'] +
+                 pathability * DQS_WEIGHTS['pathability'] +
+                 space_efficiency * DQS_WEIGHTS['space_efficiency'])
+        if round(min(bound, 1.0), 3) < target_dqs:
+            return 'dqs_bound'
+        return None
+
+    @staticmethod
+    def _connected_rooms_bound(dungeon: Dungeon, carved: Sequence[Tuple[Tuple[int, int], Tuple[int, int]]],
+                               remaining: Sequence[Tuple[Tuple[int, int], Tuple[int, int]]]) -> int:
+        """
+        Most rooms that can end up connected to the first one once the remaining corridors are carved
+
+        Carving only ever joins walkable regions. A region can still be
+        joined if a remaining corridor starts or ends in it, passes through
+        or beside one of its rooms, or if it holds a carved corridor (whose
+        tiles the remaining ones might cross); any other region is final.
+        """
+        rooms = dungeon.rooms
+        regions = [dungeon.tile_component(*room.center) for room in rooms]
+        first = regions[0]
+        if first < 0:
+            return 0
+        if not remaining:
+            return regions.count(first)
+
+        open_regions = {first}
+        open_regions.update(dungeon.tile_component(*end) for corridor in remaining for end in corridor)
+        open_regions.update(dungeon.tile_component(*start) for start, _ in carved)
+        for room, region in zip(rooms, regions):
+            if region not in open_regions and any(_passes_room(room, start, end) for start, end in remaining):
+                open_regions.add(region)
+        return sum(1 for region in regions if region in open_regions)
+
+    def generate_tower(self, floors: Iterable[int] = range(1, 101), width: int = 60, height: int = 40,
+                       seed: Optional[int] = None, animate_callback=None, on_event=None) -> Iterator[Dungeon]:
+        """
+        Generate a whole tower, yielding each floor as soon as it is built
+
+        Every floor is generated from its own sub-seed, tower_floor_seed(seed,
+        floor_number), so a floor comes out the same whichever other floors
+        are generated with it, and can be rebuilt alone with
+        generate(floor_number, seed=tower_floor_seed(seed, floor_number)).
+        Enemy, resource and per-biome lookups are shared by all floors.
+
+        Args:
+            floors: Floor numbers to generate, in order
+            width: Dungeon grid width
+            height: Dungeon grid height
+            seed: Master seed of the tower, defaults to the generator's seed
+                (a random one is drawn if neither is set)
+            animate_callback: Optional callback function for animation (dungeon, message)
+            on_event: Optional GenerationEvent consumer, as in generate()
+
+        Yields:
+            Generated Dungeon instances, one per floor
+        """
+        if seed is None:
+            seed = self.seed if self.seed is not None else self.rng.randrange(2 ** 63)
+
+        for floor_number in floors:
+            yield self.generate(floor_number, width, height, animate_callback,
+                                seed=tower_floor_seed(seed, floor_number), on_event=on_event)
+
+    def _biome_tables(self, biome: str) -> dict:
+        """Return the enemy and resource lookups for a biome, built once per generator"""
+        tables = self._biome_cache.get(biome)
+        if tables is None:
+            tables = {
+                'common_enemies': self.enemy_manager.get_enemies_for_biome(biome, EnemyTier.COMMON),
+                'mini_bosses': self.enemy_manager.get_enemies_for_biome(biome, EnemyTier.MINI_BOSS),
+                'mega_boss': self.enemy_manager.get_mega_boss_for_biome(biome),
+                'resources': self.resource_manager.get_resources_for_biome(biome)
+            }
+            self._biome_cache[biome] = tables
+        return tables
 
     def _get_floor_parameters(self, floor_number: int) -> dict:
         """Determine parameters based on floor progression"""
@@ -78,9 +374,9 @@ class DungeonGenerator:
         if floor_number <= 10:
             # Tutorial Zone
             return {
-                'room_count': random.randint(4, 6),
+                'room_count': self.rng.randint(4, 6),
                 'enemy_density': 'low',
-                'enemy_count': random.randint(5, 8),
+                'enemy_count': self.rng.randint(5, 8),
                 'mini_boss_chance': 0.1,
                 'difficulty_multiplier': 1.0,
                 'is_boss_floor': is_boss_floor
@@ -88,9 +384,9 @@ class DungeonGenerator:
         elif floor_number <= 20:
             # Early Game
             return {
-                'room_count': random.randint(5, 8),
+                'room_count': self.rng.randint(5, 8),
                 'enemy_density': 'medium',
-                'enemy_count': random.randint(8, 12),
+                'enemy_count': self.rng.randint(8, 12),
                 'mini_boss_chance': 0.2,
                 'difficulty_multiplier': 1.2,
                 'is_boss_floor': is_boss_floor
@@ -98,9 +394,9 @@ class DungeonGenerator:
         elif floor_number <= 40:
             # Mid Game
             return {
-                'room_count': random.randint(7, 10),
+                'room_count': self.rng.randint(7, 10),
                 'enemy_density': 'high',
-                'enemy_count': random.randint(12, 18),
+                'enemy_count': self.rng.randint(12, 18),
                 'mini_boss_chance': 0.3,
                 'difficulty_multiplier': 1.8,
                 'is_boss_floor': is_boss_floor
@@ -108,9 +404,9 @@ class DungeonGenerator:
         elif floor_number <= 70:
             # Late-Mid Game
             return {
-                'room_count': random.randint(8, 12),
+                'room_count': self.rng.randint(8, 12),
                 'enemy_density': 'high',
-                'enemy_count': random.randint(15, 22),
+                'enemy_count': self.rng.randint(15, 22),
                 'mini_boss_chance': 0.4,
                 'difficulty_multiplier': 2.5,
                 'is_boss_floor': is_boss_floor
@@ -118,9 +414,9 @@ class DungeonGenerator:
         else:
             # Endgame
             return {
-                'room_count': random.randint(10, 15),
+                'room_count': self.rng.randint(10, 15),
                 'enemy_density': 'very_high',
-                'enemy_count': random.randint(18, 30),
+                'enemy_count': self.rng.randint(18, 30),
                 'mini_boss_chance': 0.5,
                 'difficulty_multiplier': 4.0,
                 'is_boss_floor': is_boss_floor
@@ -130,94 +426,189 @@ class DungeonGenerator:
         """Select biome based on floor progression"""
         if floor_number <= 10:
             # Early floors: simple biomes
-            return random.choice(['jungle', 'snow', 'swamp'])
+            return self.rng.choice(['jungle', 'snow', 'swamp'])
         elif floor_number <= 30:
             # Mid-early: all except astral
             biomes = ['jungle', 'snow', 'swamp', 'vampire', 'werewolf', 'rocky', 'satanic', 'fairy']
-            return random.choice(biomes)
+            return self.rng.choice(biomes)
         elif floor_number <= 70:
             # Late-mid: emphasis on themed biomes
             biomes = ['jungle', 'snow', 'swamp', 'vampire', 'vampire', 'werewolf', 'werewolf',
                      'rocky', 'satanic', 'satanic', 'fairy', 'astral_void']
-            return random.choice(biomes)
+            return self.rng.choice(biomes)
         else:
             # Endgame: emphasis on astral void
             biomes = ['jungle', 'snow', 'swamp', 'vampire', 'werewolf', 'rocky', 'satanic',
                      'fairy', 'astral_void', 'astral_void', 'astral_void']
-            return random.choice(biomes)
+            return self.rng.choice(biomes)
 
-    def _generate_rooms(self, dungeon: Dungeon, room_count: int, is_boss_floor: bool, animate_callback=None) -> List[Room]:
+    def _generate_rooms(self, dungeon: Dungeon, room_count: int, is_boss_floor: bool, animate_callback=None,
+                        on_event=None) -> List[Room]:
         """Generate non-overlapping rooms"""
         rooms = []
-        max_attempts = 1000
+        stats = {'attempts': 0, 'rejections': 0}
+        start_time = time.perf_counter()
 
-        for i in range(room_count):
-            for attempt in range(max_attempts):
-                # Determine room size
-                if is_boss_floor and i == 0:
-                    # First room on boss floor is the boss room
-                    width = random.randint(12, 15)
-                    height = random.randint(12, 15)
-                else:
-                    room_size = random.choice(['small', 'medium', 'large'])
-                    if room_size == 'small':
-                        width = random.randint(3, 5)
-                        height = random.randint(3, 5)
-                    elif room_size == 'medium':
-                        width = random.randint(6, 10)
-                        height = random.randint(6, 10)
-                    else:  # large
-                        width = random.randint(11, 15)
-                        height = random.randint(11, 15)
-
-                # Random position
-                x = random.randint(1, dungeon.width - width - 1)
-                y = random.randint(1, dungeon.height - height - 1)
-
-                # Check for overlap with existing rooms
-                new_room = Room(x, y, width, height, len(rooms))
-
-                if not self._room_overlaps(new_room, rooms):
-                    if is_boss_floor and i == 0:
-                        new_room.is_boss_room = True
-                    dungeon.add_room(new_room)
-                    rooms.append(new_room)
-
-                    if animate_callback:
-                        room_type = "Boss Room" if new_room.is_boss_room else f"Room {len(rooms)}"
-                        animate_callback(dungeon, f"Generating rooms... ({room_type})")
+        if self.placement == 'free_space':
+            free_space = FreeSpaceMap.for_dungeon(dungeon.width, dungeon.height)
+        else:
+            index = self.room_index(dungeon.width, dungeon.height)
 
-                    break
+        for i in range(room_count):
+            # First room on boss floor is the boss room
+            is_boss_room = is_boss_floor and i == 0
+
+            if self.placement == 'free_space':
+                new_room = self._place_room_free_space(dungeon, free_space, is_boss_room, len(rooms), stats)
+            else:
+                new_room = self._place_room_rejection(dungeon, index, is_boss_room, len(rooms), stats)
+
+            if new_room is None:
+                continue
+
+            new_room.is_boss_room = is_boss_room
+            dungeon.add_room(new_room)
+            rooms.append(new_room)
+
+            if on_event is not None:
+                on_event(RoomPlaced(dungeon.floor_number, new_room.room_id, new_room.x, new_room.y,
+                                    new_room.width, new_room.height, is_boss_room))
+
+            if animate_callback:
+                room_type = "Boss Room" if new_room.is_boss_room else f"Room {len(rooms)}"
+                animate_callback(dungeon, f"Generating rooms... ({room_type})")
+
+        dungeon.placement_stats = {
+            'placement': self.placement,
+            'rooms_requested': room_count,
+            'rooms_placed': len(rooms),
+            'attempts': stats['attempts'],
+            'rejections': stats['rejections'],
+            'time_seconds': time.perf_counter() - start_time
+        }
 
         return rooms
 
-    def _room_overlaps(self, new_room: Room, existing_rooms: List[Room], buffer: int = 2) -> bool:
-        """Check if a room overlaps with existing rooms (with buffer space)"""
-        for room in existing_rooms:
-            if (new_room.x < room.x + room.width + buffer and
-                new_room.x + new_room.width + buffer > room.x and
-                new_room.y < room.y + room.height + buffer and
-                new_room.y + new_room.height + buffer > room.y):
-                return True
-        return False
-
-    def _connect_rooms(self, dungeon: Dungeon):
-        """Connect all rooms with corridors"""
-        if len(dungeon.rooms) < 2:
-            return
+    def _roll_room_size(self, is_boss_room: bool) -> Tuple[int, int]:
+        """Pick a random room size"""
+        if is_boss_room:
+            low, high = BOSS_ROOM_SIDES
+        else:
+            _, low, high = self.rng.choice(ROOM_KINDS)
+        return self.rng.randint(low, high), self.rng.randint(low, high)
+
+    def _place_room_rejection(self, dungeon: Dungeon, index: RoomIndex, is_boss_room: bool,
+                              room_id: int, stats: dict) -> Optional[Room]:
+        """Try uniformly random positions until one does not overlap a placed room"""
+        max_attempts = 1000
+
+        for attempt in range(max_attempts):
+            stats['attempts'] += 1
+            width, height = self._roll_room_size(is_boss_room)
+
+            # Random position
+            x = self.rng.randint(1, dungeon.width - width - 1)
+            y = self.rng.randint(1, dungeon.height - height - 1)
+
+            # Check for overlap with existing rooms
+            new_room = Room(x, y, width, height, room_id)
+            if not self._room_overlaps(new_room, index):
+                index.insert(new_room)
+                return new_room
+
+            stats['rejections'] += 1
+
+        return None
+
+    def _place_room_free_space(self, dungeon: Dungeon, free_space: FreeSpaceMap, is_boss_room: bool,
+                               room_id: int, stats: dict) -> Optional[Room]:
+        """
+        Pick a room size and a position from the remaining free space
+
+        Every size _roll_room_size() can return is weighted by its chance
+        times its number of free positions, over the positions it has on the
+        whole floor. That is the size mix of rolling sizes until a random
+        position is free (big rooms get rarer as the floor fills up), drawn
+        at once however crowded the floor is. The more crowded the floor,
+        the more likely the room is pushed against the edge of its free
+        rectangle so the leftover space stays in large pieces. A room is only
+        dropped once no room of its kind fits.
+        """
+        stats['attempts'] += 1
+        size = free_space.pick_size(self._size_distribution(dungeon.width, dungeon.height, is_boss_room), self.rng)
+        if size is None:
+            return None
+
+        width, height = size
+        crowding = 1 - free_space.count(width, height) / ((dungeon.width - width - 1) * (dungeon.height - height - 1))
+        position = free_space.sample(width, height, self.rng, snap=self.rng.random() < crowding)
+
+        new_room = Room(position[0], position[1], width, height, room_id)
+        free_space.insert(new_room)
+        return new_room
+
+    def _size_distribution(self, width: int, height: int, is_boss_room: bool) -> SizeDistribution:
+        """Return the rolled room sizes of a floor size, each weighted by its chance per position"""
+        key = (width, height, is_boss_room)
+        distribution = self._size_distributions.get(key)
+        if distribution is None:
+            sizes = BOSS_ROOM_SIZES if is_boss_room else ROOM_SIZES
+            distribution = self._size_distributions[key] = SizeDistribution(
+                (w, h, probability / ((width - w - 1) * (height - h - 1)))
+                for w, h, probability in sizes if w < width - 1 and h < height - 1)
+        return distribution
+
+    def _room_overlaps(self, new_room: Room, index: RoomIndex, buffer: int = 2) -> bool:
+        """Check if a room overlaps with already placed rooms (with buffer space)"""
+        return index.overlaps(new_room, buffer)
+
+    @staticmethod
+    def _corridors(rooms: Sequence[Room]) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        """Return the (start, end) of the corridors connecting rooms, in carving order"""
+        if len(rooms) < 2:
+            return []
 
         # Connect each room to the next one
-        for i in range(len(dungeon.rooms) - 1):
-            room1 = dungeon.rooms[i]
-            room2 = dungeon.rooms[i + 1]
-            dungeon.create_corridor(room1.center, room2.center)
+        pairs = [(i, i + 1) for i in range(len(rooms) - 1)]
 
         # Optionally add some extra connections for variety
-        if len(dungeon.rooms) > 3:
+        if len(rooms) > 3:
             # Connect first and last room
-            dungeon.create_corridor(dungeon.rooms[0].center, dungeon.rooms[-1].center)
+            pairs.append((0, len(rooms) - 1))
+
+        return [(rooms[first].center, rooms[second].center) for first, second in pairs]
+
+    def _connect_rooms(self, dungeon: Dungeon, on_event=None, keep_going=None) -> bool:
+        """
+        Connect all rooms with corridors
+
+        Args:
+            dungeon: Floor whose rooms to connect
+            on_event: Optional GenerationEvent consumer
+            keep_going: Optional callable(corridors, carved) asked before the
+                first corridor and after each one; returning False stops carving
 
-    def _place_enemies(self, dungeon: Dungeon, params: dict):
+        Returns:
+            False if keep_going stopped the carving, else True
+        """
+        corridors = self._corridors(dungeon.rooms)
+        if keep_going is not None and not keep_going(corridors, 0):
+            return False
+
+        for carved, (start, end) in enumerate(corridors, 1):
+            if on_event is None:
+                dungeon.create_corridor(start, end)
+            else:
+                changed = []
+                dungeon.create_corridor(start, end, changed)
+                width = dungeon.width
+                on_event(CorridorCarved(dungeon.floor_number, start, end,
+                                        [(i % width, i // width) for i in changed]))
+            if keep_going is not None and not keep_going(corridors, carved):
+                return False
+        return True
+
+    def _place_enemies(self, dungeon: Dungeon, params: dict, on_event=None):
         """Place enemies in rooms based on biome and floor parameters"""
         if not dungeon.biome:
             return
@@ -227,8 +618,9 @@ class DungeonGenerator:
         mini_boss_chance = params['mini_boss_chance']
 
         # Get available enemies for this biome
-        common_enemies = self.enemy_manager.get_enemies_for_biome(dungeon.biome, EnemyTier.COMMON)
-        mini_bosses = self.enemy_manager.get_enemies_for_biome(dungeon.biome, EnemyTier.MINI_BOSS)
+        tables = self._biome_tables(dungeon.biome)
+        common_enemies = tables['common_enemies']
+        mini_bosses = tables['mini_bosses']
 
         if not common_enemies:
             return
@@ -242,22 +634,27 @@ class DungeonGenerator:
                     break
 
             if boss_room:
-                mega_boss = self.enemy_manager.get_mega_boss_for_biome(dungeon.biome)
+                mega_boss = tables['mega_boss']
                 if mega_boss:
                     # Place boss in center of boss room
                     boss_pos = boss_room.center
-                    room.enemies.append((mega_boss.name, boss_pos))
-                    dungeon.enemies.append(boss_pos)
+                    dungeon.enemy_placements.add(mega_boss.catalog_id, boss_pos[0], boss_pos[1],
+                                                 boss_room.room_id)
+                    if on_event is not None:
+                        on_event(EnemyPlaced(dungeon.floor_number, mega_boss.name, mega_boss.tier.value,
+                                             boss_pos, boss_room.room_id, mega_boss.catalog_id))
                     enemy_count -= 1
 
         # Maybe place a mini-boss
-        if mini_bosses and random.random() < mini_boss_chance and dungeon.rooms:
-            mini_boss = random.choice(mini_bosses)
-            room = random.choice(dungeon.rooms)
+        if mini_bosses and self.rng.random() < mini_boss_chance and dungeon.rooms:
+            mini_boss = self.rng.choice(mini_bosses)
+            room = self.rng.choice(dungeon.rooms)
             if not room.is_boss_room:
                 pos = self._get_random_room_position(room)
-                room.enemies.append((mini_boss.name, pos))
-                dungeon.enemies.append(pos)
+                dungeon.enemy_placements.add(mini_boss.catalog_id, pos[0], pos[1], room.room_id)
+                if on_event is not None:
+                    on_event(EnemyPlaced(dungeon.floor_number, mini_boss.name, mini_boss.tier.value,
+                                         pos, room.room_id, mini_boss.catalog_id))
                 enemy_count -= 1
 
         # Place common enemies
@@ -265,18 +662,20 @@ class DungeonGenerator:
             if not common_enemies or not dungeon.rooms:
                 break
 
-            enemy = random.choice(common_enemies)
-            room = random.choice(dungeon.rooms)
+            enemy = self.rng.choice(common_enemies)
+            room = self.rng.choice(dungeon.rooms)
             pos = self._get_random_room_position(room)
-            room.enemies.append((enemy.name, pos))
-            dungeon.enemies.append(pos)
+            dungeon.enemy_placements.add(enemy.catalog_id, pos[0], pos[1], room.room_id)
+            if on_event is not None:
+                on_event(EnemyPlaced(dungeon.floor_number, enemy.name, enemy.tier.value, pos, room.room_id,
+                                     enemy.catalog_id))
 
-    def _place_resources(self, dungeon: Dungeon):
+    def _place_resources(self, dungeon: Dungeon, on_event=None):
         """Place resources in accessible room locations"""
         if not dungeon.biome:
             return
 
-        resources = self.resource_manager.get_resources_for_biome(dungeon.biome)
+        resources = self._biome_tables(dungeon.biome)['resources']
         if not resources or not dungeon.rooms:
             return
 
@@ -284,24 +683,26 @@ class DungeonGenerator:
         for resource in resources:
             spawn_count = 0
             if resource.rarity == ResourceRarity.COMMON:
-                spawn_count = random.randint(2, 4)
+                spawn_count = self.rng.randint(2, 4)
             elif resource.rarity == ResourceRarity.UNCOMMON:
-                spawn_count = random.randint(1, 2)
+                spawn_count = self.rng.randint(1, 2)
             elif resource.rarity == ResourceRarity.RARE:
-                spawn_count = random.randint(0, 1)
+                spawn_count = self.rng.randint(0, 1)
 
             # Place resources
             for _ in range(spawn_count):
                 if not dungeon.rooms:
                     break
-                room = random.choice(dungeon.rooms)
+                room = self.rng.choice(dungeon.rooms)
                 pos = self._get_random_room_position(room)
-                room.resources.append((resource.name, pos))
-                dungeon.resources.append(pos)
+                dungeon.resource_placements.add(resource.catalog_id, pos[0], pos[1], room.room_id)
+                if on_event is not None:
+                    on_event(ResourcePlaced(dungeon.floor_number, resource.name, resource.rarity.value,
+                                            pos, room.room_id, resource.catalog_id))
 
     def _get_random_room_position(self, room: Room) -> Tuple[int, int]:
         """Get a random walkable position within a room"""
         # Stay away from walls (1 tile buffer)
-        x = random.randint(room.x + 1, room.x + room.width - 2)
-        y = random.randint(room.y + 1, room.y + room.height - 2)
+        x = self.rng.randint(room.x + 1, room.x + room.width - 2)
+        y = self.rng.randint(room.y + 1, room.y + room.height - 2)
         return (x, y)
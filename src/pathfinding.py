@@ -3,9 +3,10 @@ Pathfinding Module
 AI pathfinding algorithms for dungeon validation
 """
 
-from typing import List, Tuple, Set, Optional
-from collections import deque
-from .dungeon import Dungeon
+import heapq
+from array import array
+from typing import Dict, List, Tuple, Set, Optional
+from .dungeon import Dungeon, WALKABLE_TABLE
 
 
 class PathfindingValidator:
@@ -26,7 +27,10 @@ class PathfindingValidator:
                 'valid': False,
                 'reason': 'No rooms in dungeon',
                 'connected_rooms': 0,
-                'total_rooms': 0
+                'total_rooms': 0,
+                'accessible_resources': 0,
+                'total_resources': len(self.dungeon.resources),
+                'reachable_tiles': 0
             }
 
         # Use first room center as start if not specified
@@ -34,18 +38,28 @@ class PathfindingValidator:
             start_pos = self.dungeon.rooms[0].center
 
         # Find all reachable positions
-        reachable = self.bfs_reachability(start_pos)
+        return self.connectivity_results(self.reachable_mask(start_pos))
 
+    def connectivity_results(self, reachable: bytes) -> dict:
+        """
+        Check the rooms and resources of a dungeon with rooms against a reachable mask
+
+        Lets a caller that keeps the mask from reachable_mask() get the
+        validate_connectivity() results without another search.
+
+        Returns:
+            Dictionary with validation results
+        """
         # Check room connectivity
         connected_rooms = 0
         for room in self.dungeon.rooms:
-            if room.center in reachable:
+            if self.is_reachable(reachable, room.center):
                 connected_rooms += 1
 
         # Check resource accessibility
         accessible_resources = 0
         for resource_pos in self.dungeon.resources:
-            if resource_pos in reachable:
+            if self.is_reachable(reachable, resource_pos):
                 accessible_resources += 1
 
         all_rooms_connected = connected_rooms == len(self.dungeon.rooms)
@@ -57,43 +71,110 @@ class PathfindingValidator:
             'total_rooms': len(self.dungeon.rooms),
             'accessible_resources': accessible_resources,
             'total_resources': len(self.dungeon.resources),
-            'reachable_tiles': len(reachable)
+            'reachable_tiles': reachable.count(1)
         }
 
-    def bfs_reachability(self, start: Tuple[int, int]) -> Set[Tuple[int, int]]:
+    def reachable_mask(self, start: Tuple[int, int]) -> bytearray:
         """
-        Breadth-First Search to find all reachable positions from start
+        Breadth-First Search over flat grid indices from start
+
+        The walkable mask is built from the packed grid in one pass and
+        doubles as the visited set: tiles are cleared from it as they are
+        queued, so each neighbor costs a single byte lookup.
 
         Args:
             start: Starting position (x, y)
 
         Returns:
-            Set of all reachable positions
+            Row-major bytearray with 1 for every reachable tile and 0 elsewhere
         """
+        width = self.dungeon.width
+        size = width * self.dungeon.height
+        reachable = bytearray(size)
+
         if not self.dungeon.is_walkable(start[0], start[1]):
-            return set()
+            return reachable
+
+        unvisited = self.dungeon.walkable_mask()
+        for index in _flood_fill(unvisited, width, start[1] * width + start[0]):
+            reachable[index] = 1
+
+        return reachable
+
+    def label_components(self) -> Dict:
+        """
+        Label every connected walkable region of the floor in one sweep
+
+        The grid is scanned for the next unlabeled walkable tile and each one
+        found is flood-filled, so every tile is visited once no matter how
+        many regions there are. Rooms (by center), enemies and resources are
+        then tagged with the ID of the region they stand in.
+
+        Returns:
+            Dictionary with per-tile labels (0 = not walkable, regions count
+            from 1), region sizes and the region of every room, enemy and
+            resource
+        """
+        width = self.dungeon.width
+        size = width * self.dungeon.height
+        labels = array('i', [0]) * size
+        sizes = []
+
+        unvisited = self.dungeon.walkable_mask()
+        index = unvisited.find(1)
+        while index != -1:
+            component = _flood_fill(unvisited, width, index)
+            label = len(sizes) + 1
+            for tile in component:
+                labels[tile] = label
+            sizes.append(len(component))
+            index = unvisited.find(1, index)
+
+        def label_at(pos: Tuple[int, int]) -> int:
+            x, y = pos
+            if 0 <= x < width and 0 <= y < self.dungeon.height:
+                return labels[y * width + x]
+            return 0
 
-        visited = set()
-        queue = deque([start])
-        visited.add(start)
+        return {
+            'labels': labels,
+            'component_count': len(sizes),
+            'component_sizes': {label: count for label, count in enumerate(sizes, start=1)},
+            'room_components': {room.room_id: label_at(room.center) for room in self.dungeon.rooms},
+            'enemy_components': [label_at(pos) for pos in self.dungeon.enemies],
+            'resource_components': [label_at(pos) for pos in self.dungeon.resources]
+        }
 
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # Down, Right, Up, Left
+    def is_reachable(self, mask: bytearray, pos: Tuple[int, int]) -> bool:
+        """Check a position against a reachable mask"""
+        x, y = pos
+        return 0 <= x < self.dungeon.width and 0 <= y < self.dungeon.height and mask[y * self.dungeon.width + x] == 1
 
-        while queue:
-            x, y = queue.popleft()
+    def bfs_reachability(self, start: Tuple[int, int]) -> Set[Tuple[int, int]]:
+        """
+        Breadth-First Search to find all reachable positions from start
 
-            for dx, dy in directions:
-                nx, ny = x + dx, y + dy
+        Prefer reachable_mask() unless the positions are needed as tuples.
 
-                if (nx, ny) not in visited and self.dungeon.is_walkable(nx, ny):
-                    visited.add((nx, ny))
-                    queue.append((nx, ny))
+        Args:
+            start: Starting position (x, y)
 
-        return visited
+        Returns:
+            Set of all reachable positions
+        """
+        width = self.dungeon.width
+        mask = self.reachable_mask(start)
+        return {(index % width, index // width) for index, value in enumerate(mask) if value}
 
     def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
         """
-        Find a path between two points using BFS
+        Find a shortest path between two points using A*
+
+        Nodes are flat grid indices and each visited node only records its
+        parent, so the path is rebuilt once when the goal is reached. The
+        heuristic is the Manhattan distance to the goal, which never
+        overestimates on a 4-connected grid, so the path is as short as the
+        one BFS would find.
 
         Args:
             start: Starting position
@@ -105,27 +186,89 @@ class PathfindingValidator:
         if not self.dungeon.is_walkable(start[0], start[1]) or not self.dungeon.is_walkable(goal[0], goal[1]):
             return None
 
-        visited = set()
-        queue = deque([(start, [start])])
-        visited.add(start)
-
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-
-        while queue:
-            (x, y), path = queue.popleft()
-
-            if (x, y) == goal:
+        width = self.dungeon.width
+        size = width * self.dungeon.height
+        cells = self.dungeon.grid.cells
+        walkable = WALKABLE_TABLE
+        gx, gy = goal
+        start_index = start[1] * width + start[0]
+        goal_index = gy * width + gx
+
+        parent = {start_index: start_index}
+        cost = {start_index: 0}
+        # Entries are (f, -g, index); preferring deeper nodes on ties cuts expansions
+        heap = [(self.manhattan_distance(start, goal), 0, start_index)]
+
+        while heap:
+            _, neg_g, index = heapq.heappop(heap)
+
+            if index == goal_index:
+                path = []
+                while index != start_index:
+                    path.append((index % width, index // width))
+                    index = parent[index]
+                path.append(start)
+                path.reverse()
                 return path
 
-            for dx, dy in directions:
-                nx, ny = x + dx, y + dy
-
-                if (nx, ny) not in visited and self.dungeon.is_walkable(nx, ny):
-                    visited.add((nx, ny))
-                    queue.append(((nx, ny), path + [(nx, ny)]))
+            g = -neg_g
+            if g > cost[index]:
+                continue  # Stale entry, a shorter route was found later
+
+            x = index % width
+            g += 1
+            # Down, Right, Up, Left, each with its on-grid check
+            for neighbor, on_grid in ((index + width, index + width < size), (index + 1, x < width - 1),
+                                      (index - width, index >= width), (index - 1, x > 0)):
+                if not on_grid or not walkable[cells[neighbor]]:
+                    continue
+                if g < cost.get(neighbor, size):
+                    cost[neighbor] = g
+                    parent[neighbor] = index
+                    # manhattan_distance to the goal, inlined
+                    nx, ny = neighbor % width, neighbor // width
+                    h = (nx - gx if nx > gx else gx - nx) + (ny - gy if ny > gy else gy - ny)
+                    heapq.heappush(heap, (g + h, -g, neighbor))
 
         return None
 
     def manhattan_distance(self, pos1: Tuple[int, int], pos2: Tuple[int, int]) -> int:
         """Calculate Manhattan distance between two positions"""
         return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
+
+
+def _flood_fill(unvisited: bytearray, width: int, start_index: int) -> List[int]:
+    """
+    Collect the walkable region around start_index by BFS over flat indices
+
+    unvisited is a row-major walkable mask that doubles as the visited set:
+    tiles are cleared as they are queued. Returns the region's tile indices.
+    """
+    size = len(unvisited)
+    last_column = width - 1
+    unvisited[start_index] = 0
+    queue = [start_index]
+    push = queue.append
+
+    # The list grows while it is iterated, which makes it a FIFO queue.
+    # Neighbors are unrolled (Down, Right, Up, Left) to keep the loop tight.
+    for index in queue:
+        x = index % width
+        neighbor = index + width
+        if neighbor < size and unvisited[neighbor]:
+            unvisited[neighbor] = 0
+            push(neighbor)
+        neighbor = index + 1
+        if x < last_column and unvisited[neighbor]:
+            unvisited[neighbor] = 0
+            push(neighbor)
+        neighbor = index - width
+        if neighbor >= 0 and unvisited[neighbor]:
+            unvisited[neighbor] = 0
+            push(neighbor)
+        neighbor = index - 1
+        if x > 0 and unvisited[neighbor]:
+            unvisited[neighbor] = 0
+            push(neighbor)
+
+    return queue
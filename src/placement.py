@@ -0,0 +1,418 @@
+"""
+Placement Module
+Free-space tracking for room placement without blind rejection sampling
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from .dungeon import Room
+
+# A free rectangle as half-open bounds (x0, y0, x1, y1)
+Rect = Tuple[int, int, int, int]
+
+
+class _SizeClass:
+    """
+    The free rectangles of one size class
+
+    Rectangles sit in a list backed by Fenwick trees of their widths,
+    heights and areas. The positions a room size has in the first k
+    rectangles are a closed-form expression of those prefix sums, so the
+    rectangle holding a sampled position is found by bisection.
+    """
+
+    __slots__ = ('rects', 'slots', 'widths', 'heights', 'areas', 'sum_w', 'sum_h', 'sum_area')
+
+    def __init__(self):
+        self.rects: List[Rect] = []
+        self.slots: Dict[Rect, int] = {}
+        # 1-based Fenwick trees; node i covers rects[i - (i & -i):i]
+        self.widths = [0]
+        self.heights = [0]
+        self.areas = [0]
+        self.sum_w = self.sum_h = self.sum_area = 0
+
+    def add(self, rect: Rect):
+        """Append a rectangle"""
+        width, height = rect[2] - rect[0], rect[3] - rect[1]
+        self.slots[rect] = len(self.rects)
+        self.rects.append(rect)
+        widths, heights, areas = self.widths, self.heights, self.areas
+        node_w, node_h, node_area = width, height, width * height
+        node = len(self.rects)
+        child, low = node - 1, node - (node & -node)
+        while child > low:
+            node_w += widths[child]
+            node_h += heights[child]
+            node_area += areas[child]
+            child -= child & -child
+        widths.append(node_w)
+        heights.append(node_h)
+        areas.append(node_area)
+        self.sum_w += width
+        self.sum_h += height
+        self.sum_area += width * height
+
+    def remove(self, rect: Rect):
+        """Remove a rectangle, moving the last one into its slot"""
+        slot = self.slots.pop(rect)
+        last = self.rects.pop()
+        width, height = rect[2] - rect[0], rect[3] - rect[1]
+        if last != rect:
+            self.rects[slot] = last
+            self.slots[last] = slot
+            last_width, last_height = last[2] - last[0], last[3] - last[1]
+            deltas = (last_width - width, last_height - height, last_width * last_height - width * height)
+            node = slot + 1
+            while node < len(self.widths):
+                self.widths[node] += deltas[0]
+                self.heights[node] += deltas[1]
+                self.areas[node] += deltas[2]
+                node += node & -node
+        self.widths.pop()
+        self.heights.pop()
+        self.areas.pop()
+        self.sum_w -= width
+        self.sum_h -= height
+        self.sum_area -= width * height
+
+    def positions(self, width: int, height: int) -> int:
+        """Count positions for a room no larger than any rectangle of the class"""
+        # sum((W - a) * (H - b)) over the class, with a = width - 1 and b = height - 1
+        a, b = width - 1, height - 1
+        return self.sum_area - b * self.sum_w - a * self.sum_h + a * b * len(self.rects)
+
+    def locate(self, pick: int, width: int, height: int) -> Tuple[Rect, int]:
+        """
+        Find the rectangle holding the pick-th position of a room size
+
+        Returns:
+            (rectangle, index of the position within that rectangle)
+        """
+        a, b = width - 1, height - 1
+        widths, heights, areas = self.widths, self.heights, self.areas
+        count = len(self.rects)
+        node = sum_w = sum_h = sum_area = 0
+        step = 1 << (count.bit_length() - 1)
+        while step:
+            below = node + step
+            if below <= count:
+                w, h, area = sum_w + widths[below], sum_h + heights[below], sum_area + areas[below]
+                if area - b * w - a * h + a * b * below <= pick:
+                    node, sum_w, sum_h, sum_area = below, w, h, area
+            step >>= 1
+        return self.rects[node], pick - (sum_area - b * sum_w - a * sum_h + a * b * node)
+
+    def __len__(self):
+        return len(self.rects)
+
+
+class SizeDistribution:
+    """
+    Candidate room sizes with relative weights, for FreeSpaceMap.pick_size()
+
+    For each size class it is asked about, the distribution sums the weights
+    of the sizes that fit the class against the terms of the class's
+    position count, so weighing a whole class takes four multiplications.
+    """
+
+    def __init__(self, sizes: Iterable[Tuple[int, int, float]]):
+        """
+        Args:
+            sizes: (width, height, weight) of each candidate size
+        """
+        self.sizes = tuple(sizes)
+        self.largest = max((max(width, height) for width, height, _ in self.sizes), default=0)
+        self._terms: Dict[Tuple[int, int], Tuple[float, float, float, float]] = {}
+
+    def terms(self, size_class: Tuple[int, int]) -> Tuple[float, float, float, float]:
+        """
+        Sum the weights of the sizes fitting a size class, times 1, b, a and a * b
+
+        With a = width - 1 and b = height - 1, a class offers a size
+        sum_area - b * sum_w - a * sum_h + a * b * n positions.
+        """
+        terms = self._terms.get(size_class)
+        if terms is None:
+            cw, ch = size_class
+            k0 = kb = ka = kab = 0.0
+            for width, height, weight in self.sizes:
+                if width <= cw and height <= ch:
+                    a, b = width - 1, height - 1
+                    k0 += weight
+                    kb += weight * b
+                    ka += weight * a
+                    kab += weight * a * b
+            terms = self._terms[size_class] = (k0, kb, ka, kab)
+        return terms
+
+
+class FreeSpaceMap:
+    """
+    Maximal free rectangles over the area where rooms may be placed
+
+    The map keeps every maximal axis-aligned rectangle that does not touch a
+    placed room (grown by the overlap buffer). A room of a given size fits at
+    some position exactly when it fits inside one of these rectangles, so
+    positions can be sampled directly from valid space instead of being
+    guessed and rejected.
+
+    Rectangles are grouped into size classes by their width and height
+    (capped at max_size + 1), and each class keeps running sums of its
+    widths, heights and areas. The number of positions a room size has in a
+    class is a closed-form expression of those sums, so counting costs the
+    same however many rectangles there are, and sampling bisects the
+    class's prefix sums. A bucket grid finds the rectangles a new room cuts
+    through.
+    """
+
+    def __init__(self, x0: int, y0: int, x1: int, y1: int, buffer: int = 2,
+                 min_size: int = 3, max_size: int = 15, cell_size: int = 32):
+        """
+        Args:
+            x0, y0, x1, y1: Half-open bounds rooms must lie within
+            buffer: Empty tiles required between rooms
+            min_size: Smallest room side; narrower free rectangles are dropped
+            max_size: Largest room side that is counted in O(1)
+            cell_size: Bucket size of the rectangle lookup grid
+        """
+        self.buffer = buffer
+        self.min_size = min_size
+        self.cap = max_size + 1
+        self.cell_size = cell_size
+        self.free: Dict[Rect, None] = {}
+        self.buckets: Dict[Tuple[int, int], Dict[Rect, None]] = {}
+        self.classes: Dict[Tuple[int, int], _SizeClass] = {}
+        if x1 - x0 >= min_size and y1 - y0 >= min_size:
+            self._add((x0, y0, x1, y1))
+
+    @classmethod
+    def for_dungeon(cls, width: int, height: int, buffer: int = 2, min_size: int = 3) -> 'FreeSpaceMap':
+        """Build the map for a dungeon, keeping rooms off the outer border tiles"""
+        return cls(1, 1, width - 1, height - 1, buffer, min_size)
+
+    def _cells(self, x0: int, y0: int, x1: int, y1: int) -> Iterable[Tuple[int, int]]:
+        """Yield the bucket keys covering the half-open rectangle [x0, x1) x [y0, y1)"""
+        size = self.cell_size
+        for cy in range(y0 // size, (y1 - 1) // size + 1):
+            for cx in range(x0 // size, (x1 - 1) // size + 1):
+                yield (cx, cy)
+
+    def _size_class(self, rect: Rect) -> Tuple[int, int]:
+        """Return the (width, height) size class of a rectangle"""
+        return (min(rect[2] - rect[0], self.cap), min(rect[3] - rect[1], self.cap))
+
+    def _add(self, rect: Rect):
+        """Register a free rectangle"""
+        self.free[rect] = None
+        for key in self._cells(*rect):
+            self.buckets.setdefault(key, {})[rect] = None
+        size_class = self._size_class(rect)
+        members = self.classes.get(size_class)
+        if members is None:
+            members = self.classes[size_class] = _SizeClass()
+        members.add(rect)
+
+    def _remove(self, rect: Rect):
+        """Unregister a free rectangle"""
+        del self.free[rect]
+        for key in self._cells(*rect):
+            del self.buckets[key][rect]
+        size_class = self._size_class(rect)
+        members = self.classes[size_class]
+        members.remove(rect)
+        if not members:
+            del self.classes[size_class]
+
+    def _class_positions(self, size_class: Tuple[int, int], width: int, height: int) -> int:
+        """Count positions for a room of the given size across one size class"""
+        cw, ch = size_class
+        if (cw < width and cw < self.cap) or (ch < height and ch < self.cap):
+            return 0
+        if width > self.cap or height > self.cap:
+            # The capped class mixes rectangle sizes; count them one by one
+            return sum(_positions(rect, width, height) for rect in self.classes[size_class].rects)
+        return self.classes[size_class].positions(width, height)
+
+    def fits(self, width: int, height: int) -> bool:
+        """Check if a room of the given size fits anywhere"""
+        return any(self._class_positions(size_class, width, height) > 0 for size_class in self.classes)
+
+    def count(self, width: int, height: int) -> int:
+        """
+        Count valid top-left positions for a room of the given size
+
+        Positions inside several overlapping free rectangles are counted once
+        per rectangle, so this is an upper bound on crowded floors.
+        """
+        if width > self.cap or height > self.cap:
+            return sum(self._class_positions(size_class, width, height) for size_class in self.classes)
+
+        a, b = width - 1, height - 1
+        total = 0
+        for (cw, ch), members in self.classes.items():
+            if cw >= width and ch >= height:
+                total += members.sum_area - b * members.sum_w - a * members.sum_h + a * b * len(members)
+        return total
+
+    def pick_size(self, distribution: 'SizeDistribution', rng) -> Optional[Tuple[int, int]]:
+        """
+        Pick a room size with probability proportional to its weight times count()
+
+        One random number selects a size class, weighted by the positions it
+        offers all sizes, and then a size within it, so the cost depends on
+        the number of size classes and sizes but not on how often a blindly
+        rolled size would fail to fit.
+
+        Args:
+            distribution: Candidate sizes and their weights, none wider or
+                taller than max_size + 1
+            rng: Random source with a random() method
+
+        Returns:
+            (width, height), or None if no candidate size fits anywhere
+        """
+        if distribution.largest > self.cap:
+            raise ValueError(f"Room sizes above {self.cap} cannot be weighted by size class")
+
+        weights = []
+        total = 0.0
+        for size_class, members in self.classes.items():
+            k0, kb, ka, kab = distribution.terms(size_class)
+            weight = k0 * members.sum_area - kb * members.sum_w - ka * members.sum_h + kab * len(members)
+            if weight > 0:
+                weights.append((size_class, members, weight))
+                total += weight
+
+        if not weights:
+            return None
+
+        pick = rng.random() * total
+        for size_class, members, weight in weights:
+            if pick < weight:
+                break
+            pick -= weight
+
+        # The remainder of the draw picks the size within the class
+        chosen = None
+        cw, ch = size_class
+        n, sum_w, sum_h, sum_area = len(members), members.sum_w, members.sum_h, members.sum_area
+        for width, height, weight in distribution.sizes:
+            if width <= cw and height <= ch:
+                chosen = (width, height)
+                a, b = width - 1, height - 1
+                share = weight * (sum_area - b * sum_w - a * sum_h + a * b * n)
+                if pick < share:
+                    break
+                pick -= share
+        return chosen
+
+    def sample(self, width: int, height: int, rng, snap: bool = False) -> Optional[Tuple[int, int]]:
+        """
+        Pick a random valid top-left position for a room of the given size
+
+        Each free rectangle is weighted by the number of positions it offers,
+        and a single random draw selects both the rectangle and the position.
+
+        Args:
+            width, height: Room size
+            rng: Random source with a randint() method
+            snap: Push the room against the nearest edges of its free
+                rectangle, leaving the rest of the rectangle in one piece
+
+        Returns:
+            (x, y) position, or None if the room fits nowhere
+        """
+        weights = []
+        total = 0
+        for size_class in sorted(self.classes):
+            positions = self._class_positions(size_class, width, height)
+            if positions > 0:
+                weights.append((size_class, positions))
+                total += positions
+
+        if not weights:
+            return None
+
+        pick = rng.randint(0, total - 1)
+        for size_class, positions in weights:
+            if pick < positions:
+                break
+            pick -= positions
+
+        members = self.classes[size_class]
+        if width > self.cap or height > self.cap:
+            # Rectangles of the capped class may be too small; scan them
+            for rect in members.rects:
+                positions = _positions(rect, width, height)
+                if pick < positions:
+                    break
+                pick -= positions
+        else:
+            rect, pick = members.locate(pick, width, height)
+
+        nx = rect[2] - rect[0] - width + 1
+        ny = rect[3] - rect[1] - height + 1
+        dx, dy = pick % nx, pick // nx
+        if snap:
+            dx = 0 if dx < nx - 1 - dx else nx - 1
+            dy = 0 if dy < ny - 1 - dy else ny - 1
+        return (rect[0] + dx, rect[1] + dy)
+
+    def insert(self, room: Room):
+        """Remove the space taken by a placed room (plus buffer) from the map"""
+        b = self.buffer
+        ox0, oy0 = room.x - b, room.y - b
+        ox1, oy1 = room.x + room.width + b, room.y + room.height + b
+        min_size = self.min_size
+
+        # Rectangles cut by the room, plus those bordering it
+        nearby = {}
+        for key in self._cells(ox0 - 1, oy0 - 1, ox1 + 1, oy1 + 1):
+            nearby.update(self.buckets.get(key, {}))
+
+        touching = []
+        split = set()
+        for rect in nearby:
+            x0, y0, x1, y1 = rect
+            if ox0 >= x1 or ox1 <= x0 or oy0 >= y1 or oy1 <= y0:
+                # A new piece lies against the room on one side, so only a
+                # rectangle that also borders the room there can contain it
+                if ox0 == x1 or ox1 == x0 or oy0 == y1 or oy1 == y0:
+                    touching.append(rect)
+                continue
+            self._remove(rect)
+            # Keep the parts of the free rectangle on each side of the room
+            if ox0 > x0:
+                split.add((x0, y0, ox0, y1))
+            if ox1 < x1:
+                split.add((ox1, y0, x1, y1))
+            if oy0 > y0:
+                split.add((x0, y0, x1, oy0))
+            if oy1 < y1:
+                split.add((x0, oy1, x1, y1))
+
+        split = [r for r in sorted(split) if r[2] - r[0] >= min_size and r[3] - r[1] >= min_size]
+
+        # Untouched rectangles stay maximal, so only the new pieces need pruning
+        for rect in split:
+            if any(_contains(other, rect) for other in touching):
+                continue
+            if any(other != rect and _contains(other, rect) for other in split):
+                continue
+            self._add(rect)
+
+    def __len__(self):
+        return len(self.free)
+
+
+def _positions(rect: Rect, width: int, height: int) -> int:
+    """Count top-left positions for a room of the given size inside rect"""
+    nx = rect[2] - rect[0] - width + 1
+    ny = rect[3] - rect[1] - height + 1
+    return nx * ny if nx > 0 and ny > 0 else 0
+
+
+def _contains(outer: Rect, inner: Rect) -> bool:
+    """Check if rectangle outer fully contains rectangle inner"""
+    return (outer[0] <= inner[0] and outer[1] <= inner[1] and
+            outer[2] >= inner[2] and outer[3] >= inner[3])
@@ -3,27 +3,189 @@ Dungeon Quality Score (DQS) Module
 Comprehensive evaluation metrics for dungeon quality assessment
 """
 
-from typing import Dict, Tuple
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
 from .dungeon import Dungeon
 from .pathfinding import PathfindingValidator
 
+# Weights:
+# - Room Connectivity: 35% (most critical)
+# - Resource Accessibility: 30% (very important)
+# - Pathability: 20% (important)
+# - Space Efficiency: 15% (nice to have)
+DQS_WEIGHTS = {
+    'room_connectivity': 0.35,
+    'resource_accessibility': 0.30,
+    'pathability': 0.20,
+    'space_efficiency': 0.15
+}
+
+# (lowest DQS, grade, description), best grade first
+QUALITY_GRADES = (
+    (0.95, 'S', 'Perfect - Legendary Quality'),
+    (0.90, 'A+', 'Exceptional - Near Perfect'),
+    (0.85, 'A', 'Excellent - High Quality'),
+    (0.80, 'A-', 'Very Good - Minor Issues'),
+    (0.75, 'B+', 'Good - Playable'),
+    (0.70, 'B', 'Above Average - Some Issues'),
+    (0.65, 'B-', 'Average - Noticeable Issues'),
+    (0.60, 'C+', 'Below Average - Significant Issues'),
+    (0.50, 'C', 'Poor - Major Problems'),
+    (float('-inf'), 'F', 'Unacceptable - Critically Flawed'),
+)
+
+# (last floor, tier name) of the floor progression tiers
+FLOOR_TIERS = (
+    (10, 'Tutorial Zone'),
+    (20, 'Early Game'),
+    (40, 'Mid Game'),
+    (70, 'Late-Mid Game'),
+    (float('inf'), 'Endgame'),
+)
+
+
+def quality_grade(dqs: float) -> Tuple[str, str]:
+    """Convert a DQS score to its (grade, description)"""
+    for threshold, grade, description in QUALITY_GRADES:
+        if dqs >= threshold:
+            return (grade, description)
+    return QUALITY_GRADES[-1][1:]
+
+
+def room_density_score(room_density: float) -> float:
+    """Score the share of the floor covered by rooms, 1.0 in the optimal 20-40% band"""
+    # Optimal room density is around 20-40%
+    if 0.2 <= room_density <= 0.4:
+        return 1.0
+    elif room_density < 0.2:
+        return room_density / 0.2
+    else:
+        return max(0, 1.0 - (room_density - 0.4) / 0.3)
+
+
+def floor_tier(floor_number: int) -> str:
+    """Return the progression tier name of a floor"""
+    for last_floor, tier in FLOOR_TIERS:
+        if floor_number <= last_floor:
+            return tier
+    return FLOOR_TIERS[-1][1]
+
+
+class EvaluationContext:
+    """
+    Memoized inputs of the DQS metrics for one dungeon
+
+    The reachability pass (the reachable mask and the validate_connectivity
+    results drawn from it), the component labeling and the room area are
+    each computed once and reused until the dungeon's
+    revision changes, i.e. a room, corridor, enemy or resource is added.
+    Call invalidate() after editing the grid directly.
+
+    Memoized values are shared by every caller, so the reachable mask is
+    handed out as bytes and the validation and components results as
+    read-only mappings.
+    """
+
+    def __init__(self, dungeon: Dungeon, validator: Optional[PathfindingValidator] = None):
+        self.dungeon = dungeon
+        self.validator = validator if validator is not None else PathfindingValidator(dungeon)
+        self._revision = None
+        self._cache: Dict[str, object] = {}
+
+    def revision(self) -> Tuple[int, int, int, int]:
+        """Key identifying the dungeon's current contents"""
+        dungeon = self.dungeon
+        return (dungeon.revision, len(dungeon.rooms), len(dungeon.enemy_placements),
+                len(dungeon.resource_placements))
+
+    def invalidate(self):
+        """Drop every memoized value"""
+        self._cache.clear()
+        self._revision = None
+
+    def cached(self, key: str, compute):
+        """
+        Return the value memoized under key, computing it first if the key is
+        new or the dungeon changed since it was stored
+
+        Args:
+            key: Name of the value
+            compute: Called with no arguments to compute the value
+        """
+        revision = self.revision()
+        if revision != self._revision:
+            self._cache.clear()
+            self._revision = revision
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    @property
+    def reachable(self) -> bytes:
+        """Row-major mask of the tiles reachable from the first room's center (all 0 without rooms)"""
+        def compute():
+            rooms = self.dungeon.rooms
+            if not rooms:
+                return bytes(self.total_tiles)
+            return bytes(self.validator.reachable_mask(rooms[0].center))
+        return self.cached('reachable', compute)
+
+    @property
+    def validation(self) -> Mapping:
+        """validate_connectivity() results, as a read-only mapping"""
+        def compute():
+            if not self.dungeon.rooms:
+                return self.validator.validate_connectivity()
+            return self.validator.connectivity_results(self.reachable)
+        return self.cached('validation', lambda: MappingProxyType(compute()))
+
+    @property
+    def components(self) -> Mapping:
+        """label_components() results, as a read-only mapping"""
+        return self.cached('components', lambda: MappingProxyType(self.validator.label_components()))
+
+    @property
+    def room_area(self) -> int:
+        """Total area of all rooms"""
+        return self.cached('room_area', lambda: sum(room.get_area() for room in self.dungeon.rooms))
+
+    @property
+    def total_tiles(self) -> int:
+        """Number of tiles on the floor"""
+        return self.dungeon.width * self.dungeon.height
+
 
 class DungeonQualityMetrics:
     """Evaluates dungeon quality using multiple metrics"""
 
-    def __init__(self, dungeon: Dungeon):
+    def __init__(self, dungeon: Dungeon, context: Optional[EvaluationContext] = None):
+        """
+        Args:
+            dungeon: Dungeon to evaluate
+            context: Optional EvaluationContext of the dungeon to share with
+                other evaluators (a new one by default)
+        """
         self.dungeon = dungeon
-        self.validator = PathfindingValidator(dungeon)
+        self.context = context if context is not None else EvaluationContext(dungeon)
+        self.validator = self.context.validator
 
     def evaluate(self) -> Dict:
         """
         Perform comprehensive dungeon quality evaluation
+
+        The results are memoized in the evaluation context, so repeated calls
+        (and generate_report()) reuse them until the dungeon changes. Each
+        call returns its own copy, which the caller may modify freely.
         
         Returns:
             Dictionary containing all quality metrics and overall DQS score
         """
+        results = self.context.cached('results', self._evaluate)
+        return {key: dict(value) if isinstance(value, dict) else value for key, value in results.items()}
+
+    def _evaluate(self) -> Dict:
         # Get basic validation results
-        validation = self.validator.validate_connectivity()
+        validation = self.context.validation
         
         # Calculate individual metrics
         pathability = self._calculate_pathability(validation)
@@ -53,7 +215,8 @@ class DungeonQualityMetrics:
                 'accessible_resources': validation['accessible_resources'],
                 'total_resources': validation['total_resources'],
                 'reachable_tiles': validation['reachable_tiles'],
-                'total_tiles': self.dungeon.width * self.dungeon.height,
+                'total_tiles': self.context.total_tiles,
+                'room_area': self.context.room_area,
                 'total_enemies': len(self.dungeon.enemies)
             },
             'validation': {
@@ -71,7 +234,7 @@ class DungeonQualityMetrics:
         Returns:
             Float between 0 and 1
         """
-        total_tiles = self.dungeon.width * self.dungeon.height
+        total_tiles = self.context.total_tiles
         reachable_tiles = validation['reachable_tiles']
         
         if total_tiles == 0:
@@ -124,49 +287,30 @@ class DungeonQualityMetrics:
         Returns:
             Float between 0 and 1
         """
-        total_tiles = self.dungeon.width * self.dungeon.height
-        reachable_tiles = validation['reachable_tiles']
+        total_tiles = self.context.total_tiles
         
         if total_tiles == 0:
             return 0.0
         
         # Calculate room area
-        room_area = sum(room.get_area() for room in self.dungeon.rooms)
+        room_area = self.context.room_area
         
         # Good efficiency is when reachable tiles are well distributed
         # and room density is balanced
         room_density = room_area / total_tiles if total_tiles > 0 else 0
         
-        # Optimal room density is around 20-40%
-        if 0.2 <= room_density <= 0.4:
-            density_score = 1.0
-        elif room_density < 0.2:
-            density_score = room_density / 0.2
-        else:
-            density_score = max(0, 1.0 - (room_density - 0.4) / 0.3)
-        
-        return density_score
+        return room_density_score(room_density)
 
     def _calculate_dqs(self, pathability: float, resource_access: float, 
                       room_connectivity: float, space_efficiency: float) -> float:
         """
         Calculate overall Dungeon Quality Score using weighted average
-        
-        Weights:
-        - Room Connectivity: 35% (most critical)
-        - Resource Accessibility: 30% (very important)
-        - Pathability: 20% (important)
-        - Space Efficiency: 15% (nice to have)
+        (see DQS_WEIGHTS)
         
         Returns:
             Float between 0 and 1
         """
-        weights = {
-            'room_connectivity': 0.35,
-            'resource_accessibility': 0.30,
-            'pathability': 0.20,
-            'space_efficiency': 0.15
-        }
+        weights = DQS_WEIGHTS
         
         dqs = (
             room_connectivity * weights['room_connectivity'] +
@@ -184,26 +328,7 @@ class DungeonQualityMetrics:
         Returns:
             Tuple of (grade, description)
         """
-        if dqs >= 0.95:
-            return ('S', 'Perfect - Legendary Quality')
-        elif dqs >= 0.90:
-            return ('A+', 'Exceptional - Near Perfect')
-        elif dqs >= 0.85:
-            return ('A', 'Excellent - High Quality')
-        elif dqs >= 0.80:
-            return ('A-', 'Very Good - Minor Issues')
-        elif dqs >= 0.75:
-            return ('B+', 'Good - Playable')
-        elif dqs >= 0.70:
-            return ('B', 'Above Average - Some Issues')
-        elif dqs >= 0.65:
-            return ('B-', 'Average - Noticeable Issues')
-        elif dqs >= 0.60:
-            return ('C+', 'Below Average - Significant Issues')
-        elif dqs >= 0.50:
-            return ('C', 'Poor - Major Problems')
-        else:
-            return ('F', 'Unacceptable - Critically Flawed')
+        return quality_grade(dqs)
 
     def generate_report(self) -> str:
         """
@@ -254,6 +379,12 @@ class DungeonQualityMetrics:
             report.append("✗ VALIDATION: FAILED")
             if not results['validation']['all_rooms_connected']:
                 report.append("  - Some rooms are not connected")
+                components = self.context.components
+                main_component = components['room_components'][self.dungeon.rooms[0].room_id]
+                cut_off = [room_id for room_id, label in components['room_components'].items()
+                           if label != main_component]
+                report.append(f"    {components['component_count']} walkable regions, "
+                              f"cut off rooms: {', '.join(str(room_id) for room_id in cut_off)}")
             if not results['validation']['all_resources_accessible']:
                 report.append("  - Some resources are not accessible")
         
@@ -6,8 +6,9 @@ ASCII rendering for dungeon visualization
 import os
 import sys
 import time
-from .dungeon import Dungeon, TileType
-from typing import Optional
+from .dungeon import Dungeon, TileType, TILE_TYPES, WALKABLE_CODES
+from .events import GenerationEvent
+from typing import Dict, List, Optional, Set, Tuple
 
 
 class ASCIIRenderer:
@@ -23,6 +24,7 @@ class ASCIIRenderer:
             TileType.EXIT: 'X',
             TileType.EMPTY: ' '
         }
+        self._animator: Optional['TerminalAnimator'] = None
 
     def render(self, dungeon: Dungeon, show_info: bool = True) -> str:
         """
@@ -41,12 +43,7 @@ class ASCIIRenderer:
             lines.append(self._render_header(dungeon))
             lines.append("")
 
-        # Render the grid
-        for row in dungeon.grid:
-            line = ""
-            for tile in row:
-                line += self.symbols.get(tile, ' ')
-            lines.append(line)
+        lines.extend(self._render_rows(dungeon))
 
         if show_info:
             lines.append("")
@@ -55,6 +52,28 @@ class ASCIIRenderer:
 
         return "\n".join(lines)
 
+    def _render_rows(self, dungeon: Dungeon) -> List[str]:
+        """
+        Turn the packed grid into one string per row
+
+        When every symbol is a single byte-sized character the whole grid is
+        mapped through a bytes.translate table in one pass and split into
+        rows; otherwise each row is joined from a per-code symbol lookup.
+        """
+        symbols = [self.symbols.get(tile, ' ') for tile in TILE_TYPES]
+        width = dungeon.width
+        cells = dungeon.grid.cells
+
+        if all(len(symbol) == 1 and ord(symbol) < 256 for symbol in symbols):
+            table = bytearray(b' ' * 256)
+            for code, symbol in enumerate(symbols):
+                table[code] = ord(symbol)
+            text = bytes(cells).translate(table).decode('latin-1')
+            return [text[y * width:(y + 1) * width] for y in range(dungeon.height)]
+
+        lookup = symbols + [' '] * (256 - len(symbols))
+        return ["".join([lookup[code] for code in row]) for row in dungeon.grid.rows()]
+
     def _render_header(self, dungeon: Dungeon) -> str:
         """Render dungeon information header"""
         header = f"=== FLOOR {dungeon.floor_number} ==="
@@ -92,33 +111,25 @@ class ASCIIRenderer:
         Returns:
             String representation with overlays
         """
-        # Create a copy of the grid
-        grid_copy = [row[:] for row in dungeon.grid]
+        rows = self._render_rows(dungeon)
 
-        # Overlay resources
-        if resources:
-            for x, y, symbol in resources:
-                if 0 <= y < len(grid_copy) and 0 <= x < len(grid_copy[0]):
-                    if dungeon.is_walkable(x, y):
-                        grid_copy[y][x] = symbol
+        # Sparse overlay edits per row; enemies go last so they sit on top of resources
+        width, height = dungeon.width, dungeon.height
+        cells = dungeon.grid.cells
+        edits: Dict[int, Dict[int, str]] = {}
+        for overlay in (resources, enemies):
+            for x, y, symbol in overlay or ():
+                if 0 <= y < height and 0 <= x < width and cells[y * width + x] in WALKABLE_CODES:
+                    edits.setdefault(y, {})[x] = symbol
 
-        # Overlay enemies (on top of resources)
-        if enemies:
-            for x, y, symbol in enemies:
-                if 0 <= y < len(grid_copy) and 0 <= x < len(grid_copy[0]):
-                    if dungeon.is_walkable(x, y):
-                        grid_copy[y][x] = symbol
+        for y, row_edits in edits.items():
+            line = list(rows[y])
+            for x, symbol in row_edits.items():
+                line[x] = symbol
+            rows[y] = "".join(line)
 
         lines = [self._render_header(dungeon), ""]
-
-        for row in grid_copy:
-            line = ""
-            for tile in row:
-                if isinstance(tile, TileType):
-                    line += self.symbols.get(tile, ' ')
-                else:
-                    line += tile  # Already a symbol
-            lines.append(line)
+        lines.extend(rows)
 
         lines.append("")
         lines.append(self._render_footer(dungeon))
@@ -131,14 +142,20 @@ class ASCIIRenderer:
         # Windows
         if os.name == 'nt':
             os.system('cls')
-        # Unix/Linux/Mac
+        # Unix/Linux/Mac: ANSI escape instead of forking `clear`
         else:
-            os.system('clear')
+            sys.stdout.write(CURSOR_HOME + CLEAR_SCREEN)
+            sys.stdout.flush()
+        # The next animation step must redraw everything
+        self._animator = None
 
     def animate_step(self, dungeon: Dungeon, message: str, enemies: list = None, resources: list = None, delay: float = 0.5):
         """
         Render a single animation step
 
+        The first step draws the whole frame; later steps only rewrite the
+        cells that changed since the previous one (see TerminalAnimator).
+
         Args:
             dungeon: The dungeon to render
             message: Status message to show
@@ -146,14 +163,243 @@ class ASCIIRenderer:
             resources: Resource overlay list
             delay: Time to wait after rendering (seconds)
         """
-        self.clear_screen()
+        if self._animator is None:
+            self._animator = TerminalAnimator(self)
+        self._animator.step(dungeon, message, enemies, resources, delay)
+
+
+# ANSI control sequences used by the incremental animator
+CURSOR_HOME = "\x1b[H"
+CLEAR_SCREEN = "\x1b[2J"
+CLEAR_TO_END = "\x1b[J"
+CLEAR_LINE_END = "\x1b[K"
+HIDE_CURSOR = "\x1b[?25l"
+SHOW_CURSOR = "\x1b[?25h"
+
+# Unchanged characters between two changed runs on a row are rewritten rather
+# than skipped when the gap is shorter than a cursor-move sequence
+RUN_GAP = 8
+
+# Frame layout: status message lines, then header and a blank line above the map
+MESSAGE_ROW = 1
+HEADER_ROW = 3
+MAP_TOP = 5
+
+
+def _move_to(row: int, column: int) -> str:
+    """ANSI sequence moving the cursor to a 0-based row and column"""
+    return f"\x1b[{row + 1};{column + 1}H"
+
+
+def _diff_line(row: int, old: str, new: str, out: List[str]):
+    """Append the cursor-addressed updates turning line old into line new"""
+    limit = min(len(old), len(new))
+    column = 0
+    while column < limit:
+        if old[column] == new[column]:
+            column += 1
+            continue
+        # Extend the run until RUN_GAP equal characters in a row are seen
+        start = end = column
+        column += 1
+        while column < limit and column - end <= RUN_GAP:
+            if old[column] != new[column]:
+                end = column
+            column += 1
+        out.append(_move_to(row, start) + new[start:end + 1])
+        column = end + 1
+
+    if len(new) > limit:
+        out.append(_move_to(row, limit) + new[limit:])
+    elif len(old) > limit:
+        out.append(_move_to(row, limit) + CLEAR_LINE_END)
+
+
+class TerminalAnimator:
+    """
+    Incremental terminal animation for generation steps
+
+    Keeps the lines of the last frame it drew and, for each new frame, only
+    sends cursor-addressed ANSI updates for the cells that changed, so a step
+    that adds one room rewrites that room rather than the whole map. Each
+    frame goes out in a single buffered write, with no subprocess per frame.
+
+    The animator is also a generation event consumer: passed as on_event to
+    DungeonGenerator.generate(), it records the tiles each event changed,
+    and later steps of the same floor redraw just those tiles instead of
+    rendering and comparing whole frames.
+    """
+
+    def __init__(self, renderer: Optional[ASCIIRenderer] = None, stream=None):
+        """
+        Args:
+            renderer: Renderer producing the frames (default: a new ASCIIRenderer)
+            stream: Text stream to draw on (default: sys.stdout)
+        """
+        self.renderer = renderer or ASCIIRenderer()
+        self.stream = stream or sys.stdout
+        self.frame: Optional[List[str]] = None
+        # Tiles changed since the last step, filled from generation events;
+        # tracking is set while events have been recorded since that step
+        self.dirty: Set[Tuple[int, int]] = set()
+        self.tracking = False
+        self._dungeon: Optional[Dungeon] = None
+        # Positions of the enemy and resource overlays on the current frame
+        self._overlay: Set[Tuple[int, int]] = set()
+
+    def __call__(self, event: GenerationEvent):
+        """Record the tiles a generation event changed, for the next step()"""
+        self.tracking = True
+        if event.kind == 'room':
+            for y in range(event.y, event.y + event.height):
+                self.dirty.update((x, y) for x in range(event.x, event.x + event.width))
+        elif event.kind == 'corridor':
+            self.dirty.update(event.tiles)
+        elif event.kind in ('enemy', 'resource'):
+            self.dirty.add(event.position)
+
+    def frame_lines(self, dungeon: Dungeon, message: str, enemies: list = None, resources: list = None) -> List[str]:
+        """Build the lines of one frame: the status message above the overlaid map"""
+        return ["", message, ""] + self.renderer.render_with_overlay(dungeon, enemies, resources).split("\n")
+
+    def draw(self, lines: List[str]) -> str:
+        """
+        Bring the terminal from the previous frame to lines
+
+        Returns:
+            The escape sequences and text that were written
+        """
+        if self.frame is None:
+            out = [HIDE_CURSOR, CURSOR_HOME, CLEAR_SCREEN, "\n".join(lines)]
+        else:
+            out = []
+            previous = self.frame
+            for row, line in enumerate(lines):
+                old = previous[row] if row < len(previous) else ""
+                if line != old:
+                    _diff_line(row, old, line, out)
+            if len(previous) > len(lines):
+                out.append(_move_to(len(lines), 0) + CLEAR_TO_END)
+
+        self.frame = lines
+        text = "".join(out)
+        if text:
+            self.stream.write(text)
+            self.stream.flush()
+        return text
+
+    def draw_changes(self, dungeon: Dungeon, message: str, enemies: list = None, resources: list = None) -> str:
+        """
+        Redraw only the recorded dirty tiles and the text lines around the map
+
+        Only valid while the terminal shows an earlier frame of the same
+        dungeon. The work is proportional to the dirty tiles and the
+        overlays, not to the size of the map.
+
+        Returns:
+            The escape sequences and text that were written
+        """
+        lines = self.frame
+        width, height = dungeon.width, dungeon.height
+        renderer = self.renderer
+        out = []
+
+        # The message, header and footer are single short lines; diff them directly
+        footer_row = MAP_TOP + height + 1
+        for row, line in ((MESSAGE_ROW, message), (HEADER_ROW, renderer._render_header(dungeon)),
+                          (footer_row, renderer._render_footer(dungeon))):
+            if lines[row] != line:
+                _diff_line(row, lines[row], line, out)
+                lines[row] = line
+
+        # Overlays can move without an event; redraw where they were and are
+        overlay: Dict[Tuple[int, int], str] = {}
+        for items in (resources, enemies):
+            for x, y, symbol in items or ():
+                overlay[(x, y)] = symbol
+        dirty = self.dirty
+        dirty.update(self._overlay)
+        dirty.update(overlay)
+        self._overlay = set(overlay)
+
+        columns: Dict[int, List[int]] = {}
+        for x, y in dirty:
+            if 0 <= x < width and 0 <= y < height:
+                columns.setdefault(y, []).append(x)
+
+        symbols = [renderer.symbols.get(tile, ' ') for tile in TILE_TYPES]
+        cells = dungeon.grid.cells
+        for y in sorted(columns):
+            row = MAP_TOP + y
+            line = list(lines[row])
+            changed = []
+            for x in sorted(columns[y]):
+                code = cells[y * width + x]
+                symbol = overlay.get((x, y)) if code in WALKABLE_CODES else None
+                symbol = symbol or symbols[code]
+                if line[x] != symbol:
+                    line[x] = symbol
+                    changed.append(x)
+
+            # One cursor move per run of adjacent changed tiles
+            start = 0
+            for index in range(1, len(changed) + 1):
+                if index == len(changed) or changed[index] != changed[index - 1] + 1:
+                    first, last = changed[start], changed[index - 1]
+                    out.append(_move_to(row, first) + "".join(line[first:last + 1]))
+                    start = index
+            lines[row] = "".join(line)
 
-        # Print status message
-        print(f"\n{message}\n")
+        dirty.clear()
+        text = "".join(out)
+        if text:
+            self.stream.write(text)
+            self.stream.flush()
+        return text
 
-        # Render the dungeon
-        output = self.render_with_overlay(dungeon, enemies, resources)
-        print(output)
+    def step(self, dungeon: Dungeon, message: str, enemies: list = None, resources: list = None, delay: float = 0.5):
+        """
+        Draw one animation step and wait
+
+        Redraws only the dirty tiles and overlays when events were recorded
+        since the previous frame of this dungeon, and diffs whole frames
+        otherwise.
 
-        # Wait
+        Args:
+            dungeon: The dungeon to render
+            message: Status message to show
+            enemies: Enemy overlay list
+            resources: Resource overlay list
+            delay: Time to wait after drawing (seconds)
+        """
+        if self.tracking and self.frame is not None and dungeon is self._dungeon and \
+                all(len(symbol) == 1 for symbol in self.renderer.symbols.values()):
+            self.draw_changes(dungeon, message, enemies, resources)
+        else:
+            self.draw(self.frame_lines(dungeon, message, enemies, resources))
+            self.dirty.clear()
+            self._overlay = {(x, y) for items in (resources, enemies) for x, y, _ in items or ()}
+        # Until the next event, changes can only be found by diffing frames
+        self.tracking = False
+        self._dungeon = dungeon
         time.sleep(delay)
+
+    def finish(self, clear: bool = True):
+        """
+        End the animation and give the terminal back
+
+        Args:
+            clear: Clear the screen; otherwise leave the last frame and move
+                the cursor below it
+        """
+        if clear:
+            text = CURSOR_HOME + CLEAR_SCREEN
+        else:
+            text = _move_to(len(self.frame or ()), 0)
+        self.stream.write(text + SHOW_CURSOR)
+        self.stream.flush()
+        self.frame = None
+        self.dirty.clear()
+        self.tracking = False
+        self._dungeon = None
+        self._overlay.clear()
@@ -4,8 +4,10 @@ Resource definitions and placement logic
 """
 
 import json
-from typing import Dict, List, Optional
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
 from pathlib import Path
+from .data_cache import DataTable, group_by, load_table
 from enum import Enum
 
 
@@ -28,8 +30,12 @@ class ResourceRarity(Enum):
 class Resource:
     """Represents a resource that can be found in dungeons"""
 
-    def __init__(self, name: str, data: dict):
+    __slots__ = ('name', 'rarity', 'biome', 'description', 'value', 'catalog_id')
+
+    def __init__(self, name: str, data: dict, catalog_id: int = -1):
         self.name = name
+        # Position in the ResourceTable that built this resource (-1 outside a table)
+        self.catalog_id = catalog_id
         self.rarity = ResourceRarity(data.get('rarity', 'common'))
         self.biome = data.get('biome', '')
         self.description = data.get('description', '')
@@ -39,6 +45,47 @@ class Resource:
         return f"Resource({self.name}, {self.rarity.value})"
 
 
+class ResourceTable(DataTable):
+    """Parsed resources.json with lookups by biome and rarity"""
+
+    def __init__(self, data: Mapping):
+        super().__init__(data)
+        self.resources: Mapping[str, Resource] = MappingProxyType(
+            {name: Resource(name, entry, catalog_id) for catalog_id, (name, entry) in enumerate(data.items())}
+        )
+        # Catalog ID -> resource and name
+        self.by_id: Tuple[Resource, ...] = tuple(self.resources.values())
+        self.names: Tuple[str, ...] = tuple(self.resources)
+        self.by_biome: Mapping[str, Tuple[Resource, ...]] = group_by(self.resources.values(), lambda r: r.biome)
+        self.by_rarity: Mapping[ResourceRarity, Tuple[Resource, ...]] = group_by(
+            self.resources.values(), lambda r: r.rarity
+        )
+        self.by_biome_rarity: Mapping[Tuple[str, ResourceRarity], Tuple[Resource, ...]] = group_by(
+            self.resources.values(), lambda r: (r.biome, r.rarity)
+        )
+
+    @staticmethod
+    def validate(data):
+        """Check parsed resources.json data, raising ValueError on the first bad entry"""
+        rarities = {rarity.value for rarity in ResourceRarity}
+        if not isinstance(data, dict):
+            raise ValueError("resource data must be an object of resources")
+        for name, entry in data.items():
+            if not isinstance(entry, dict):
+                raise ValueError(f"resource {name!r}: expected an object")
+            if entry.get('rarity', 'common') not in rarities:
+                raise ValueError(f"resource {name!r}: unknown rarity {entry.get('rarity')!r}")
+            if not isinstance(entry.get('biome', ''), str):
+                raise ValueError(f"resource {name!r}: biome must be a string")
+            if not isinstance(entry.get('value', 1), (int, float)):
+                raise ValueError(f"resource {name!r}: value must be a number")
+
+
+def load_resource_table(path) -> ResourceTable:
+    """Return the process-wide cached ResourceTable for a JSON data file"""
+    return load_table(path, ResourceTable)
+
+
 class ResourceManager:
     """Manages resource data and placement"""
 
@@ -48,16 +95,15 @@ class ResourceManager:
             data_path = base_path / 'data' / 'resources.json'
 
         self.data_path = data_path
-        self.resources: Dict[str, Resource] = {}
+        self.table = ResourceTable(MappingProxyType({}))
+        self.resources: Mapping[str, Resource] = self.table.resources
         self.load_resources()
 
     def load_resources(self):
-        """Load resource data from JSON file"""
+        """Load resource data through the shared data cache"""
         try:
-            with open(self.data_path, 'r') as f:
-                data = json.load(f)
-                for resource_name, resource_data in data.items():
-                    self.resources[resource_name] = Resource(resource_name, resource_data)
+            self.table = load_resource_table(self.data_path)
+            self.resources = self.table.resources
         except FileNotFoundError:
             print(f"Warning: Resource data file not found at {self.data_path}")
         except json.JSONDecodeError as e:
@@ -67,10 +113,15 @@ class ResourceManager:
         """Get a resource by name"""
         return self.resources.get(name)
 
-    def get_resources_for_biome(self, biome: str) -> List[Resource]:
-        """Get all resources that can be found in a biome"""
-        return [r for r in self.resources.values() if r.biome == biome]
+    def get_resource_by_id(self, catalog_id: int) -> Optional[Resource]:
+        """Get a resource by its catalog ID"""
+        by_id = self.table.by_id
+        return by_id[catalog_id] if 0 <= catalog_id < len(by_id) else None
+
+    def get_resources_for_biome(self, biome: str) -> Tuple[Resource, ...]:
+        """Get all resources that can be found in a biome (shared tuple, not a copy)"""
+        return self.table.by_biome.get(biome, ())
 
-    def get_resources_by_rarity(self, biome: str, rarity: ResourceRarity) -> List[Resource]:
-        """Get resources for a biome filtered by rarity"""
-        return [r for r in self.get_resources_for_biome(biome) if r.rarity == rarity]
+    def get_resources_by_rarity(self, biome: str, rarity: ResourceRarity) -> Tuple[Resource, ...]:
+        """Get resources for a biome filtered by rarity (shared tuple, not a copy)"""
+        return self.table.by_biome_rarity.get((biome, rarity), ())
@@ -0,0 +1,544 @@
+"""
+Serialization Module
+Compact, versioned binary format for generated dungeon floors
+"""
+
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple
+from .dungeon import Dungeon, Room, TileGrid
+from .generator import tower_floor_seed
+
+# Stream layout:
+#   header   MAGIC, format version (u16)
+#   records  tag (1 byte), payload length (u32), payload
+#
+# A NAMES record holds the enemy and resource catalog names that the
+# catalog IDs of the following floors refer to. It is only written when
+# those names change, so a stream of many floors stores the catalog once.
+# A FLOOR record holds one floor:
+#   width, height, floor number (u32, u32, i32), flags (u8), seed (u64)
+#   entrance and exit (i32 x, y each; -1 when unset)
+#   biome, placement stats (u16 length + UTF-8 / JSON each), then the seed
+#       in decimal when it does not fit in a u64
+#   tile plane: u32 length + zlib-compressed grid bytes (raw when RAW_TILES is set)
+#   rooms: u32 count + (x, y, width, height, room_id: i32, is_boss_room: u8) each
+#   enemy and resource placements: u32 count + catalog ID, x, y and room ID
+#       columns (little-endian i32 arrays)
+MAGIC = b'DNGF'
+FORMAT_VERSION = 1
+
+# Archive layout (see FloorArchive):
+#   header   ARCHIVE_MAGIC, format version (u16), index offset (u64), floor count (u32)
+#   records  NAMES and FLOOR records as above, tile planes stored raw
+#   index    one entry per floor: seed (u64), floor number (i32), width, height
+#            (u32 each), then the offsets of the FLOOR payload, its tile
+#            plane and the NAMES payload it refers to (u64 each)
+ARCHIVE_MAGIC = b'DNGA'
+
+NAMES = b'N'
+FLOOR = b'F'
+
+_HEADER = struct.Struct('<4sH')
+_RECORD = struct.Struct('<cI')
+_FLOOR = struct.Struct('<IIiBQiiii')
+_ROOM = struct.Struct('<iiiiiB')
+_COUNT = struct.Struct('<I')
+_LENGTH = struct.Struct('<H')
+_ARCHIVE_HEADER = struct.Struct('<4sHQI')
+_INDEX_ENTRY = struct.Struct('<QiIIQQQ')
+
+HAS_SEED = 1
+HAS_BIOME = 2
+HAS_TEXT_SEED = 4
+RAW_TILES = 8
+
+_U64_LIMIT = 2 ** 64
+
+
+def _little_endian(column: array) -> bytes:
+    """Return an int array's bytes in little-endian order"""
+    if sys.byteorder == 'big':
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _read_column(view: memoryview, offset: int, count: int) -> Tuple[array, int]:
+    """Read a little-endian i32 column of count values, returning (column, new offset)"""
+    column = array('i')
+    end = offset + count * column.itemsize
+    column.frombytes(view[offset:end])
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column, end
+
+
+def _pack_text(text: str) -> bytes:
+    """Length-prefixed UTF-8"""
+    data = text.encode('utf-8')
+    return _LENGTH.pack(len(data)) + data
+
+
+def _unpack_text(view: memoryview, offset: int) -> Tuple[str, int]:
+    (length,) = _LENGTH.unpack_from(view, offset)
+    offset += _LENGTH.size
+    return bytes(view[offset:offset + length]).decode('utf-8'), offset + length
+
+
+def _pack_names(enemy_names: Sequence[str], resource_names: Sequence[str]) -> bytes:
+    parts = []
+    for names in (enemy_names, resource_names):
+        parts.append(_COUNT.pack(len(names)))
+        parts.extend(_pack_text(name) for name in names)
+    return b''.join(parts)
+
+
+def _unpack_names(payload: bytes) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    view = memoryview(payload)
+    offset = 0
+    tables = []
+    for _ in range(2):
+        (count,) = _COUNT.unpack_from(view, offset)
+        offset += _COUNT.size
+        names = []
+        for _ in range(count):
+            name, offset = _unpack_text(view, offset)
+            names.append(name)
+        tables.append(tuple(names))
+    return tables[0], tables[1]
+
+
+def _pack_floor(dungeon: Dungeon, level: int) -> bytes:
+    seed = dungeon.seed
+    flags = HAS_BIOME if dungeon.biome is not None else 0
+    if seed is not None:
+        flags |= HAS_SEED if 0 <= seed < _U64_LIMIT else HAS_TEXT_SEED
+    entrance = dungeon.entrance_pos or (-1, -1)
+    exit_pos = dungeon.exit_pos or (-1, -1)
+    if level:
+        tiles = zlib.compress(bytes(dungeon.grid.cells), level)
+    else:
+        tiles = bytes(dungeon.grid.cells)
+        flags |= RAW_TILES
+
+    parts = [
+        _FLOOR.pack(dungeon.width, dungeon.height, dungeon.floor_number, flags,
+                    seed if flags & HAS_SEED else 0, entrance[0], entrance[1], exit_pos[0], exit_pos[1]),
+        _pack_text(dungeon.biome or ''),
+        _pack_text(json.dumps(dungeon.placement_stats, separators=(',', ':'))),
+    ]
+    if flags & HAS_TEXT_SEED:
+        parts.append(_pack_text(str(seed)))
+    parts += [
+        _COUNT.pack(len(tiles)),
+        tiles,
+        _COUNT.pack(len(dungeon.rooms)),
+    ]
+    parts.extend(_ROOM.pack(room.x, room.y, room.width, room.height, room.room_id, room.is_boss_room)
+                 for room in dungeon.rooms)
+    for placements in (dungeon.enemy_placements, dungeon.resource_placements):
+        parts.append(_COUNT.pack(len(placements)))
+        parts.extend(_little_endian(column) for column in
+                     (placements.ids, placements.x, placements.y, placements.rooms))
+    return b''.join(parts)
+
+
+def _tiles_offset(payload: bytes) -> int:
+    """Return the offset of the tile bytes in a FLOOR record payload"""
+    flags = payload[12]
+    offset = _FLOOR.size
+    for _ in range(3 if flags & HAS_TEXT_SEED else 2):
+        (length,) = _LENGTH.unpack_from(payload, offset)
+        offset += _LENGTH.size + length
+    return offset + _COUNT.size
+
+
+def _unpack_floor(payload, enemy_names: Sequence[str], resource_names: Sequence[str],
+                  owner=None) -> Dungeon:
+    """
+    Decode a FLOOR record payload
+
+    With an owner, a raw tile plane is used in place as the grid buffer
+    (kept valid by owner) instead of being copied.
+    """
+    view = memoryview(payload)
+    (width, height, floor_number, flags, seed,
+     entrance_x, entrance_y, exit_x, exit_y) = _FLOOR.unpack_from(view, 0)
+    offset = _FLOOR.size
+    biome, offset = _unpack_text(view, offset)
+    stats, offset = _unpack_text(view, offset)
+    if flags & HAS_TEXT_SEED:
+        text_seed, offset = _unpack_text(view, offset)
+        seed = int(text_seed)
+
+    (length,) = _COUNT.unpack_from(view, offset)
+    offset += _COUNT.size
+    if not flags & RAW_TILES:
+        cells = bytearray(zlib.decompress(view[offset:offset + length]))
+    elif owner is None:
+        cells = bytearray(view[offset:offset + length])
+    else:
+        cells = view[offset:offset + length]
+    offset += length
+    if len(cells) != width * height:
+        raise ValueError("Corrupt floor record: tile plane does not match the floor size")
+
+    dungeon = Dungeon(width, height, floor_number, grid=TileGrid(width, height, cells, owner=owner))
+    dungeon.seed = seed if flags & (HAS_SEED | HAS_TEXT_SEED) else None
+    dungeon.biome = biome if flags & HAS_BIOME else None
+    dungeon.placement_stats = json.loads(stats)
+    dungeon.entrance_pos = (entrance_x, entrance_y) if entrance_x >= 0 else None
+    dungeon.exit_pos = (exit_x, exit_y) if exit_x >= 0 else None
+
+    (count,) = _COUNT.unpack_from(view, offset)
+    offset += _COUNT.size
+    for x, y, room_width, room_height, room_id, is_boss_room in _ROOM.iter_unpack(
+            view[offset:offset + count * _ROOM.size]):
+        room = Room(x, y, room_width, room_height, room_id)
+        room.is_boss_room = bool(is_boss_room)
+        # The tile plane already holds the rooms, so skip add_room
+        room.floor = dungeon
+        dungeon.rooms.append(room)
+    offset += count * _ROOM.size
+
+    for placements, names in ((dungeon.enemy_placements, enemy_names),
+                              (dungeon.resource_placements, resource_names)):
+        (count,) = _COUNT.unpack_from(view, offset)
+        offset += _COUNT.size
+        placements.names = names
+        placements.ids, offset = _read_column(view, offset, count)
+        placements.x, offset = _read_column(view, offset, count)
+        placements.y, offset = _read_column(view, offset, count)
+        placements.rooms, offset = _read_column(view, offset, count)
+    return dungeon
+
+
+class FloorWriter:
+    """
+    Writes dungeon floors one after another to a binary stream
+
+    The stream header goes out with the first floor, so an empty writer
+    leaves the stream untouched.
+    """
+
+    def __init__(self, stream: BinaryIO, level: int = 6):
+        """
+        Args:
+            stream: Binary stream to write to
+            level: zlib compression level of the tile planes; 0 stores them raw
+        """
+        self.stream = stream
+        self.level = level
+        self._started = False
+        self._names: Optional[Tuple[Sequence[str], Sequence[str]]] = None
+
+    def _write_record(self, tag: bytes, payload: bytes):
+        self.stream.write(_RECORD.pack(tag, len(payload)))
+        self.stream.write(payload)
+
+    def write(self, dungeon: Dungeon):
+        """Append one floor to the stream"""
+        if not self._started:
+            self.stream.write(_HEADER.pack(MAGIC, FORMAT_VERSION))
+            self._started = True
+
+        names = (dungeon.enemy_placements.names, dungeon.resource_placements.names)
+        if self._names is None or names[0] != self._names[0] or names[1] != self._names[1]:
+            self._write_record(NAMES, _pack_names(*names))
+            self._names = names
+
+        self._write_record(FLOOR, _pack_floor(dungeon, self.level))
+
+    def flush(self):
+        """Flush the floors written so far to the stream"""
+        self.stream.flush()
+
+    def close(self):
+        """Flush and close the stream"""
+        if not self.stream.closed:
+            self.stream.flush()
+            self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class FloorReader:
+    """Reads dungeon floors back from a binary stream written by FloorWriter"""
+
+    def __init__(self, stream: BinaryIO):
+        """
+        Raises:
+            ValueError: The stream is not a floor stream of a supported version
+        """
+        self.stream = stream
+        header = stream.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError("Not a dungeon floor stream: missing header")
+        magic, version = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("Not a dungeon floor stream: bad magic number")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Unsupported floor format version {version} (newest known is {FORMAT_VERSION})")
+        self.version = version
+        self._names: Tuple[Tuple[str, ...], Tuple[str, ...]] = ((), ())
+
+    def _read_exact(self, size: int) -> bytes:
+        data = self.stream.read(size)
+        if len(data) < size:
+            raise ValueError("Truncated dungeon floor stream")
+        return data
+
+    def read(self) -> Optional[Dungeon]:
+        """
+        Read the next floor
+
+        Returns:
+            The floor, or None at the end of the stream
+        """
+        while True:
+            record = self.stream.read(_RECORD.size)
+            if not record:
+                return None
+            if len(record) < _RECORD.size:
+                raise ValueError("Truncated dungeon floor stream")
+            tag, length = _RECORD.unpack(record)
+            payload = self._read_exact(length)
+            if tag == NAMES:
+                self._names = _unpack_names(payload)
+            elif tag == FLOOR:
+                return _unpack_floor(payload, *self._names)
+            # Unknown record types from newer writers are skipped
+
+    def __iter__(self) -> Iterator[Dungeon]:
+        while True:
+            dungeon = self.read()
+            if dungeon is None:
+                return
+            yield dungeon
+
+
+def dump(dungeon: Dungeon, stream: BinaryIO, level: int = 6):
+    """Write a single floor to a binary stream"""
+    FloorWriter(stream, level).write(dungeon)
+
+
+def load(stream: BinaryIO) -> Dungeon:
+    """
+    Read a single floor from a binary stream
+
+    Raises:
+        ValueError: The stream is not a floor stream or holds no floor
+    """
+    dungeon = FloorReader(stream).read()
+    if dungeon is None:
+        raise ValueError("Dungeon floor stream holds no floor")
+    return dungeon
+
+
+def dumps(dungeon: Dungeon, level: int = 6) -> bytes:
+    """Serialize a single floor to bytes"""
+    stream = io.BytesIO()
+    dump(dungeon, stream, level)
+    return stream.getvalue()
+
+
+def loads(data: bytes) -> Dungeon:
+    """Deserialize a single floor from bytes"""
+    return load(io.BytesIO(data))
+
+
+class FloorArchiveWriter:
+    """
+    Writes a floor archive that FloorArchive can serve by (seed, floor number)
+
+    Floors are keyed by their own seed, i.e. the one they were generated
+    from with DungeonGenerator.generate(floor_number, seed=seed); for tower
+    floors that is tower_floor_seed(master_seed, floor_number).
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: File to create (an existing file is replaced)
+        """
+        self.path = path
+        self.stream = open(path, 'wb')
+        self.stream.write(_ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, FORMAT_VERSION, 0, 0))
+        self._index: Dict[Tuple[int, int], bytes] = {}
+        self._names: Optional[Tuple[Sequence[str], Sequence[str]]] = None
+        self._names_offset = 0
+
+    def _write_record(self, tag: bytes, payload: bytes) -> int:
+        """Write a record, returning the file offset of its payload"""
+        self.stream.write(_RECORD.pack(tag, len(payload)))
+        offset = self.stream.tell()
+        self.stream.write(payload)
+        return offset
+
+    def write(self, dungeon: Dungeon):
+        """
+        Append one floor to the archive
+
+        Raises:
+            ValueError: The floor has no seed that fits the index, or a floor
+                with the same seed and floor number was already written
+        """
+        seed = dungeon.seed
+        if seed is None or not 0 <= seed < _U64_LIMIT:
+            raise ValueError(f"Cannot archive floor {dungeon.floor_number}: seed {seed!r} is not a u64")
+        key = (seed, dungeon.floor_number)
+        if key in self._index:
+            raise ValueError(f"Floor {dungeon.floor_number} of seed {seed} is already archived")
+
+        names = (dungeon.enemy_placements.names, dungeon.resource_placements.names)
+        if self._names is None or names[0] != self._names[0] or names[1] != self._names[1]:
+            self._names_offset = self._write_record(NAMES, _pack_names(*names))
+            self._names = names
+
+        payload = _pack_floor(dungeon, 0)
+        offset = self._write_record(FLOOR, payload)
+        self._index[key] = _INDEX_ENTRY.pack(seed, dungeon.floor_number, dungeon.width, dungeon.height,
+                                             offset, offset + _tiles_offset(payload), self._names_offset)
+
+    def close(self):
+        """Write the index and header and close the file"""
+        if self.stream.closed:
+            return
+        index_offset = self.stream.tell()
+        self.stream.write(b''.join(self._index.values()))
+        self.stream.seek(0)
+        self.stream.write(_ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, FORMAT_VERSION, index_offset, len(self._index)))
+        self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class FloorArchive:
+    """
+    Read-only, memory-mapped floor archive with random access by (seed, floor number)
+
+    Opening an archive reads only its index. get() decodes one floor's rooms
+    and placements on demand, while its tile grid (and the one grid()
+    returns) is a read-only view straight into the mapped file, so tiles are
+    paged in only as they are read. Copy a grid's cells into a bytearray
+    before editing them.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Archive written by FloorArchiveWriter
+
+        Raises:
+            ValueError: The file is not a floor archive of a supported version
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < _ARCHIVE_HEADER.size:
+                raise ValueError("Not a dungeon floor archive: missing header")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        magic, version, index_offset, count = _ARCHIVE_HEADER.unpack_from(self._view, 0)
+        if magic != ARCHIVE_MAGIC:
+            self.close()
+            raise ValueError("Not a dungeon floor archive: bad magic number")
+        if version > FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported floor archive version {version} (newest known is {FORMAT_VERSION})")
+        if index_offset + count * _INDEX_ENTRY.size > len(self._mmap):
+            self.close()
+            raise ValueError("Truncated dungeon floor archive")
+
+        self._index: Dict[Tuple[int, int], Tuple[int, int, int, int, int]] = {}
+        for seed, floor_number, width, height, offset, tiles, names in _INDEX_ENTRY.iter_unpack(
+                self._view[index_offset:index_offset + count * _INDEX_ENTRY.size]):
+            self._index[(seed, floor_number)] = (width, height, offset, tiles, names)
+        self._names: Dict[int, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key: Tuple[int, int]) -> bool:
+        return key in self._index
+
+    def keys(self) -> List[Tuple[int, int]]:
+        """Return the (seed, floor number) keys of the archived floors, in file order"""
+        return list(self._index)
+
+    def size(self, seed: int, floor_number: int) -> Optional[Tuple[int, int]]:
+        """Return the (width, height) of an archived floor without reading it, or None"""
+        entry = self._index.get((seed, floor_number))
+        return entry[:2] if entry else None
+
+    def grid(self, seed: int, floor_number: int) -> Optional[TileGrid]:
+        """
+        Return an archived floor's tile grid as a read-only view of the file
+
+        Returns:
+            The grid, or None when the floor is not archived
+        """
+        entry = self._index.get((seed, floor_number))
+        if entry is None:
+            return None
+        width, height, _, tiles, _ = entry
+        return TileGrid(width, height, self._view[tiles:tiles + width * height], owner=self)
+
+    def get(self, seed: int, floor_number: int) -> Optional[Dungeon]:
+        """
+        Return an archived floor, its grid a read-only view of the file
+
+        Returns:
+            The floor, or None when it is not archived
+        """
+        entry = self._index.get((seed, floor_number))
+        if entry is None:
+            return None
+        _, _, offset, _, names_offset = entry
+        names = self._names.get(names_offset)
+        if names is None:
+            names = _unpack_names(self._payload(names_offset))
+            self._names[names_offset] = names
+        return _unpack_floor(self._payload(offset), *names, owner=self)
+
+    def tower_floor(self, master_seed: int, floor_number: int) -> Optional[Dungeon]:
+        """Return an archived floor of the tower with the given master seed, or None"""
+        return self.get(tower_floor_seed(master_seed, floor_number), floor_number)
+
+    def _payload(self, offset: int) -> memoryview:
+        (length,) = _COUNT.unpack_from(self._view, offset - _COUNT.size)
+        return self._view[offset:offset + length]
+
+    def close(self):
+        """
+        Release the mapping
+
+        Grids handed out keep it alive until they are collected.
+        """
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Live grid views still export the mapping; it is unmapped when they go
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,91 @@
+"""
+Spatial Index Module
+Room lookup structures for fast overlap checks during room placement
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Tuple
+from .dungeon import Room
+
+
+def rooms_overlap(new_room: Room, room: Room, buffer: int = 0) -> bool:
+    """Check if two rooms overlap once new_room is grown by buffer tiles on every side"""
+    return (new_room.x < room.x + room.width + buffer and
+            new_room.x + new_room.width + buffer > room.x and
+            new_room.y < room.y + room.height + buffer and
+            new_room.y + new_room.height + buffer > room.y)
+
+
+class RoomIndex(ABC):
+    """
+    Base class for room spatial indexes
+
+    Subclasses store placed rooms and answer "does this room overlap any
+    placed room?" queries. The generator only relies on insert() and
+    overlaps(); subclasses must implement overlaps(), and those extending
+    insert() call the base version so len() stays right.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.rooms: List[Room] = []
+
+    def insert(self, room: Room):
+        """Add a placed room to the index"""
+        self.rooms.append(room)
+
+    @abstractmethod
+    def overlaps(self, new_room: Room, buffer: int = 0) -> bool:
+        """Check if new_room overlaps any indexed room (with buffer space)"""
+
+    def __len__(self):
+        return len(self.rooms)
+
+
+class LinearRoomIndex(RoomIndex):
+    """Scans every placed room on each query (O(rooms) per check)"""
+
+    def overlaps(self, new_room: Room, buffer: int = 0) -> bool:
+        for room in self.rooms:
+            if rooms_overlap(new_room, room, buffer):
+                return True
+        return False
+
+
+class GridRoomIndex(RoomIndex):
+    """
+    Uniform bucket grid over the dungeon
+
+    Each room is registered in every bucket its rectangle touches, so a query
+    only tests the rooms sharing a bucket with the buffered query rectangle.
+    With buckets about the size of a room, a check costs O(1) on average no
+    matter how many rooms are placed.
+    """
+
+    def __init__(self, width: int, height: int, cell_size: int = 16):
+        super().__init__(width, height)
+        self.cell_size = cell_size
+        self.buckets: Dict[Tuple[int, int], List[Room]] = {}
+
+    def _cells(self, x0: int, y0: int, x1: int, y1: int) -> Iterable[Tuple[int, int]]:
+        """Yield the bucket keys covering the half-open rectangle [x0, x1) x [y0, y1)"""
+        size = self.cell_size
+        for cy in range(y0 // size, (y1 - 1) // size + 1):
+            for cx in range(x0 // size, (x1 - 1) // size + 1):
+                yield (cx, cy)
+
+    def insert(self, room: Room):
+        super().insert(room)
+        for key in self._cells(room.x, room.y, room.x + room.width, room.y + room.height):
+            self.buckets.setdefault(key, []).append(room)
+
+    def overlaps(self, new_room: Room, buffer: int = 0) -> bool:
+        buckets = self.buckets
+        for key in self._cells(new_room.x - buffer, new_room.y - buffer,
+                               new_room.x + new_room.width + buffer,
+                               new_room.y + new_room.height + buffer):
+            for room in buckets.get(key, ()):
+                if rooms_overlap(new_room, room, buffer):
+                    return True
+        return False
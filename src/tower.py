@@ -0,0 +1,227 @@
+"""
+Tower Module
+Parallel generation and evaluation of whole towers across worker processes
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .dungeon import Dungeon, Room, TileGrid
+from .generator import DungeonGenerator, tower_floor_seed
+from .quality_metrics import DungeonQualityMetrics
+
+TRANSPORTS = ('pickle', 'shared_memory')
+
+# Per-process generator, built once by the pool initializer so the enemy and
+# resource tables are loaded once per worker rather than once per floor
+_worker_generator: Optional[DungeonGenerator] = None
+
+
+def _init_worker(generator_options: dict):
+    """Create the generator used by this worker process"""
+    global _worker_generator
+    _worker_generator = DungeonGenerator(**generator_options)
+
+
+def _build_floor(task: Tuple[int, int, int, int, bool],
+                 generator: Optional[DungeonGenerator] = None) -> Tuple[Dungeon, Optional[Dict]]:
+    """Generate (and optionally evaluate) one floor from its sub-seed, by default with the worker's generator"""
+    floor_number, floor_seed, width, height, evaluate = task
+    generator = generator if generator is not None else _worker_generator
+    dungeon = generator.generate(floor_number, width, height, seed=floor_seed)
+    quality = DungeonQualityMetrics(dungeon).evaluate() if evaluate else None
+    return dungeon, quality
+
+
+def _build_floor_shared(task: Tuple[int, int, int, int, bool]) -> Tuple[Dict, Optional[Dict]]:
+    """Generate one floor, leaving its tile grid in a shared memory block"""
+    dungeon, quality = _build_floor(task)
+    cells = dungeon.grid.cells
+    block = shared_memory.SharedMemory(create=True, size=max(len(cells), 1))
+    block.buf[:len(cells)] = cells
+    block.close()
+    return floor_metadata(dungeon, shm_name=block.name), quality
+
+
+def _build_floors_shared(chunk: List[Tuple[int, int, int, int, bool]]) -> List[Tuple[Dict, Optional[Dict]]]:
+    """Generate a chunk of floors into shared memory, removing the chunk's blocks again if one fails"""
+    results = []
+    try:
+        for task in chunk:
+            results.append(_build_floor_shared(task))
+    except BaseException:
+        for metadata, _ in results:
+            _discard_block(metadata['shm_name'])
+        raise
+    return results
+
+
+def _discard_block(name: str):
+    """Unlink a shared memory block nobody is going to attach"""
+    try:
+        block = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    block.close()
+    block.unlink()
+
+
+def floor_metadata(dungeon: Dungeon, **extra) -> Dict:
+    """Describe everything about a floor except its tile grid, as plain picklable data"""
+    return dict(
+        width=dungeon.width,
+        height=dungeon.height,
+        floor_number=dungeon.floor_number,
+        seed=dungeon.seed,
+        biome=dungeon.biome,
+        rooms=[(room.x, room.y, room.width, room.height, room.room_id, room.is_boss_room)
+               for room in dungeon.rooms],
+        enemy_placements=dungeon.enemy_placements,
+        resource_placements=dungeon.resource_placements,
+        entrance_pos=dungeon.entrance_pos,
+        exit_pos=dungeon.exit_pos,
+        placement_stats=dungeon.placement_stats,
+        **extra
+    )
+
+
+def rebuild_floor(metadata: Dict, grid: TileGrid) -> Dungeon:
+    """Rebuild a Dungeon around an existing tile grid from floor_metadata() output"""
+    dungeon = Dungeon(metadata['width'], metadata['height'], metadata['floor_number'], grid=grid)
+    dungeon.seed = metadata['seed']
+    dungeon.biome = metadata['biome']
+    for x, y, width, height, room_id, is_boss_room in metadata['rooms']:
+        room = Room(x, y, width, height, room_id)
+        room.is_boss_room = is_boss_room
+        # Rooms are already stamped into the grid, so skip add_room
+        room.floor = dungeon
+        dungeon.rooms.append(room)
+    dungeon.enemy_placements = metadata['enemy_placements']
+    dungeon.resource_placements = metadata['resource_placements']
+    dungeon.entrance_pos = metadata['entrance_pos']
+    dungeon.exit_pos = metadata['exit_pos']
+    dungeon.placement_stats = metadata['placement_stats']
+    return dungeon
+
+
+class SharedGridBuffer:
+    """
+    Parent-side mapping of a worker's shared memory grid block
+
+    The block is unlinked as soon as it is attached, so nothing leaks if the
+    parent dies; the mapping itself stays valid until this object is
+    collected, which happens with the TileGrid that holds it as its owner.
+    """
+
+    def __init__(self, name: str, size: int):
+        self.block = shared_memory.SharedMemory(name=name)
+        self.block.unlink()
+        self.view = self.block.buf[:size]
+
+    def __del__(self):
+        self.view.release()
+        self.block.close()
+
+
+def _attach_floor(metadata: Dict) -> Dungeon:
+    """Rebuild a floor whose grid a worker left in shared memory, without copying the grid"""
+    width, height = metadata['width'], metadata['height']
+    buffer = SharedGridBuffer(metadata['shm_name'], width * height)
+    return rebuild_floor(metadata, TileGrid(width, height, buffer.view, owner=buffer))
+
+
+def generate_tower_parallel(seed: int, floors: Iterable[int] = range(1, 101), width: int = 60,
+                            height: int = 40, workers: Optional[int] = None, evaluate: bool = False,
+                            chunksize: int = 1, transport: str = 'pickle',
+                            **generator_options) -> Iterator[Tuple[Dungeon, Optional[Dict]]]:
+    """
+    Generate a tower with floors spread across a process pool
+
+    Each floor depends only on its sub-seed, tower_floor_seed(seed, floor),
+    so the floors are identical to DungeonGenerator.generate_tower() with the
+    same master seed, whatever the number of workers.
+
+    With transport='shared_memory' each worker writes the packed tile grid
+    into a multiprocessing.shared_memory block and only sends back the
+    floor's metadata (rooms, enemy and resource positions). The parent wraps
+    the block in a TileGrid without copying it, which avoids pickling large
+    grids through the pool's pipes.
+
+    Args:
+        seed: Master seed of the tower
+        floors: Floor numbers to generate; results come back in this order
+        width: Dungeon grid width
+        height: Dungeon grid height
+        workers: Number of worker processes (default: one per CPU); 1 runs
+            everything in this process
+        evaluate: Also run the DQS evaluation in the workers
+        chunksize: Floors handed to a worker at a time
+        transport: How worker results reach this process, 'pickle' or
+            'shared_memory' (ignored when workers is 1)
+        **generator_options: Passed to DungeonGenerator (placement, room_index)
+
+    Yields:
+        (dungeon, quality) pairs, quality being the evaluate() results or None
+    """
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unknown transport {transport!r}, expected one of {TRANSPORTS}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    tasks = [(floor_number, tower_floor_seed(seed, floor_number), width, height, evaluate)
+             for floor_number in floors]
+
+    if workers <= 1:
+        # A generator of our own, leaving the module's worker generator alone
+        generator = DungeonGenerator(**generator_options)
+        for task in tasks:
+            yield _build_floor(task, generator)
+        return
+
+    if transport == 'shared_memory':
+        # Start the resource tracker here so the workers share it with this
+        # process and the blocks they create are unregistered when we unlink them
+        resource_tracker.ensure_running()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(generator_options,)) as executor:
+        if transport == 'shared_memory':
+            yield from _collect_shared(executor, tasks, chunksize)
+        else:
+            yield from executor.map(_build_floor, tasks, chunksize=chunksize)
+
+
+def _collect_shared(executor: ProcessPoolExecutor, tasks: List[Tuple[int, int, int, int, bool]],
+                    chunksize: int) -> Iterator[Tuple[Dungeon, Optional[Dict]]]:
+    """
+    Attach the floors workers leave in shared memory, in task order
+
+    A block is normally unlinked when its floor is attached. If iteration
+    stops early or a worker fails, the blocks of every floor that was
+    built but never attached are unlinked on the way out, so none are left
+    behind in /dev/shm.
+    """
+    futures = [executor.submit(_build_floors_shared, tasks[start:start + chunksize])
+               for start in range(0, len(tasks), chunksize)]
+    unattached = []
+    collected = 0
+    try:
+        for future in futures:
+            results = future.result()
+            collected += 1
+            unattached = [metadata['shm_name'] for metadata, _ in results]
+            for metadata, quality in results:
+                unattached.pop(0)
+                yield _attach_floor(metadata), quality
+    finally:
+        for future in futures[collected:]:
+            if future.cancel():
+                continue
+            try:
+                unattached.extend(metadata['shm_name'] for metadata, _ in future.result())
+            except BaseException:
+                # A failed chunk has already removed its own blocks
+                pass
+        for name in unattached:
+            _discard_block(name)
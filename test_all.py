@@ -45,6 +45,136 @@ def test_basic_generation():
         return False
 
 
+def test_tower_generation():
+    """Test seeded tower generation and per-floor reproducibility"""
+    print("Testing tower generation...")
+    try:
+        from src.generator import DungeonGenerator, tower_floor_seed
+        from src.renderer import ASCIIRenderer
+
+        renderer = ASCIIRenderer()
+        gen = DungeonGenerator()
+        tower = list(gen.generate_tower(range(1, 13), width=40, height=30, seed=99))
+
+        assert [d.floor_number for d in tower] == list(range(1, 13))
+        assert tower[10].rooms[0].is_boss_room  # Floor 11 is a boss floor
+
+        # Any floor can be rebuilt on its own from its sub-seed
+        floor_7 = DungeonGenerator().generate(7, 40, 30, seed=tower_floor_seed(99, 7))
+        assert tower[6].seed == floor_7.seed
+        assert renderer.render(tower[6]) == renderer.render(floor_7)
+        assert tower[6].enemies == floor_7.enemies
+
+        print(f"✓ Generated {len(tower)}-floor tower, floor 7 reproduced from its sub-seed\n")
+        return True
+    except Exception as e:
+        print(f"✗ Tower generation error: {e}\n")
+        return False
+
+
+def test_parallel_tower():
+    """Test that parallel tower generation matches sequential generation"""
+    print("Testing parallel tower generation...")
+    try:
+        from src.generator import DungeonGenerator
+        from src.pathfinding import PathfindingValidator
+        from src.quality_metrics import DungeonQualityMetrics
+        from src.renderer import ASCIIRenderer
+        from src.tower import generate_tower_parallel
+
+        renderer = ASCIIRenderer()
+        floors = range(1, 9)
+        sequential = list(DungeonGenerator().generate_tower(floors, width=40, height=30, seed=1234))
+        parallel = list(generate_tower_parallel(1234, floors, width=40, height=30, workers=2, evaluate=True))
+
+        for expected, (dungeon, quality) in zip(sequential, parallel):
+            assert renderer.render(expected) == renderer.render(dungeon)
+            assert expected.enemies == dungeon.enemies
+            assert expected.resources == dungeon.resources
+            assert 'dungeon_quality_score' in quality
+
+        # Shared-memory transport rebuilds the same floors around the worker's grid
+        shared = generate_tower_parallel(1234, floors, width=40, height=30, workers=2,
+                                         transport='shared_memory')
+        for expected, (dungeon, _) in zip(sequential, shared):
+            assert isinstance(dungeon.grid.cells, memoryview)
+            assert renderer.render(expected) == renderer.render(dungeon)
+            assert [room.enemies for room in expected.rooms] == [room.enemies for room in dungeon.rooms]
+            assert expected.entrance_pos == dungeon.entrance_pos
+            # Floors backed by shared memory evaluate and validate like any other
+            assert DungeonQualityMetrics(dungeon).evaluate() == DungeonQualityMetrics(expected).evaluate()
+            assert (PathfindingValidator(dungeon).validate_connectivity() ==
+                    PathfindingValidator(expected).validate_connectivity())
+
+        # Blocks of floors never attached are removed when iteration stops or a worker fails
+        if os.path.isdir('/dev/shm'):
+            before = set(os.listdir('/dev/shm'))
+            partial = generate_tower_parallel(1234, range(1, 13), width=100, height=100, workers=2,
+                                              transport='shared_memory')
+            next(partial)
+            partial.close()
+            try:
+                # A floor number the generator cannot compare fails in its worker
+                list(generate_tower_parallel(1234, [1, 2, 3, 'x', 5, 6], width=40, height=30, workers=2,
+                                             transport='shared_memory'))
+                raise AssertionError("worker failure not raised")
+            except TypeError:
+                pass
+            assert set(os.listdir('/dev/shm')) <= before
+
+        # The in-process path builds its own generator rather than the workers' global one
+        import src.tower as tower
+        list(generate_tower_parallel(1234, range(1, 3), width=40, height=30, workers=1))
+        assert tower._worker_generator is None
+
+        # Two generators in one process no longer share a random stream
+        a, b = DungeonGenerator(seed=5), DungeonGenerator(seed=6)
+        b.generate(9, 40, 30)
+        interleaved = renderer.render(a.generate(3, 40, 30))
+        assert renderer.render(DungeonGenerator(seed=5).generate(3, 40, 30)) == interleaved
+
+        print(f"✓ {len(parallel)} floors identical across 1 and 2 worker processes\n")
+        return True
+    except Exception as e:
+        print(f"✗ Parallel tower error: {e}\n")
+        return False
+
+
+def test_generation_events():
+    """Test that the generation event stream describes every change"""
+    print("Testing generation event stream...")
+    try:
+        from src.dungeon import Dungeon, Room, CORRIDOR
+        from src.events import EventLog
+        from src.generator import DungeonGenerator
+
+        log = EventLog()
+        dungeon = DungeonGenerator(seed=21).generate(floor_number=10, width=50, height=35, on_event=log)
+
+        assert log.events[0].kind == 'biome' and log.events[-1].kind == 'complete'
+        timestamps = [event.timestamp for event in log.events]
+        assert timestamps == sorted(timestamps)
+
+        # Replaying the room and corridor records rebuilds the grid exactly
+        replay = Dungeon(dungeon.width, dungeon.height, dungeon.floor_number)
+        for event in log.events:
+            if event.kind == 'room':
+                replay.add_room(Room(*event.rect, event.room_id))
+            elif event.kind == 'corridor':
+                for x, y in event.tiles:
+                    replay.grid.set(x, y, CORRIDOR)
+        assert replay.grid.cells == dungeon.grid.cells
+
+        assert [e.position for e in log.of_kind('enemy')] == dungeon.enemies
+        assert [e.position for e in log.of_kind('resource')] == dungeon.resources
+
+        print(f"✓ {len(log)} events replay to the generated floor\n")
+        return True
+    except Exception as e:
+        print(f"✗ Generation event error: {e}\n")
+        return False
+
+
 def test_pathfinding():
     """Test BFS pathfinding validation"""
     print("Testing BFS pathfinding validation...")
@@ -68,6 +198,106 @@ def test_pathfinding():
         return False
 
 
+def test_reachable_mask():
+    """Test the flat reachability mask against the tuple-set BFS"""
+    print("Testing reachability mask...")
+    try:
+        from src.dungeon import Dungeon
+        from src.generator import DungeonGenerator
+        from src.pathfinding import PathfindingValidator
+        from src.quality_metrics import EvaluationContext
+
+        gen = DungeonGenerator(seed=7)
+        dungeon = gen.generate(floor_number=60, width=60, height=40)
+        validator = PathfindingValidator(dungeon)
+        start = dungeon.rooms[0].center
+
+        mask = validator.reachable_mask(start)
+        positions = validator.bfs_reachability(start)
+        assert len(mask) == dungeon.width * dungeon.height
+        assert mask.count(1) == len(positions)
+        assert all(validator.is_reachable(mask, pos) for pos in positions)
+        assert not validator.is_reachable(mask, (-1, 0))
+
+        results = validator.validate_connectivity()
+        assert results['reachable_tiles'] == len(positions)
+
+        # The mask stays out of the results and is memoized by the evaluation context
+        keys = {'valid', 'connected_rooms', 'total_rooms', 'accessible_resources', 'total_resources',
+                'reachable_tiles'}
+        assert set(results) == keys
+        assert set(PathfindingValidator(Dungeon(10, 10, 1)).validate_connectivity()) == keys | {'reason'}
+        context = EvaluationContext(dungeon)
+        assert context.reachable == mask and context.reachable is context.reachable
+        assert dict(context.validation) == results
+
+        print(f"✓ Reachability mask matches BFS ({len(positions)} tiles)\n")
+        return True
+    except Exception as e:
+        print(f"✗ Reachability mask error: {e}\n")
+        return False
+
+
+def test_component_labeling():
+    """Test connected-component labeling of a floor with a cut-off room"""
+    print("Testing connected-component labeling...")
+    try:
+        from src.dungeon import Dungeon, Room
+        from src.pathfinding import PathfindingValidator
+
+        dungeon = Dungeon(30, 20, floor_number=1)
+        dungeon.add_room(Room(2, 2, 6, 5, 0))
+        dungeon.add_room(Room(12, 2, 6, 5, 1))
+        dungeon.add_room(Room(22, 10, 6, 5, 2))
+        dungeon.create_corridor(dungeon.rooms[0].center, dungeon.rooms[1].center)
+        for x, y, room_id in ((4, 4, 0), (24, 12, 2), (0, 0, -1)):
+            dungeon.enemy_placements.add(0, x, y, room_id)
+        dungeon.resource_placements.add(0, 14, 4, 1)
+
+        components = PathfindingValidator(dungeon).label_components()
+        assert components['component_count'] == 2
+        assert components['room_components'] == {0: 1, 1: 1, 2: 2}
+        assert components['enemy_components'] == [1, 2, 0]
+        assert components['resource_components'] == [1]
+        assert sum(components['component_sizes'].values()) == dungeon.walkable_mask().count(1)
+
+        print(f"✓ Found {components['component_count']} regions, sizes {components['component_sizes']}\n")
+        return True
+    except Exception as e:
+        print(f"✗ Component labeling error: {e}\n")
+        return False
+
+
+def test_find_path():
+    """Test A* path finding between room centers"""
+    print("Testing A* path finding...")
+    try:
+        from src.generator import DungeonGenerator
+        from src.pathfinding import PathfindingValidator
+
+        gen = DungeonGenerator(seed=42)
+        dungeon = gen.generate(floor_number=1, width=40, height=30)
+        validator = PathfindingValidator(dungeon)
+
+        start = dungeon.rooms[0].center
+        goal = dungeon.rooms[-1].center
+        path = validator.find_path(start, goal)
+
+        assert path is not None
+        assert path[0] == start and path[-1] == goal
+        assert len(path) - 1 >= validator.manhattan_distance(start, goal)
+        for (x1, y1), (x2, y2) in zip(path, path[1:]):
+            assert abs(x1 - x2) + abs(y1 - y2) == 1
+            assert dungeon.is_walkable(x2, y2)
+        assert validator.find_path(start, (0, 0)) is None
+
+        print(f"✓ Path from room 1 to room {len(dungeon.rooms)}: {len(path)} tiles\n")
+        return True
+    except Exception as e:
+        print(f"✗ Path finding error: {e}\n")
+        return False
+
+
 def test_dqs_metrics():
     """Test DQS quality metrics"""
     print("Testing DQS quality metrics...")
@@ -96,6 +326,827 @@ def test_dqs_metrics():
         return False
 
 
+def test_evaluation_context():
+    """Test that DQS evaluation reuses one reachability pass per dungeon revision"""
+    print("Testing incremental DQS evaluation...")
+    try:
+        from src.dungeon import Dungeon, Room
+        from src.pathfinding import PathfindingValidator
+        from src.quality_metrics import DungeonQualityMetrics
+
+        class CountingValidator(PathfindingValidator):
+            passes = 0
+
+            def reachable_mask(self, start):
+                CountingValidator.passes += 1
+                return super().reachable_mask(start)
+
+        dungeon = Dungeon(30, 20, floor_number=1)
+        dungeon.add_room(Room(2, 2, 8, 6, 0))
+        dungeon.add_room(Room(18, 10, 8, 6, 1))
+        quality = DungeonQualityMetrics(dungeon)
+        quality.context.validator = CountingValidator(dungeon)
+
+        results = quality.evaluate()
+        report = quality.generate_report()
+        assert quality.evaluate() == results and CountingValidator.passes == 1
+        assert not results['validation']['all_rooms_connected'] and "cut off rooms: 1" in report
+
+        # Callers get their own copy of the memoized results
+        results['extra'] = True
+        results['metrics']['pathability'] = -1.0
+        again = quality.evaluate()
+        assert 'extra' not in again and again['metrics']['pathability'] >= 0 and CountingValidator.passes == 1
+        try:
+            quality.context.validation['valid'] = True
+            raise AssertionError("memoized validation should be read-only")
+        except TypeError:
+            pass
+
+        # Carving a corridor starts a new revision, so the floor is re-evaluated
+        dungeon.create_corridor(dungeon.rooms[0].center, dungeon.rooms[1].center)
+        connected = quality.evaluate()
+        assert CountingValidator.passes == 2
+        assert connected['validation']['all_rooms_connected']
+        assert connected == DungeonQualityMetrics(dungeon).evaluate()
+
+        print(f"✓ {CountingValidator.passes} reachability passes for 2 revisions\n")
+        return True
+    except Exception as e:
+        print(f"✗ Evaluation context error: {e}\n")
+        return False
+
+
+def test_batch_scoring():
+    """Test that batch DQS scoring matches per-floor evaluation"""
+    print("Testing batch DQS scoring...")
+    try:
+        from src.batch_metrics import DQSBatch, percentile, score_batch
+        from src.dungeon import Dungeon
+        from src.quality_metrics import DungeonQualityMetrics, floor_tier
+        from src.tower import generate_tower_parallel
+
+        batch = DQSBatch()
+        evaluated = []
+        for dungeon, results in generate_tower_parallel(5, range(1, 41), width=40, height=30,
+                                                        workers=1, evaluate=True):
+            batch.add_results(dungeon.floor_number, dungeon.biome, results)
+            evaluated.append(results)
+        empty = Dungeon(10, 10, floor_number=90)
+        batch.add_dungeon(empty)
+        evaluated.append(DungeonQualityMetrics(empty).evaluate())
+
+        scores = score_batch(batch, quantiles=(0, 50, 100))
+        columns = scores['columns']
+        assert scores['count'] == len(evaluated) == 41
+        for i, results in enumerate(evaluated):
+            assert round(columns['dungeon_quality_score'][i], 3) == results['dungeon_quality_score']
+            assert columns['grade'][i] == results['grade'][0]
+            for metric, value in results['metrics'].items():
+                assert round(columns[metric][i], 3) == value
+
+        tiers = scores['percentiles']['tier']
+        assert sum(group['count'] for group in tiers.values()) == 41
+        mid_game = sorted(score for score, tier in zip(columns['dungeon_quality_score'], columns['tier'])
+                          if tier == floor_tier(30))
+        assert tiers['Mid Game'][0] == mid_game[0] and tiers['Mid Game'][100] == mid_game[-1]
+        assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+
+        print(f"✓ {scores['count']} floors scored as columns, {len(tiers)} tiers\n")
+        return True
+    except Exception as e:
+        print(f"✗ Batch scoring error: {e}\n")
+        return False
+
+
+def test_streaming_stats():
+    """Test the streaming DQS aggregator against exact statistics"""
+    print("Testing streaming DQS statistics...")
+    try:
+        import pickle
+        import statistics
+        from src.dqs_stats import DQSAggregator
+        from src.tower import generate_tower_parallel
+
+        evaluated = list(generate_tower_parallel(6, range(1, 31), width=40, height=30,
+                                                 workers=1, evaluate=True))
+        scores = sorted(results['dungeon_quality_score'] for _, results in evaluated)
+
+        whole = DQSAggregator()
+        whole.add_all(evaluated)
+        overall = whole.overall()['dungeon_quality_score']
+        assert overall['count'] == 30
+        assert abs(overall['mean'] - statistics.mean(scores)) < 1e-9
+        assert abs(overall['variance'] - statistics.variance(scores)) < 1e-9
+        assert (overall['min'], overall['max']) == (scores[0], scores[-1])
+        assert overall['quantiles'][50] == scores[14]
+
+        # Partial aggregates (e.g. from workers) merge into the same statistics
+        first, second = DQSAggregator(), DQSAggregator()
+        first.add_all(evaluated[:11])
+        second.add_all(evaluated[11:])
+        merged = first.merge(pickle.loads(pickle.dumps(second)))
+        for tier, summary in merged.summary(by='tier').items():
+            expected = whole.summary(by='tier')[tier]
+            assert summary['grades'] == expected['grades']
+            assert summary['dungeon_quality_score']['quantiles'] == expected['dungeon_quality_score']['quantiles']
+            assert abs(summary['dungeon_quality_score']['mean'] - expected['dungeon_quality_score']['mean']) < 1e-9
+
+        # A group named 'all' is kept apart from the overall statistics
+        named = DQSAggregator()
+        named.add_all(evaluated[:5])
+        named.add(1, 'all', evaluated[5][1])
+        groups = named.summary(by='biome')
+        assert groups['all']['count'] == 1 and named.overall()['count'] == 6
+        assert sum(group['count'] for group in groups.values()) == 6
+
+        print(f"✓ {len(whole)} floors summarized in {len(whole.groups)} groups, merge consistent\n")
+        return True
+    except Exception as e:
+        print(f"✗ Streaming statistics error: {e}\n")
+        return False
+
+
+def test_generate_until():
+    """Test generating until a DQS target with early rejection of weak layouts"""
+    print("Testing generate-until-DQS mode...")
+    try:
+        from src.dungeon import Dungeon, Room, TileType
+        from src.generator import DungeonGenerator
+        from src.quality_metrics import DungeonQualityMetrics
+
+        generator = DungeonGenerator(seed=4)
+        dungeon, report = generator.generate_until(floor_number=80, target_dqs=0.97, max_attempts=100)
+        assert report['reached'] and dungeon is not None
+        assert report['quality']['dungeon_quality_score'] >= 0.97
+        assert report['attempts'] == report['evaluated'] + report['rejected_early']
+        assert report['rejected_early'] == sum(report['rejections'].values()) > 0
+
+        # The accepted floor is reproducible from its recorded seed
+        rebuilt = DungeonGenerator().generate(80, seed=dungeon.seed)
+        assert DungeonQualityMetrics(rebuilt).evaluate() == report['quality']
+
+        # Early rejection never throws away a floor that would have reached the target
+        for seed in range(40):
+            rejected = []
+
+            def screen(layout, params, corridors, carved):
+                reason = generator._screen_layout(layout, params, 0.9, False, corridors, carved)
+                rejected.extend([reason] if reason else [])
+                return reason is None
+
+            generator._generate_layout(seed % 20 + 1, 60, 40, seed=seed, screen=screen)
+            if rejected:
+                floor = generator.generate(seed % 20 + 1, seed=seed)
+                assert DungeonQualityMetrics(floor).evaluate()['dungeon_quality_score'] < 0.9
+
+        # A hopeless layout is given up on before its corridors are carved
+        layout, _ = generator._generate_layout(5, 60, 40, seed=1, screen=lambda *args: False)
+        assert layout.rooms and TileType.CORRIDOR.code not in layout.grid.cells
+
+        # A cut-off room only costs its share of the connectivity weight
+        layout = Dungeon(30, 20, 1)
+        layout.add_room(Room(1, 1, 10, 10, 0))
+        layout.add_room(Room(15, 1, 10, 10, 1))
+        assert layout.connected_rooms() == 1
+        assert generator._screen_layout(layout, {'room_count': 2}, 0.5, True) is None
+        assert generator._screen_layout(layout, {'room_count': 2}, 0.9, True) == 'dqs_bound'
+
+        # An unreachable target gives up after max_attempts
+        dungeon, report = generator.generate_until(floor_number=1, target_dqs=1.01, max_attempts=5)
+        assert not report['reached'] and report['attempts'] == 5
+
+        print("✓ Target reached, weak layouts rejected before enemies and resources\n")
+        return True
+    except Exception as e:
+        print(f"✗ Generate-until error: {e}\n")
+        return False
+
+
+def test_incremental_connectivity():
+    """Test the union-find connectivity a dungeon keeps while it is carved"""
+    print("Testing incremental connectivity...")
+    try:
+        import pickle
+        import random
+        from src.dungeon import Dungeon, Room, TileType
+        from src.generator import DungeonGenerator
+        from src.pathfinding import PathfindingValidator
+
+        # Random rooms and corridors agree with a full search of the grid
+        rng = random.Random(7)
+        for _ in range(200):
+            dungeon = Dungeon(30, 20, 1)
+            for _ in range(rng.randint(2, 10)):
+                if rng.random() < 0.5:
+                    dungeon.add_room(Room(rng.randint(0, 26), rng.randint(0, 16), rng.randint(3, 9),
+                                          rng.randint(3, 7), len(dungeon.rooms)))
+                else:
+                    dungeon.create_corridor((rng.randint(0, 29), rng.randint(0, 19)),
+                                            (rng.randint(0, 29), rng.randint(0, 19)))
+            expected = PathfindingValidator(dungeon).validate_connectivity()['connected_rooms']
+            assert dungeon.connected_rooms() == expected
+            assert pickle.loads(pickle.dumps(dungeon)).connected_rooms() == expected
+
+        # A room walling off a corridor splits it; connectivity is rebuilt on the next query
+        dungeon = Dungeon(30, 10, 1)
+        dungeon.add_room(Room(0, 0, 6, 6, 0))
+        dungeon.add_room(Room(20, 0, 6, 6, 1))
+        dungeon.create_corridor((2, 2), (22, 2))
+        assert dungeon.rooms_connected()
+        dungeon.add_room(Room(10, 0, 5, 5, 2))
+        assert dungeon._stale and not dungeon.rooms_connected()
+        assert dungeon.tile_component(2, 2) != dungeon.tile_component(22, 2)
+
+        # Direct grid edits are picked up once invalidated
+        dungeon = Dungeon(10, 3, 1)
+        dungeon.grid.fill_rect(0, 1, 10, 1, TileType.FLOOR.code)
+        dungeon.invalidate_connectivity()
+        assert dungeon.tile_component(0, 1) == dungeon.tile_component(9, 1) >= 0
+        assert dungeon.tile_component(0, 0) == -1 and dungeon.tile_component(10, 1) == -1
+
+        # Nothing is allocated until a floor is carved or queried
+        dungeon = Dungeon(30, 20, 1)
+        assert dungeon._owner is None and dungeon.connected_rooms() == 0
+        dungeon = Dungeon(30, 20, 1)
+        dungeon.add_room(Room(2, 2, 6, 6, 0))
+        assert dungeon._owner is not None and dungeon.rooms_connected()
+
+        # Layouts are tracked while carving; finished floors drop the
+        # per-tile owners and rebuild them on the next query
+        generator = DungeonGenerator(seed=3)
+        for seed in range(20):
+            dungeon, _ = generator._generate_layout(seed * 5 + 1, 60, 40, seed=seed)
+            assert not dungeon._stale
+            assert dungeon.connected_rooms() == \
+                PathfindingValidator(dungeon).validate_connectivity()['connected_rooms']
+            dungeon = DungeonGenerator(seed=seed).generate(seed * 5 + 1)
+            assert dungeon._owner is None
+            assert dungeon.connected_rooms() == \
+                PathfindingValidator(dungeon).validate_connectivity()['connected_rooms']
+
+        print("✓ Room connectivity tracked while carving, matches the validator\n")
+        return True
+    except Exception as e:
+        print(f"✗ Incremental connectivity error: {e}\n")
+        return False
+
+
+def test_packed_grid():
+    """Test the byte-packed tile grid"""
+    print("Testing packed tile grid...")
+    try:
+        from src.dungeon import Dungeon, Room, TileType
+
+        dungeon = Dungeon(20, 10, floor_number=1)
+        assert len(dungeon.grid.cells) == 20 * 10
+        assert dungeon.get_tile(3, 3) == TileType.EMPTY
+
+        dungeon.add_room(Room(2, 2, 6, 5, 0))
+        dungeon.add_room(Room(12, 2, 6, 5, 1))
+        dungeon.create_corridor(dungeon.rooms[0].center, dungeon.rooms[1].center)
+
+        assert dungeon.get_tile(2, 2) == TileType.WALL
+        assert dungeon.get_tile(4, 4) == TileType.FLOOR
+        assert dungeon.get_tile(10, 4) == TileType.CORRIDOR
+        assert dungeon.is_walkable(10, 4)
+        assert not dungeon.is_walkable(-1, 4)
+        assert dungeon.get_tile(50, 50) == TileType.EMPTY
+
+        print(f"✓ Packed grid working ({len(dungeon.grid.cells)} bytes for 20x10)\n")
+        return True
+    except Exception as e:
+        print(f"✗ Packed grid error: {e}\n")
+        return False
+
+
+def test_slice_stamping():
+    """Test slice-based room stamping and corridor carving against per-tile writes"""
+    print("Testing slice stamping...")
+    try:
+        import random
+        from src.dungeon import Dungeon, Room, TileGrid, EMPTY, WALL, FLOOR, CORRIDOR
+
+        def stamp_per_tile(grid, room):
+            # Reference: the original bounds-checked loop, one tile at a time
+            for y in range(room.y, room.y + room.height):
+                for x in range(room.x, room.x + room.width):
+                    if grid.in_bounds(x, y):
+                        grid.set(x, y, FLOOR)
+            for x in range(room.x, room.x + room.width):
+                if 0 <= x < grid.width:
+                    if 0 < room.y < grid.height:
+                        grid.set(x, room.y, WALL)
+                    if 0 <= room.y + room.height - 1 and room.y + room.height < grid.height:
+                        grid.set(x, room.y + room.height - 1, WALL)
+            for y in range(room.y, room.y + room.height):
+                if 0 <= y < grid.height:
+                    if 0 < room.x < grid.width:
+                        grid.set(room.x, y, WALL)
+                    if 0 <= room.x + room.width - 1 and room.x + room.width < grid.width:
+                        grid.set(room.x + room.width - 1, y, WALL)
+
+        def carve_per_tile(grid, start, end):
+            (x1, y1), (x2, y2) = start, end
+            path = [(x, y1) for x in range(min(x1, x2), max(x1, x2) + 1)]
+            path += [(x2, y) for y in range(min(y1, y2), max(y1, y2) + 1)]
+            for x, y in path:
+                if grid.in_bounds(x, y) and grid.get(x, y) in (EMPTY, WALL):
+                    grid.set(x, y, CORRIDOR)
+
+        rng = random.Random(3)
+        for _ in range(100):
+            width, height = rng.randint(8, 50), rng.randint(8, 40)
+            dungeon = Dungeon(width, height, 1)
+            reference = TileGrid(width, height)
+            for index in range(rng.randint(1, 8)):
+                # Rooms may hang off any edge of the grid
+                w, h = rng.randint(3, 15), rng.randint(3, 12)
+                room = Room(rng.randint(1 - w, width - 1), rng.randint(1 - h, height - 1), w, h, index)
+                dungeon.add_room(room)
+                stamp_per_tile(reference, room)
+            for _ in range(rng.randint(1, 6)):
+                a = (rng.randint(-3, width + 2), rng.randint(-3, height + 2))
+                b = (rng.randint(-3, width + 2), rng.randint(-3, height + 2))
+                # Both L orders: horizontal along a's row or along b's row first
+                for start, end in ((a, b), (b, a)):
+                    dungeon.create_corridor(start, end)
+                    carve_per_tile(reference, start, end)
+            assert dungeon.grid.cells == reference.cells
+
+        print("✓ Slice stamping and carving match per-tile writes\n")
+        return True
+    except Exception as e:
+        print(f"✗ Slice stamping error: {e}\n")
+        return False
+
+
+def test_renderer_overlay():
+    """Test overlay rendering on top of the translated grid"""
+    print("Testing renderer overlays...")
+    try:
+        from src.generator import DungeonGenerator
+        from src.renderer import ASCIIRenderer
+
+        dungeon = DungeonGenerator(seed=11).generate(floor_number=2, width=40, height=30)
+        renderer = ASCIIRenderer()
+        plain = renderer.render(dungeon).split("\n")
+        room = dungeon.rooms[0]
+        inside = (room.x + 1, room.y + 1)
+
+        overlay = renderer.render_with_overlay(
+            dungeon,
+            enemies=[(inside[0], inside[1], 'e'), (0, 0, 'e'), (-1, 3, 'e')],
+            resources=[(inside[0], inside[1], '$'), (inside[0] + 1, inside[1], '$')]
+        ).split("\n")
+
+        # Row offset 2 skips the header and blank line
+        assert overlay[2 + inside[1]][inside[0]] == 'e'  # Enemies drawn over resources
+        assert overlay[2 + inside[1]][inside[0] + 1] == '$'
+        assert overlay[2][0] == plain[2][0]  # Overlays on walls/void are dropped
+        assert sum(a != b for a, b in zip(plain, overlay)) == 1
+
+        print("✓ Overlays drawn on walkable tiles only, enemies on top\n")
+        return True
+    except Exception as e:
+        print(f"✗ Renderer overlay error: {e}\n")
+        return False
+
+
+def test_incremental_animation():
+    """Test that animation frames after the first only send changed cells"""
+    print("Testing incremental animation...")
+    try:
+        import io
+        from src.dungeon import Dungeon, Room
+        from src.events import CorridorCarved
+        from src.generator import DungeonGenerator
+        from src.renderer import TerminalAnimator, CLEAR_SCREEN
+
+        stream = io.StringIO()
+        animator = TerminalAnimator(stream=stream)
+        dungeon = Dungeon(30, 20, 1)
+
+        first = animator.draw(animator.frame_lines(dungeon, "Step"))
+        assert CLEAR_SCREEN in first
+
+        # Same frame again: nothing to send
+        assert animator.draw(animator.frame_lines(dungeon, "Step")) == ""
+
+        # One tile changed: a single cursor move and symbol
+        dungeon.create_corridor((5, 5), (5, 5))
+        update = animator.draw(animator.frame_lines(dungeon, "Step"))
+        assert update == "\x1b[11;6H,", repr(update)  # 3 message lines + header + blank line above row 5
+
+        dungeon.add_room(Room(10, 10, 5, 4, 0))
+        update = animator.draw(animator.frame_lines(dungeon, "Step"))
+        # Four room rows plus the room count in the header
+        assert CLEAR_SCREEN not in update and update.count("\x1b[") == 5, repr(update)
+
+        # Fed generation events, a step touches only the dirty tiles, without rendering the map
+        stream = io.StringIO()
+        animator = TerminalAnimator(stream=stream)
+        dungeon = Dungeon(30, 20, 1)
+        animator.step(dungeon, "Step", delay=0)
+        animator.renderer._render_rows = None
+        changed = []
+        dungeon.create_corridor((5, 5), (5, 5), changed)
+        animator(CorridorCarved(1, (5, 5), (5, 5), [(i % 30, i // 30) for i in changed]))
+        before = len(stream.getvalue())
+        animator.step(dungeon, "Step", delay=0)
+        assert stream.getvalue()[before:] == "\x1b[11;6H,", repr(stream.getvalue()[before:])
+
+        # Without new events a step diffs the whole frame again
+        del animator.renderer._render_rows
+        dungeon.create_corridor((7, 5), (7, 5))
+        animator.step(dungeon, "Step", delay=0)
+        assert animator.frame == animator.frame_lines(dungeon, "Step")
+
+        # Overlays that move onto tiles no event touched are redrawn where they were and are
+        changed = []
+        dungeon.create_corridor((5, 7), (9, 7), changed)
+        animator(CorridorCarved(1, (5, 7), (9, 7), [(i % 30, i // 30) for i in changed]))
+        animator.step(dungeon, "Step", [(6, 7, 'e')], delay=0)
+        animator(CorridorCarved(1, (5, 5), (5, 5), []))
+        animator.step(dungeon, "Step", [(8, 7, 'e')], delay=0)
+        assert animator.frame == animator.frame_lines(dungeon, "Step", [(8, 7, 'e')])
+
+        # Finishing forgets the recorded events
+        animator(CorridorCarved(1, (5, 5), (5, 5), []))
+        animator.finish()
+        assert not animator.tracking and not animator.dirty
+
+        # A whole floor animated from its events ends on the same frame as a full render
+        generator = DungeonGenerator(seed=4)
+        animator = TerminalAnimator(stream=io.StringIO())
+        steps = []
+
+        def animate(floor, message):
+            enemies = [(x, y, 'e') for x, y in floor.enemies]
+            resources = [(x, y, '$') for x, y in floor.resources]
+            steps.append((message, enemies, resources))
+            animator.step(floor, message, enemies, resources, delay=0)
+
+        dungeon = generator.generate(12, 40, 30, animate_callback=animate, on_event=animator)
+        message, enemies, resources = steps[-1]
+        assert animator.frame == animator.frame_lines(dungeon, message, enemies, resources)
+
+        print("✓ Later frames write only changed cells\n")
+        return True
+    except Exception as e:
+        print(f"✗ Incremental animation error: {e}\n")
+        return False
+
+
+def test_placement_columns():
+    """Test slotted records and the struct-of-arrays placement store"""
+    print("Testing placement columns...")
+    try:
+        from array import array
+        from src.generator import DungeonGenerator
+
+        generator = DungeonGenerator(seed=8)
+        dungeon = generator.generate(floor_number=22, width=60, height=40)
+        placements = dungeon.enemy_placements
+
+        assert isinstance(placements.x, array) and len(placements) == len(dungeon.enemies)
+        assert list(dungeon.enemies) == list(zip(placements.x, placements.y))
+
+        # Room accessors are views over the dungeon's columns
+        by_room = [pos for room in dungeon.rooms for _, pos in room.enemies]
+        assert sorted(by_room) == sorted(dungeon.enemies)
+        for room in dungeon.rooms:
+            for name, (x, y) in room.resources:
+                assert room.contains_point(x, y)
+                assert generator.resource_manager.get_resource(name).catalog_id >= 0
+
+        # Placements are (catalog ID, x, y) records; names are resolved on demand
+        enemies = generator.enemy_manager
+        for index, (catalog_id, x, y) in enumerate(placements):
+            assert enemies.get_enemy_by_id(catalog_id).name == placements.name(index)
+        assert sum(placements.counts().values()) == len(placements)
+        assert set(placements.named_counts()) == {name for room in dungeon.rooms for name, _ in room.enemies}
+
+        # Records carry no per-instance __dict__
+        enemy = next(iter(generator.enemy_manager.enemies.values()))
+        for record in (dungeon.rooms[0], enemy):
+            assert not hasattr(record, '__dict__')
+
+        print(f"✓ {len(placements)} enemies stored as columns, room views consistent\n")
+        return True
+    except Exception as e:
+        print(f"✗ Placement columns error: {e}\n")
+        return False
+
+
+def test_binary_serialization():
+    """Test the binary floor format round trip"""
+    print("Testing binary floor serialization...")
+    try:
+        import argparse
+        import contextlib
+        import io
+        import tempfile
+        import main
+        from src.generator import DungeonGenerator
+        from src.renderer import ASCIIRenderer
+        from src.serialization import FloorReader, FloorWriter, NAMES, dumps, loads
+
+        generator = DungeonGenerator(seed=12)
+        renderer = ASCIIRenderer()
+        floors = [generator.generate(floor_number=n, width=60, height=40) for n in (1, 2, 100)]
+
+        def snapshot(dungeon):
+            return (renderer.render(dungeon), dungeon.seed, dungeon.biome, dungeon.placement_stats,
+                    dungeon.entrance_pos, dungeon.exit_pos,
+                    [(room.room_id, room.is_boss_room, list(room.enemies), list(room.resources))
+                     for room in dungeon.rooms])
+
+        data = dumps(floors[0])
+        assert snapshot(loads(data)) == snapshot(floors[0])
+
+        # A stream of floors stores the catalog names once
+        stream = io.BytesIO()
+        writer = FloorWriter(stream)
+        for dungeon in floors:
+            writer.write(dungeon)
+        stream.seek(0)
+        restored = list(FloorReader(stream))
+        assert [snapshot(d) for d in restored] == [snapshot(d) for d in floors]
+        assert stream.getvalue().count(data[6:11]) == 1 and data[6:7] == NAMES
+
+        # Used as a context manager, the writer closes its stream
+        stream = io.BytesIO()
+        with FloorWriter(stream) as writer:
+            writer.write(floors[0])
+            writer.flush()
+            assert stream.getvalue() == dumps(floors[0])
+        assert stream.closed
+
+        # A tower run that fails partway leaves no truncated file behind
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'tower.bin')
+            args = argparse.Namespace(seed=9, floor=3, width=30, height=20, workers=1, evaluate=False,
+                                      transport='pickle', biome=None, output=path, format='bin')
+
+            def failing_tower(*args, **kwargs):
+                yield floors[0], None
+                raise RuntimeError("generation failed")
+
+            original = main.generate_tower_parallel
+            main.generate_tower_parallel = failing_tower
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    main.generate_tower(args, renderer)
+                raise AssertionError("generation error swallowed")
+            except RuntimeError:
+                pass
+            finally:
+                main.generate_tower_parallel = original
+            assert not os.path.exists(path)
+
+        try:
+            loads(b'NOPE' + data[4:])
+            raise AssertionError("bad magic number accepted")
+        except ValueError:
+            pass
+
+        print(f"✓ {len(restored)} floors round-tripped, {len(data)} bytes for one floor\n")
+        return True
+    except Exception as e:
+        print(f"✗ Binary serialization error: {e}\n")
+        return False
+
+
+def test_floor_archive():
+    """Test random access to archived floors and the agent's archive lookup"""
+    print("Testing floor archive...")
+    try:
+        import tempfile
+        import tracemalloc
+        from src.eidolon_agent import Eidolon7Agent
+        from src.generator import DungeonGenerator
+        from src.pathfinding import PathfindingValidator
+        from src.renderer import ASCIIRenderer
+        from src.serialization import FloorArchive, FloorArchiveWriter
+
+        generator = DungeonGenerator()
+        renderer = ASCIIRenderer()
+        floors = list(generator.generate_tower(range(1, 6), seed=31))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'tower.dnga')
+            with FloorArchiveWriter(path) as writer:
+                for dungeon in floors:
+                    writer.write(dungeon)
+
+            archive = FloorArchive(path)
+            assert len(archive) == 5 and (floors[2].seed, 3) in archive
+            for dungeon in floors:
+                restored = archive.tower_floor(31, dungeon.floor_number)
+                assert renderer.render(restored) == renderer.render(dungeon)
+                assert list(restored.enemies) == list(dungeon.enemies)
+                assert (PathfindingValidator(restored).validate_connectivity() ==
+                        PathfindingValidator(dungeon).validate_connectivity())
+            grid = archive.grid(floors[0].seed, 1)
+            assert isinstance(grid.cells, memoryview) and bytes(grid.cells) == bytes(floors[0].grid.cells)
+            assert archive.get(floors[0].seed, 2) is None
+
+            # The agent serves archived floors instead of regenerating them
+            agent = Eidolon7Agent(data_dir='data', archive=archive)
+            served = agent.generate_dungeon(floor_number=4, seed=floors[3].seed)
+            generated = Eidolon7Agent(data_dir='data').generate_dungeon(floor_number=4, seed=floors[3].seed)
+            assert isinstance(served['dungeon'].grid.cells, memoryview)
+            assert served['ascii_render'] == generated['ascii_render']
+            assert served['quality'] == generated['quality']
+            del grid, served, agent
+            archive.close()
+
+            # Loading a floor maps its tiles instead of copying them, and
+            # leaves the connectivity to be built on the first query
+            large = generator.generate(1, 400, 400, seed=5)
+            path = os.path.join(tmp, 'large.dnga')
+            with FloorArchiveWriter(path) as writer:
+                writer.write(large)
+            archive = FloorArchive(path)
+            tracemalloc.start()
+            try:
+                restored = archive.get(5, 1)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            assert peak < large.width * large.height // 4, f"get() allocated {peak} bytes"
+            assert isinstance(restored.grid.cells, memoryview) and restored.grid.cells.readonly
+            assert restored._owner is None
+            assert restored.connected_rooms() == large.connected_rooms() == len(large.rooms)
+            del restored
+            archive.close()
+
+        print(f"✓ {len(floors)} floors served from the archive by (seed, floor)\n")
+        return True
+    except Exception as e:
+        print(f"✗ Floor archive error: {e}\n")
+        return False
+
+
+def test_spatial_index():
+    """Test that the bucket-grid room index agrees with a linear scan"""
+    print("Testing room spatial index...")
+    try:
+        import random
+        from src.dungeon import Room
+        from src.spatial_index import LinearRoomIndex, GridRoomIndex, RoomIndex
+        from src.generator import DungeonGenerator
+
+        # An index without overlaps() is rejected when it is created
+        class Incomplete(RoomIndex):
+            pass
+        try:
+            Incomplete(10, 10)
+            assert False, "incomplete room index was instantiated"
+        except TypeError:
+            pass
+
+        rng = random.Random(7)
+        linear = LinearRoomIndex(200, 200)
+        grid = GridRoomIndex(200, 200, cell_size=8)
+        for i in range(2000):
+            room = Room(rng.randint(0, 190), rng.randint(0, 190), rng.randint(3, 12), rng.randint(3, 12), i)
+            hit = linear.overlaps(room, buffer=2)
+            assert hit == grid.overlaps(room, buffer=2)
+            if not hit:
+                linear.insert(room)
+                grid.insert(room)
+
+        dungeon = DungeonGenerator(seed=42).generate(floor_number=1, width=40, height=30)
+        stats = dungeon.placement_stats
+        assert stats['rooms_placed'] == len(dungeon.rooms)
+        assert stats['attempts'] == stats['rooms_placed'] + stats['rejections']
+
+        print(f"✓ Spatial index matches linear scan ({len(grid)} rooms indexed)")
+        print(f"  Placement: {stats['attempts']} attempts, {stats['rejections']} rejections\n")
+        return True
+    except Exception as e:
+        print(f"✗ Spatial index error: {e}\n")
+        return False
+
+
+def test_free_space_placement():
+    """Test that free-space placement fills crowded floors without overlaps"""
+    print("Testing free-space room placement...")
+    try:
+        from src.dungeon import Dungeon
+        from src.generator import DungeonGenerator
+        from src.spatial_index import LinearRoomIndex
+
+        gen = DungeonGenerator(seed=3, placement='free_space')
+        dungeon = Dungeon(120, 120, floor_number=1)
+        rooms = gen._generate_rooms(dungeon, room_count=150, is_boss_floor=True)
+
+        assert len(rooms) == 150
+        assert rooms[0].is_boss_room
+        # One size-and-position draw per room, however crowded the floor gets
+        assert dungeon.placement_stats['attempts'] == len(rooms)
+        index = LinearRoomIndex(120, 120)
+        for room in rooms:
+            assert 1 <= room.x and room.x + room.width <= 119
+            assert 1 <= room.y and room.y + room.height <= 119
+            assert not index.overlaps(room, buffer=2)
+            index.insert(room)
+
+        print(f"✓ Placed {len(rooms)}/150 rooms on a 120x120 floor "
+              f"in {dungeon.placement_stats['attempts']} attempts\n")
+        return True
+    except Exception as e:
+        print(f"✗ Free-space placement error: {e}\n")
+        return False
+
+
+def test_catalog_cache():
+    """Test the shared data catalog and its invalidation on file changes"""
+    print("Testing shared data catalog...")
+    try:
+        import json
+        import os
+        import shutil
+        import tempfile
+        from src.catalog import compile_catalog, get_catalog
+        from src.data_cache import compile_snapshot
+        from src.enemy import EnemyManager, EnemyTable, EnemyTier
+
+        # Every manager and agent shares one parse of the default data
+        assert EnemyManager().enemies is EnemyManager().enemies
+        assert get_catalog() is get_catalog()
+        catalog = get_catalog()
+        assert catalog.enemies is EnemyManager().enemies
+        bosses = catalog.enemy_table.by_tier[EnemyTier.MEGA_BOSS]
+        assert all(boss.tier == EnemyTier.MEGA_BOSS for boss in bosses)
+        assert catalog.enemy_table.mega_boss_by_biome['jungle'].name == 'jungle_titan'
+
+        # (biome, tier) and (biome, rarity) lookups hand out the indexed tuples
+        from src.resource import ResourceManager, ResourceRarity
+        manager = EnemyManager()
+        common = manager.get_enemies_for_biome('snow', EnemyTier.COMMON)
+        assert isinstance(common, tuple) and common is manager.get_enemies_for_biome('snow', EnemyTier.COMMON)
+        assert all('snow' in enemy.biomes and enemy.tier == EnemyTier.COMMON for enemy in common)
+        rare = ResourceManager().get_resources_by_rarity('jungle', ResourceRarity.RARE)
+        assert rare and all(r.biome == 'jungle' and r.rarity == ResourceRarity.RARE for r in rare)
+        assert manager.get_enemies_for_biome('no_such_biome', EnemyTier.COMMON) == ()
+
+        # An enemy listing a biome twice is indexed there once, as a biome scan would find it
+        table = EnemyTable({'twin': {'biomes': ['snow', 'swamp', 'snow']}, 'solo': {'biomes': ['snow']}})
+        assert [enemy.name for enemy in table.by_biome['snow']] == ['twin', 'solo']
+        assert [enemy.name for enemy in table.by_biome_tier[('snow', EnemyTier.COMMON)]] == ['twin', 'solo']
+        assert [enemy.name for enemy in table.by_biome['swamp']] == ['twin']
+
+        # Parsed data is read-only
+        try:
+            catalog.biome_table.data['jungle'] = {}
+            raise AssertionError("catalog data should be immutable")
+        except TypeError:
+            pass
+
+        data_dir = tempfile.mkdtemp()
+        try:
+            for name in ('biomes.json', 'enemies.json', 'resources.json'):
+                shutil.copy(os.path.join('data', name), data_dir)
+            # Compiled snapshots load the same data, and go stale with their JSON file
+            snapshots = compile_catalog(data_dir)
+            assert len(snapshots) == 3 and all(os.path.exists(path) for path in snapshots)
+            first = get_catalog(data_dir)
+            assert 'jungle' in first.biomes
+            assert sorted(first.enemies) == sorted(catalog.enemies)
+            assert first.enemy_table.data['frost_imps']['biomes'] == ('snow',)
+
+            path = os.path.join(data_dir, 'biomes.json')
+            with open(path, 'w') as f:
+                json.dump({'test_biome': {'theme': 'Test'}}, f)
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+            second = get_catalog(data_dir)
+            assert second is not first and list(second.biomes) == ['test_biome']
+            assert second.enemy_table is first.enemy_table  # Unchanged files are not reparsed
+
+            # Invalid data is refused at compile time
+            path = os.path.join(data_dir, 'enemies.json')
+            with open(path, 'w') as f:
+                json.dump({'bad_enemy': {'tier': 'legendary'}}, f)
+            try:
+                compile_snapshot(path, EnemyTable)
+                raise AssertionError("invalid enemy tier should not compile")
+            except ValueError:
+                pass
+        finally:
+            shutil.rmtree(data_dir)
+
+        print("✓ Data parsed once per process, compiled to snapshots and reloaded when a file changes\n")
+        return True
+    except Exception as e:
+        print(f"✗ Catalog error: {e}\n")
+        return False
+
+
 def test_eidolon_knowledge():
     """Test EIDOLON-7 knowledge service"""
     print("Testing EIDOLON-7 knowledge service...")
@@ -225,8 +1276,29 @@ def main():
         ("Imports", test_imports),
         ("Data Files", test_data_files),
         ("Basic Generation", test_basic_generation),
+        ("Tower Generation", test_tower_generation),
+        ("Parallel Tower", test_parallel_tower),
+        ("Generation Events", test_generation_events),
         ("BFS Pathfinding", test_pathfinding),
+        ("Reachability Mask", test_reachable_mask),
+        ("Component Labeling", test_component_labeling),
+        ("A* Path Finding", test_find_path),
         ("DQS Metrics", test_dqs_metrics),
+        ("Incremental DQS", test_evaluation_context),
+        ("Batch DQS Scoring", test_batch_scoring),
+        ("Streaming DQS Stats", test_streaming_stats),
+        ("Generate Until DQS", test_generate_until),
+        ("Incremental Connectivity", test_incremental_connectivity),
+        ("Packed Grid", test_packed_grid),
+        ("Slice Stamping", test_slice_stamping),
+        ("Renderer Overlay", test_renderer_overlay),
+        ("Incremental Animation", test_incremental_animation),
+        ("Placement Columns", test_placement_columns),
+        ("Binary Serialization", test_binary_serialization),
+        ("Floor Archive", test_floor_archive),
+        ("Spatial Index", test_spatial_index),
+        ("Free-Space Placement", test_free_space_placement),
+        ("Data Catalog", test_catalog_cache),
         ("EIDOLON-7 Knowledge", test_eidolon_knowledge),
         ("EIDOLON-7 Generation", test_eidolon_generation),
         ("GitHub Integration", test_github_integration),